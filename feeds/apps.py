@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import post_migrate
+from feeds.fts import restore_triggers
+
+
+def restore_search_triggers(using, **kwargs):
+    restore_triggers(connections[using])
 
 
 class FeedsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'feeds'
+
+    def ready(self):
+        post_migrate.connect(restore_search_triggers, sender=self)
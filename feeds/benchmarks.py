@@ -0,0 +1,308 @@
+"""
+Benchmarks for ingestion and the feed views, run by ``manage.py benchmark``.
+
+Every scenario runs against a throwaway database and cache and synthetic
+feeds served by a local HTTP server, so results depend only on the code and
+the machine.
+"""
+import math
+import platform
+import random
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from django import get_version
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from feeds.models import FeedSource, RSSFeed, RSSItem
+from feeds.services import parse_and_save_feed, refresh_sources
+from feeds.testing import FeedServer
+
+WORDS = (
+    "alpha beta gamma delta feed reader django python release update news patch server "
+    "database cache latency index query worker thread socket stream parser entry"
+).split()
+EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+# The view benchmarks clear the cache, so they run against a private one
+# rather than the configured, possibly shared, backend.
+CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "feeds-benchmark"}}
+
+
+def percentile(values, percent):
+    """
+    Returns the nearest-rank percentile of ``values``.
+    """
+    ordered = sorted(values)
+    rank = max(1, math.ceil(percent / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def sentence(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def synthetic_feed(entries, seed=0, title="Benchmark Feed"):
+    """
+    Builds a deterministic RSS 2.0 document with ``entries`` items, newest first.
+
+    Items carry a guid, an RFC 822 date and an HTML description of a few
+    paragraphs, roughly like a typical blog feed.
+
+    Returns:
+        bytes: The document.
+    """
+    rng = random.Random(seed)
+    items = []
+    for n in range(entries, 0, -1):
+        published = (EPOCH + timedelta(minutes=n)).strftime("%a, %d %b %Y %H:%M:%S GMT")
+        paragraphs = "".join(f"<p>{sentence(rng, 30)}</p>" for _ in range(3))
+        items.append(
+            f"<item><title>{sentence(rng, 6)}</title><guid>urn:bench:{seed}:{n}</guid>"
+            f"<link>http://example.com/{seed}/{n}</link><pubDate>{published}</pubDate>"
+            f"<description><![CDATA[{paragraphs}]]></description></item>"
+        )
+    return (
+        f'<?xml version="1.0"?><rss version="2.0"><channel><title>{title}</title>'
+        f"{''.join(items)}</channel></rss>"
+    ).encode()
+
+
+def measure(func):
+    """
+    Runs ``func`` once, returning its result, wall time and query count.
+    """
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+    return result, elapsed, len(queries)
+
+
+def peak_memory(func):
+    """
+    Runs ``func`` under tracemalloc and returns the peak allocation in bytes.
+
+    Kept separate from the timed run, since tracing slows Python down.
+    """
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_ingest(sizes):
+    """
+    Fetches and stores single feeds of each size through ``parse_and_save_feed``.
+
+    Each size is ingested into a new source (the first fetch), then again
+    unchanged with the HTTP validators cleared (a full re-parse that writes
+    nothing), and once more into another source to measure peak memory.
+    """
+    User = get_user_model()
+    user = User.objects.create(username="ingest-bench")
+    results = {}
+    routes = {}
+    for size in sizes:
+        routes[f"/{size}.xml"] = routes[f"/{size}-copy.xml"] = synthetic_feed(size, seed=size)
+    with FeedServer(routes) as server:
+        for size in sizes:
+            url = server.url(f"/{size}.xml")
+            feed = RSSFeed.objects.create(user=user, url=url)
+            created, first, first_queries = measure(lambda: parse_and_save_feed(feed))
+            FeedSource.objects.filter(pk=feed.source_id).update(etag="", modified="")
+            feed.source.refresh_from_db()
+            _, again, again_queries = measure(lambda: parse_and_save_feed(feed))
+
+            other = RSSFeed.objects.create(user=user, url=server.url(f"/{size}-copy.xml"))
+            memory = peak_memory(lambda: parse_and_save_feed(other))
+            results[str(size)] = {
+                "entries": size,
+                "bytes": len(routes[f"/{size}.xml"]),
+                "created": created.created,
+                "first_seconds": round(first, 4),
+                "entries_per_second": round(size / first, 1),
+                "first_queries": first_queries,
+                "unchanged_seconds": round(again, 4),
+                "unchanged_queries": again_queries,
+                "peak_memory_bytes": memory,
+            }
+    return results
+
+
+def bench_refresh(feeds, entries):
+    """
+    Refreshes many feeds concurrently through ``refresh_sources``.
+    """
+    routes = {f"/feed{n}.xml": synthetic_feed(entries, seed=1000 + n) for n in range(feeds)}
+    with FeedServer(routes) as server:
+        sources = [FeedSource.objects.create(url=server.url(path)) for path in routes]
+        report, elapsed, queries = measure(lambda: refresh_sources(sources))
+    return {
+        "feeds": feeds,
+        "entries_per_feed": entries,
+        "seconds": round(elapsed, 4),
+        "feeds_per_second": round(feeds / elapsed, 1),
+        "items_per_second": round(report.total("created") / elapsed, 1),
+        "queries": queries,
+        "failed": report.failed,
+        "fetch_p50_seconds": round(report.latency_percentile(50), 4),
+        "fetch_p99_seconds": round(report.latency_percentile(99), 4),
+    }
+
+
+def populate(users, feeds_per_user, sources, items_per_source):
+    """
+    Creates users subscribed to overlapping sets of sources with stored items.
+
+    Returns:
+        list: The users.
+    """
+    User = get_user_model()
+    rng = random.Random(42)
+    pool = FeedSource.objects.bulk_create(
+        FeedSource(url=f"http://bench.example.com/{n}", title=f"Source {n}", last_fetched_at=EPOCH)
+        for n in range(sources)
+    )
+    for source in pool:
+        RSSItem.objects.bulk_create(
+            (
+                RSSItem(
+                    source=source,
+                    guid=f"{source.pk}:{n}",
+                    title=sentence(rng, 6),
+                    description="",
+                    description_html=f"<p>{sentence(rng, 40)}</p>",
+                    excerpt=sentence(rng, 20),
+                    pub_date=EPOCH + timedelta(minutes=n * sources + source.pk),
+                    link=f"http://bench.example.com/{source.pk}/{n}",
+                )
+                for n in range(items_per_source)
+            ),
+            batch_size=500,
+        )
+        source.record_items(items_per_source, EPOCH + timedelta(minutes=items_per_source * sources))
+
+    accounts = User.objects.bulk_create(User(username=f"bench{n}") for n in range(users))
+    RSSFeed.objects.bulk_create(
+        RSSFeed(user=user, url=source.url, source=source)
+        for user in accounts
+        for source in rng.sample(pool, min(feeds_per_user, len(pool)))
+    )
+    return accounts
+
+
+def bench_views(users, feeds_per_user, sources, items_per_source, requests):
+    """
+    Measures latency and query counts of the feed list, detail and river views.
+
+    Each view is requested ``requests`` times per cache state: ``cold``
+    clears the fragment cache before every request, ``warm`` serves it.
+    """
+    accounts = populate(users, feeds_per_user, sources, items_per_source)
+    client = Client()
+    results = {}
+    for cached in (False, True):
+        timings = {"feed-list": [], "feed-detail": [], "river": []}
+        queries = {name: [] for name in timings}
+        cache.clear()
+        for n in range(requests):
+            user = accounts[n % len(accounts)]
+            client.force_login(user)
+            feed = RSSFeed.objects.filter(user=user).order_by("pk").first()
+            urls = {
+                "feed-list": reverse("feed-list"),
+                "feed-detail": reverse("feed-detail", args=[feed.pk]),
+                "river": reverse("river"),
+            }
+            for name, url in urls.items():
+                if not cached:
+                    cache.clear()
+                response, elapsed, count = measure(lambda: client.get(url))
+                if response.status_code != 200:
+                    raise RuntimeError(f"{url} returned HTTP {response.status_code}")
+                timings[name].append(elapsed * 1000)
+                queries[name].append(count)
+        for name in timings:
+            results[f"{name}.{'warm' if cached else 'cold'}"] = {
+                "requests": requests,
+                "p50_ms": round(percentile(timings[name], 50), 2),
+                "p99_ms": round(percentile(timings[name], 99), 2),
+                "mean_ms": round(statistics.mean(timings[name]), 2),
+                "queries": max(queries[name]),
+            }
+    return {
+        "users": users,
+        "feeds_per_user": feeds_per_user,
+        "sources": sources,
+        "items_per_source": items_per_source,
+        "views": results,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def run(sizes, feeds, entries_per_feed, users, feeds_per_user, sources, items_per_source, requests):
+    """
+    Runs every scenario and returns the results as a JSON-serializable dict.
+    """
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "django": get_version(),
+            "database": connection.vendor,
+            "database_version": ".".join(map(str, connection.get_database_version())),
+            "machine": platform.machine(),
+        },
+        "ingest": bench_ingest(sizes),
+        "refresh": bench_refresh(feeds, entries_per_feed),
+        "views": bench_views(users, feeds_per_user, sources, items_per_source, requests),
+    }
+
+
+def flatten(results, prefix=""):
+    """
+    Flattens nested results into ``{"a.b.c": number}`` for comparison.
+    """
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(baseline, current):
+    """
+    Lists the metrics present in both runs with their relative change.
+
+    Returns:
+        list: ``(name, before, after, change)`` tuples, ``change`` being a
+        fraction (0.1 is 10% higher) or None when the baseline is zero.
+    """
+    before, after = flatten(baseline), flatten(current)
+    rows = []
+    for name in sorted(before.keys() & after.keys()):
+        if name.startswith("meta."):
+            continue
+        change = (after[name] - before[name]) / before[name] if before[name] else None
+        rows.append((name, before[name], after[name], change))
+    return rows
@@ -0,0 +1,101 @@
+import uuid
+from django.conf import settings
+from django.core.cache import InvalidCacheBackendError, cache, caches
+from django.core.cache.utils import make_template_fragment_key
+from feeds.models import RSSFeed
+
+VERSION_KEY = "feeds:version:{kind}:{pk}"
+
+
+def _key(kind, pk):
+    return VERSION_KEY.format(kind=kind, pk=pk)
+
+
+def page_version(*, user=None, feed=None):
+    """
+    Returns the version stamp of cached fragments for a user or a feed.
+
+    The stamp goes into the fragment cache key, so bumping it makes every
+    fragment rendered under the old stamp unreachable. Works with any cache
+    backend, since nothing has to be deleted or enumerated.
+
+    Args:
+        user (int): Primary key of the user whose feed list or river is cached.
+        feed (int): Primary key of the subscription whose item pages are cached.
+
+    Returns:
+        str: The current stamp.
+    """
+    key = _key("user", user) if feed is None else _key("feed", feed)
+    return cache.get_or_set(key, lambda: uuid.uuid4().hex, timeout=None)
+
+
+async def apage_version(*, user=None, feed=None):
+    """
+    Asynchronous ``page_version``.
+    """
+    key = _key("user", user) if feed is None else _key("feed", feed)
+    return await cache.aget_or_set(key, lambda: uuid.uuid4().hex, timeout=None)
+
+
+async def is_fragment_cached(fragment_name, *vary_on):
+    """
+    Tells whether a ``{% cache %}`` fragment is stored, like the tag looks it up.
+
+    Async views use this to query for a fragment's data only when the
+    template will actually render it.
+    """
+    try:
+        fragments = caches["template_fragments"]
+    except InvalidCacheBackendError:
+        fragments = cache
+    return await fragments.ahas_key(make_template_fragment_key(fragment_name, vary_on))
+
+
+def bump_versions(user_ids=(), feed_ids=()):
+    """
+    Invalidates the cached fragments of the given users and subscriptions.
+
+    Args:
+        user_ids (iterable): Users whose feed list and river changed.
+        feed_ids (iterable): Subscriptions whose item pages changed.
+    """
+    keys = [_key("user", pk) for pk in set(user_ids)] + [_key("feed", pk) for pk in set(feed_ids)]
+    if keys:
+        cache.set_many({key: uuid.uuid4().hex for key in keys}, timeout=None)
+
+
+def bump_feed(feed):
+    """
+    Invalidates the fragments showing a subscription, after it was edited or deleted.
+    """
+    bump_versions(user_ids=[feed.user_id], feed_ids=[feed.pk])
+
+
+def bump_source(source):
+    """
+    Invalidates the fragments of every subscription to a source, after it was fetched.
+    """
+    bump_sources([source])
+
+
+def bump_sources(sources):
+    """
+    Invalidates the fragments of every subscription to the given sources, in one query.
+
+    Args:
+        sources (iterable | QuerySet): FeedSource instances or primary keys,
+            or a queryset selecting them.
+    """
+    subscriptions = list(RSSFeed.objects.filter(source__in=sources).values_list("pk", "user_id"))
+    bump_versions(
+        user_ids=[user_id for _, user_id in subscriptions],
+        feed_ids=[pk for pk, _ in subscriptions],
+    )
+
+
+def fragment_timeout():
+    """
+    How long rendered fragments are kept, in seconds.
+    """
+    return getattr(settings, "FEEDS_PAGE_CACHE_TIMEOUT", 600)
@@ -0,0 +1,8 @@
+from django import forms
+
+
+class OPMLImportForm(forms.Form):
+    """
+    Upload form for an OPML subscription list.
+    """
+    file = forms.FileField(label="OPML file")
@@ -0,0 +1,59 @@
+"""
+SQL for the SQLite FTS5 index on items, created by migration 0015_rssitem_search
+and moved to the sanitized ``search_text`` by 0022_rssitem_search_text.
+
+SQLite applies most schema changes by rebuilding the table, which silently
+drops its triggers. ``restore_triggers`` recreates them and runs after
+every ``migrate`` (see ``FeedsConfig.ready``), so later migrations on
+RSSItem cannot leave the search index stale.
+"""
+
+# Columns of feeds_rssitem indexed by feeds_rssitem_fts, in order.
+COLUMNS = ("title", "search_text")
+
+TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS feeds_rssitem_fts_insert AFTER INSERT ON feeds_rssitem BEGIN
+        INSERT INTO feeds_rssitem_fts(rowid, title, search_text)
+        VALUES (new.id, new.title, new.search_text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS feeds_rssitem_fts_delete AFTER DELETE ON feeds_rssitem BEGIN
+        INSERT INTO feeds_rssitem_fts(feeds_rssitem_fts, rowid, title, search_text)
+        VALUES ('delete', old.id, old.title, old.search_text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS feeds_rssitem_fts_update AFTER UPDATE OF title, search_text ON feeds_rssitem BEGIN
+        INSERT INTO feeds_rssitem_fts(feeds_rssitem_fts, rowid, title, search_text)
+        VALUES ('delete', old.id, old.title, old.search_text);
+        INSERT INTO feeds_rssitem_fts(rowid, title, search_text)
+        VALUES (new.id, new.title, new.search_text);
+    END
+    """,
+]
+
+
+def restore_triggers(connection, rebuild=False):
+    """
+    Recreates missing FTS triggers on SQLite; does nothing elsewhere.
+
+    Also does nothing while the index still has the columns of an earlier
+    migration; 0022 recreates the triggers and rebuilds the index itself.
+
+    Args:
+        connection: The database connection.
+        rebuild (bool): Also reindex every item, for when rows may have
+            been written while the triggers were missing.
+    """
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM pragma_table_info('feeds_rssitem_fts')")
+        if tuple(row[0] for row in cursor.fetchall()) != COLUMNS:
+            return
+        for statement in TRIGGERS:
+            cursor.execute(statement)
+        if rebuild:
+            cursor.execute("INSERT INTO feeds_rssitem_fts(feeds_rssitem_fts) VALUES ('rebuild')")
@@ -0,0 +1,84 @@
+import json
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from feeds import benchmarks
+
+PROFILES = {
+    "full": {
+        "sizes": [10, 100, 1000, 10000],
+        "feeds": 100,
+        "entries_per_feed": 50,
+        "users": 50,
+        "feeds_per_user": 40,
+        "sources": 200,
+        "items_per_source": 200,
+        "requests": 100,
+    },
+    "quick": {
+        "sizes": [10, 100, 1000],
+        "feeds": 20,
+        "entries_per_feed": 20,
+        "users": 5,
+        "feeds_per_user": 10,
+        "sources": 20,
+        "items_per_source": 50,
+        "requests": 20,
+    },
+}
+
+
+class Command(BaseCommand):
+    """
+    Benchmarks ingestion and the feed views and writes the results as JSON.
+
+    Runs against a throwaway test database and a private local-memory cache
+    with synthetic feeds served from a local HTTP server, so the development
+    database and any shared cache are left untouched.
+    Pass an earlier result file to ``--compare`` to print relative changes.
+
+    Example:
+        python manage.py benchmark --output before.json
+        python manage.py benchmark --output after.json --compare before.json
+    """
+    help = "Measure ingest throughput, query counts, view latency and peak memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--profile", choices=PROFILES, default="full", help="Fixture sizes to use.")
+        parser.add_argument("--sizes", type=int, nargs="+", help="Entries per feed for the ingest benchmark.")
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+        parser.add_argument("--compare", help="Compare with the results in this JSON file.")
+
+    def handle(self, *args, **options):
+        params = dict(PROFILES[options["profile"]])
+        if options["sizes"]:
+            params["sizes"] = options["sizes"]
+        baseline = None
+        if options["compare"]:
+            try:
+                baseline = json.loads(Path(options["compare"]).read_text())
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read {options['compare']}: {exc}")
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with override_settings(CACHES=benchmarks.CACHES):
+                results = benchmarks.run(**params)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+        results["meta"]["profile"] = options["profile"]
+
+        output = json.dumps(results, indent=2)
+        if options["output"]:
+            Path(options["output"]).write_text(output + "\n")
+            self.stdout.write(f"Results written to {options['output']}")
+        else:
+            self.stdout.write(output)
+
+        if baseline is not None:
+            for name, before, after, change in benchmarks.compare(baseline, results):
+                delta = f"{change:+.1%}" if change is not None else "n/a"
+                self.stdout.write(f"{name:60} {before:>12} -> {after:>12} {delta:>8}")
@@ -0,0 +1,36 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from feeds.services.opml import OPMLError, import_opml
+
+
+class Command(BaseCommand):
+    """
+    Subscribes a user to the feeds of an OPML file, e.g. when migrating readers.
+
+    Feeds are queued for their first fetch, which ``run_feed_worker`` performs.
+
+    Example:
+        python manage.py import_opml alice subscriptions.opml
+    """
+    help = "Import the feeds of an OPML file for a user."
+
+    def add_arguments(self, parser):
+        parser.add_argument("username", help="User to subscribe.")
+        parser.add_argument("path", help="OPML file to read.")
+        parser.add_argument("--max-feeds", type=int, help="Stop after this many feeds.")
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            user = User.objects.get(**{User.USERNAME_FIELD: options["username"]})
+        except User.DoesNotExist:
+            raise CommandError(f"No user named {options['username']!r}")
+        try:
+            with open(options["path"], "rb") as file:
+                result = import_opml(user, file, max_feeds=options["max_feeds"])
+        except (OSError, OPMLError) as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(
+            f"Created {result.created}, skipped {result.skipped}, invalid {result.invalid}"
+            + (" (truncated)" if result.truncated else "")
+        )
@@ -0,0 +1,75 @@
+from django.core.management.base import BaseCommand, CommandError
+from feeds.models import FeedSource
+from feeds.services.read_state import prune_item_states
+from feeds.services.retention import (
+    DEFAULT_BATCH_SIZE, prune_source, retention_policy, storage_stats, vacuum,
+)
+
+
+def format_bytes(size):
+    units = ["B", "KB", "MB", "GB"]
+    unit = 0
+    while abs(size) >= 1024 and unit < len(units) - 1:
+        size /= 1024
+        unit += 1
+    return f"{size:.1f} {units[unit]}"
+
+
+class Command(BaseCommand):
+    """
+    Deletes items that fall outside the retention policy, in small batches.
+
+    Limits default to ``FEEDS_RETENTION_MAX_ITEMS`` and
+    ``FEEDS_RETENTION_MAX_AGE_DAYS``. Sources are processed in id order and
+    each pruned source id is printed once it is finished, so an interrupted
+    run can be resumed with ``--resume-after``. Starred items are kept, and
+    read-state rows made obsolete by "mark all as read" are cleared.
+
+    Example:
+        python manage.py prune_items --max-items 500 --max-age-days 90 --batch-size 500
+    """
+    help = "Delete old RSS items per the retention policy and report reclaimed space."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--max-items", type=int, help="Newest items to keep per feed.")
+        parser.add_argument("--max-age-days", type=int, help="Delete items older than this many days.")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Items deleted per transaction.")
+        parser.add_argument("--pause", type=float, default=0, help="Seconds to sleep between batches.")
+        parser.add_argument("--resume-after", type=int, default=0, help="Skip sources up to this id.")
+        parser.add_argument("--vacuum", action="store_true", help="Return freed space to the filesystem afterwards.")
+
+    def handle(self, *args, **options):
+        max_items, max_age = retention_policy(options["max_items"], options["max_age_days"])
+        if max_items is None and max_age is None:
+            raise CommandError("No retention limit: pass --max-items/--max-age-days or set FEEDS_RETENTION_*.")
+
+        before = storage_stats()
+        deleted = pruned = 0
+        sources = FeedSource.objects.filter(pk__gt=options["resume_after"]).order_by("pk").only("pk")
+        for source in sources.iterator():
+            result = prune_source(
+                source,
+                max_items=max_items,
+                max_age=max_age,
+                batch_size=options["batch_size"],
+                pause=options["pause"],
+            )
+            if result.deleted:
+                deleted += result.deleted
+                pruned += 1
+                self.stdout.write(f"Source {source.pk}: deleted {result.deleted} items in {result.batches} batches")
+        self.stdout.write(f"Deleted {deleted} items from {pruned} sources")
+        self.stdout.write(f"Cleared {prune_item_states()} obsolete read states")
+
+        if options["vacuum"]:
+            vacuum()
+        after = storage_stats()
+        if "free" in before:
+            freed = after["free"] - before["free"]
+            shrunk = (before["used"] + before["free"]) - (after["used"] + after["free"])
+            self.stdout.write(
+                f"Reclaimed {format_bytes(before['used'] - after['used'])}: "
+                f"{format_bytes(max(freed, 0))} freed for reuse, {format_bytes(shrunk)} returned to the filesystem"
+            )
+        elif "used" in before:
+            self.stdout.write(f"Item table size: {format_bytes(before['used'])} -> {format_bytes(after['used'])}")
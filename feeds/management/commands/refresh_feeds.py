@@ -0,0 +1,51 @@
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand
+from feeds.models import FeedSource
+from feeds.services.refresh import arefresh_sources, refresh_sources
+
+
+class Command(BaseCommand):
+    """
+    Fetches all subscribed (or the given) RSS feeds concurrently and stores new items.
+
+    Each unique feed URL is fetched once, however many users subscribe to it.
+    With ``--async`` the fetches run on an event loop rather than a thread
+    pool, so ``--workers`` can be set to hundreds.
+
+    Example:
+        python manage.py refresh_feeds --workers 16 --per-host 2
+        python manage.py refresh_feeds --async --workers 200
+    """
+    help = "Refresh RSS feeds concurrently and report throughput."
+
+    def add_arguments(self, parser):
+        parser.add_argument("feed_ids", nargs="*", type=int, help="Only refresh these feed ids.")
+        parser.add_argument("--workers", type=int, help="Global number of concurrent fetches.")
+        parser.add_argument("--per-host", type=int, help="Concurrent fetches allowed per host.")
+        parser.add_argument("--timeout", type=float, help="Socket timeout per fetch in seconds.")
+        parser.add_argument("--async", action="store_true", dest="use_async", help="Fetch with asyncio and httpx.")
+
+    def handle(self, *args, **options):
+        sources = FeedSource.objects.subscribed()
+        if options["feed_ids"]:
+            sources = sources.filter(subscriptions__pk__in=options["feed_ids"]).distinct()
+
+        if options["use_async"]:
+            report = async_to_sync(arefresh_sources)(
+                list(sources),
+                max_concurrency=options["workers"],
+                per_host=options["per_host"],
+                timeout=options["timeout"],
+            )
+        else:
+            report = refresh_sources(
+                sources,
+                max_workers=options["workers"],
+                per_host=options["per_host"],
+                timeout=options["timeout"],
+            )
+        for line in report.summary_lines():
+            self.stdout.write(line)
+        for outcome in report.outcomes:
+            if outcome.error:
+                self.stderr.write(f"{outcome.source.url}: {outcome.error}")
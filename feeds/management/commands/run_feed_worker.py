@@ -0,0 +1,46 @@
+import time
+from django.core.management.base import BaseCommand
+from feeds.models import FeedSource
+from feeds.services.jobs import run_jobs
+from feeds.services.refresh import refresh_sources
+
+
+class Command(BaseCommand):
+    """
+    Long-running worker that refreshes feeds as their ``next_fetch_at`` comes due.
+
+    Each cycle first drains a batch of queued background jobs, such as the
+    first fetch of a newly added feed, then refreshes the sources that are due.
+
+    Example:
+        python manage.py run_feed_worker --batch-size 200 --idle-sleep 30
+    """
+    help = "Run queued jobs and refresh feeds that are due according to the polling schedule."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100, help="Maximum feeds per cycle.")
+        parser.add_argument("--idle-sleep", type=float, default=30.0, help="Seconds to wait when nothing is due.")
+        parser.add_argument("--workers", type=int, help="Global number of concurrent fetches.")
+        parser.add_argument("--per-host", type=int, help="Concurrent fetches allowed per host.")
+        parser.add_argument("--timeout", type=float, help="Socket timeout per fetch in seconds.")
+        parser.add_argument("--once", action="store_true", help="Run a single cycle and exit.")
+
+    def handle(self, *args, **options):
+        while True:
+            jobs = run_jobs(limit=options["batch_size"])
+            if jobs:
+                self.stdout.write(f"Ran {jobs} queued jobs")
+            due = list(FeedSource.objects.due()[: options["batch_size"]])
+            if due:
+                report = refresh_sources(
+                    due,
+                    max_workers=options["workers"],
+                    per_host=options["per_host"],
+                    timeout=options["timeout"],
+                )
+                for line in report.summary_lines():
+                    self.stdout.write(line)
+            if options["once"]:
+                return
+            if len(due) < options["batch_size"] and jobs < options["batch_size"]:
+                time.sleep(options["idle_sleep"])
@@ -0,0 +1,45 @@
+# Generated by Django 5.2 on 2026-10-18 12:30
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feeds', '0006_rssfeed_schedule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedSource',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=255, unique=True)),
+                ('title', models.CharField(blank=True, max_length=255)),
+                ('etag', models.CharField(blank=True, max_length=255)),
+                ('modified', models.CharField(blank=True, max_length=64)),
+                ('last_status', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('last_fetched_at', models.DateTimeField(blank=True, null=True)),
+                ('next_fetch_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('poll_interval', models.PositiveIntegerField(blank=True, null=True)),
+                ('error_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='rssfeed',
+            name='source',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='subscriptions', to='feeds.feedsource'),
+        ),
+        migrations.AddField(
+            model_name='rssitem',
+            name='source',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='items', to='feeds.feedsource'),
+        ),
+        migrations.AlterField(
+            model_name='rssitem',
+            name='feed',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='items', to='feeds.rssfeed'),
+        ),
+    ]
@@ -0,0 +1,98 @@
+from urllib.parse import urlsplit, urlunsplit
+
+from django.db import migrations
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+FETCH_FIELDS = ("etag", "modified", "last_status", "last_fetched_at", "next_fetch_at", "poll_interval", "error_count")
+
+
+def normalize_url(url):
+    # Frozen copy of feeds.models.normalize_url at the time of this migration.
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    if parts.username:
+        userinfo = parts.username + (f":{parts.password}" if parts.password else "")
+        host = f"{userinfo}@{host}"
+    return urlunsplit((scheme, host, parts.path or "/", parts.query, ""))
+
+
+def share_sources(apps, schema_editor):
+    """
+    Creates one FeedSource per normalized URL and moves items onto it.
+
+    Items that several subscriptions stored separately are deduplicated by
+    title, keeping the oldest copy.
+    """
+    FeedSource = apps.get_model("feeds", "FeedSource")
+    RSSFeed = apps.get_model("feeds", "RSSFeed")
+    RSSItem = apps.get_model("feeds", "RSSItem")
+
+    sources = {}
+    for feed in RSSFeed.objects.order_by("pk"):
+        url = normalize_url(feed.url)
+        source = sources.get(url)
+        if source is None:
+            source = FeedSource.objects.create(
+                url=url, title=feed.title, **{name: getattr(feed, name) for name in FETCH_FIELDS}
+            )
+            sources[url] = source
+        feed.source = source
+        feed.title = ""
+        feed.save(update_fields=["source", "title"])
+        RSSItem.objects.filter(feed=feed).update(source=source)
+
+    for source in sources.values():
+        seen = set()
+        duplicates = []
+        for pk, title in RSSItem.objects.filter(source=source).order_by("pk").values_list("pk", "title"):
+            if title in seen:
+                duplicates.append(pk)
+            seen.add(title)
+        RSSItem.objects.filter(pk__in=duplicates).delete()
+
+
+def split_sources(apps, schema_editor):
+    """
+    Gives every subscription its own copy of its source's items and fetch state.
+    """
+    FeedSource = apps.get_model("feeds", "FeedSource")
+    RSSFeed = apps.get_model("feeds", "RSSFeed")
+    RSSItem = apps.get_model("feeds", "RSSItem")
+
+    for source in FeedSource.objects.all():
+        feeds = list(RSSFeed.objects.filter(source=source).order_by("pk"))
+        items = RSSItem.objects.filter(source=source)
+        if not feeds:
+            items.delete()
+            continue
+
+        for feed in feeds:
+            feed.title = feed.title or source.title
+            for name in FETCH_FIELDS:
+                setattr(feed, name, getattr(source, name))
+            feed.save()
+
+        first, *others = feeds
+        items.update(feed=first)
+        for feed in others:
+            RSSItem.objects.bulk_create([
+                RSSItem(
+                    feed=feed, source=source, title=item.title, description=item.description,
+                    pub_date=item.pub_date, link=item.link, image_url=item.image_url,
+                )
+                for item in items.iterator()
+            ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feeds', '0007_feedsource'),
+    ]
+
+    operations = [
+        migrations.RunPython(share_sources, split_sources),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2 on 2026-10-18 12:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feeds', '0008_move_items_to_feedsource'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='rssitem',
+            name='feed',
+        ),
+        migrations.AlterField(
+            model_name='rssitem',
+            name='source',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='feeds.feedsource'),
+        ),
+        migrations.AlterField(
+            model_name='rssfeed',
+            name='source',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subscriptions', to='feeds.feedsource'),
+        ),
+        migrations.RemoveField(
+            model_name='rssfeed',
+            name='error_count',
+        ),
+        migrations.RemoveField(
+            model_name='rssfeed',
+            name='etag',
+        ),
+        migrations.RemoveField(
+            model_name='rssfeed',
+            name='last_fetched_at',
+        ),
+        migrations.RemoveField(
+            model_name='rssfeed',
+            name='last_status',
+        ),
+        migrations.RemoveField(
+            model_name='rssfeed',
+            name='modified',
+        ),
+        migrations.RemoveField(
+            model_name='rssfeed',
+            name='next_fetch_at',
+        ),
+        migrations.RemoveField(
+            model_name='rssfeed',
+            name='poll_interval',
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2 on 2026-10-18 11:27
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def backfill_counts(apps, schema_editor):
+    FeedSource = apps.get_model("feeds", "FeedSource")
+    RSSItem = apps.get_model("feeds", "RSSItem")
+    totals = RSSItem.objects.values("source").annotate(count=Count("pk"), latest=Max("pub_date"))
+    for row in totals:
+        FeedSource.objects.filter(pk=row["source"]).update(
+            item_count=row["count"], latest_pub_date=row["latest"]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feeds', '0010_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedsource',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='feedsource',
+            name='latest_pub_date',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_counts, migrations.RunPython.noop),
+    ]
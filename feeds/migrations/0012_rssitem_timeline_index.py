@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 11:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feeds', '0011_feedsource_item_counts'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='rssitem',
+            name='source',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='items', to='feeds.feedsource'),
+        ),
+        migrations.AddIndex(
+            model_name='rssitem',
+            index=models.Index(fields=['source', '-pub_date', '-id'], name='rssitem_source_timeline'),
+        ),
+    ]
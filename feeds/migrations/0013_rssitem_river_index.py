@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-18 11:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feeds', '0012_rssitem_timeline_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rssitem',
+            index=models.Index(fields=['-pub_date', '-id'], name='rssitem_timeline'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+import hashlib
+
+from django.db import migrations, models
+
+GUID_MAX_LENGTH = 255
+
+
+def backfill_guids(apps, schema_editor):
+    """
+    Gives existing items a guid, since their original entry ids were not stored.
+
+    Uses the link, as most feeds use the permalink as their guid, falling back
+    to the title hash used by ``entry_guid``. Content hashes are left empty,
+    so each item is rewritten once the next time its feed is fetched; items
+    of feeds whose entry ids are not their links are then matched by
+    ``feeds.services.rss_parser.adopt_legacy_items``.
+    """
+    RSSItem = apps.get_model("feeds", "RSSItem")
+    seen = set()
+    to_update = []
+    for item in RSSItem.objects.order_by("pk").only("pk", "source_id", "title", "link").iterator():
+        key = (item.link or "").strip()
+        if not key or len(key) > GUID_MAX_LENGTH or (item.source_id, key) in seen:
+            key = "title:" + hashlib.sha256(item.title.encode()).hexdigest()
+        if (item.source_id, key) in seen:
+            key = f"legacy:{item.pk}"
+        seen.add((item.source_id, key))
+        item.guid = key
+        to_update.append(item)
+    RSSItem.objects.bulk_update(to_update, ["guid"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feeds", "0013_rssitem_river_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="rssitem",
+            name="guid",
+            field=models.CharField(default="", max_length=255),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="rssitem",
+            name="content_hash",
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.RunPython(backfill_guids, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="rssitem",
+            constraint=models.UniqueConstraint(fields=("source", "guid"), name="rssitem_unique_guid"),
+        ),
+    ]
@@ -0,0 +1,71 @@
+from django.db import migrations
+
+SQLITE_FORWARD = [
+    # External-content FTS5 table: the text lives in feeds_rssitem only.
+    """
+    CREATE VIRTUAL TABLE feeds_rssitem_fts USING fts5(
+        title, description, content='feeds_rssitem', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER feeds_rssitem_fts_insert AFTER INSERT ON feeds_rssitem BEGIN
+        INSERT INTO feeds_rssitem_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER feeds_rssitem_fts_delete AFTER DELETE ON feeds_rssitem BEGIN
+        INSERT INTO feeds_rssitem_fts(feeds_rssitem_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER feeds_rssitem_fts_update AFTER UPDATE OF title, description ON feeds_rssitem BEGIN
+        INSERT INTO feeds_rssitem_fts(feeds_rssitem_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO feeds_rssitem_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    "INSERT INTO feeds_rssitem_fts(feeds_rssitem_fts) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS feeds_rssitem_fts_update",
+    "DROP TRIGGER IF EXISTS feeds_rssitem_fts_delete",
+    "DROP TRIGGER IF EXISTS feeds_rssitem_fts_insert",
+    "DROP TABLE IF EXISTS feeds_rssitem_fts",
+]
+
+# Must match the expression in feeds.services.search.POSTGRES_DOCUMENT.
+POSTGRES_FORWARD = [
+    """
+    CREATE INDEX feeds_rssitem_search ON feeds_rssitem USING gin ((
+        setweight(to_tsvector('english', title), 'A') || setweight(to_tsvector('english', description), 'B')
+    ))
+    """,
+]
+
+POSTGRES_REVERSE = ["DROP INDEX IF EXISTS feeds_rssitem_search"]
+
+
+def run_for_vendor(sqlite, postgresql):
+    def run(apps, schema_editor):
+        statements = {"sqlite": sqlite, "postgresql": postgresql}.get(schema_editor.connection.vendor, [])
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feeds", "0014_rssitem_guid"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor(SQLITE_FORWARD, POSTGRES_FORWARD),
+            run_for_vendor(SQLITE_REVERSE, POSTGRES_REVERSE),
+        ),
+    ]
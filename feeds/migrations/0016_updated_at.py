@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-18 11:42
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feeds', '0015_rssitem_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedsource',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='rssfeed',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,232 @@
+# Generated by Django 5.2 on 2026-10-18 11:51
+
+import re
+from html import escape
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+from django.db import migrations, models
+
+from feeds.fts import restore_triggers
+
+# Frozen copy of feeds.services.sanitize at the time of this migration, so
+# the backfill does not load the service layer or change with the sanitizer.
+MAX_INPUT_LENGTH = 200_000
+MAX_HTML_LENGTH = 20_000
+EXCERPT_LENGTH = 280
+
+ALLOWED_TAGS = {
+    "a", "abbr", "b", "blockquote", "br", "code", "del", "em", "figcaption", "figure", "h1", "h2",
+    "h3", "h4", "h5", "h6", "hr", "i", "img", "li", "ol", "p", "pre", "q", "s", "small", "strong",
+    "sub", "sup", "table", "tbody", "td", "th", "thead", "tr", "u", "ul",
+}
+VOID_TAGS = {"br", "hr", "img"}
+ALLOWED_ATTRIBUTES = {
+    "a": {"href", "title"},
+    "abbr": {"title"},
+    "img": {"src", "alt", "title", "width", "height"},
+    "td": {"colspan", "rowspan"},
+    "th": {"colspan", "rowspan"},
+}
+URL_ATTRIBUTES = {"href", "src"}
+URL_SCHEMES = {"http", "https", "mailto"}
+# Elements whose content is dropped along with the tag.
+DROP_CONTENT_TAGS = {"script", "style", "iframe", "object", "embed", "noscript", "template", "svg", "math", "head"}
+# Elements that implicitly close an open sibling of the same kind, as in ``<li>one<li>two``.
+SELF_NESTING_TAGS = {"li", "p", "td", "th", "tr"}
+BLOCK_TAGS = {"p", "br", "div", "li", "blockquote", "pre", "tr", "h1", "h2", "h3", "h4", "h5", "h6", "hr"}
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def safe_url(value):
+    """
+    Returns ``value`` if it is a relative or http(s)/mailto URL, else None.
+    """
+    value = value.strip()
+    scheme = urlsplit(value).scheme.lower()
+    if scheme and scheme not in URL_SCHEMES:
+        return None
+    return value
+
+
+class DescriptionSanitizer(HTMLParser):
+    """
+    Rebuilds publisher HTML from an allowlist of tags and attributes.
+
+    Anything not allowed is dropped: unknown tags are unwrapped, scripts and
+    similar elements lose their content, and attributes other than a few
+    safe ones (with http(s) URLs only) are removed. Output stops at
+    ``max_length`` characters with all open tags closed. Plain text is
+    collected alongside for the excerpt.
+    """
+
+    def __init__(self, max_length=MAX_HTML_LENGTH):
+        super().__init__(convert_charrefs=True)
+        self.max_length = max_length
+        self.parts = []
+        self.length = 0
+        self.open_tags = []
+        self.dropping = 0
+        self.truncated = False
+        self.text = []
+
+    def room(self):
+        """
+        Characters still available, keeping space to close the open tags.
+        """
+        closing = sum(len(tag) + 3 for tag in self.open_tags)
+        return self.max_length - self.length - closing
+
+    def emit(self, markup):
+        if self.truncated:
+            return False
+        if len(markup) > self.room():
+            self.truncated = True
+            return False
+        self.parts.append(markup)
+        self.length += len(markup)
+        return True
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROP_CONTENT_TAGS:
+            self.dropping += 1
+            return
+        if tag in BLOCK_TAGS:
+            self.text.append(" ")
+        if self.dropping or tag not in ALLOWED_TAGS:
+            return
+
+        if tag in SELF_NESTING_TAGS and self.open_tags and self.open_tags[-1] == tag:
+            self.handle_endtag(tag)
+
+        allowed = ALLOWED_ATTRIBUTES.get(tag, set())
+        kept = []
+        for name, value in attrs:
+            if name not in allowed or value is None:
+                continue
+            if name in URL_ATTRIBUTES:
+                value = safe_url(value)
+                if value is None:
+                    continue
+            kept.append(f' {name}="{escape(value)}"')
+        if tag == "a":
+            kept.append(' rel="nofollow noopener noreferrer" target="_blank"')
+        if self.emit(f"<{tag}{''.join(kept)}>") and tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROP_CONTENT_TAGS:
+            self.dropping = max(self.dropping - 1, 0)
+            return
+        if tag in BLOCK_TAGS:
+            self.text.append(" ")
+        if self.dropping or tag not in self.open_tags:
+            return
+        # Close anything left open inside this element first.
+        while self.open_tags:
+            open_tag = self.open_tags.pop()
+            self.parts.append(f"</{open_tag}>")
+            self.length += len(open_tag) + 3
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if self.dropping:
+            return
+        self.text.append(data)
+        if self.truncated or self.emit(escape(data, quote=False)):
+            return
+        # Fit as many whole words of the text as there is room for.
+        room = self.room() - 1
+        end = size = 0
+        for char in data[:room]:
+            size += len(escape(char, quote=False))
+            if size > room:
+                break
+            end += 1
+        data = data[:end].rsplit(" ", 1)[0] if " " in data[:end] else data[:end]
+        self.parts.append(escape(data, quote=False) + "…")
+        self.length += len(self.parts[-1])
+
+    def close(self):
+        super().close()
+        while self.open_tags:
+            self.parts.append(f"</{self.open_tags.pop()}>")
+        return "".join(self.parts)
+
+
+def excerpt(text, length=EXCERPT_LENGTH):
+    """
+    Collapses whitespace and shortens ``text`` to about ``length`` characters at a word boundary.
+    """
+    text = WHITESPACE_RE.sub(" ", text).strip()
+    if len(text) <= length:
+        return text
+    return text[:length].rsplit(" ", 1)[0].rstrip(" .,;:") + "…"
+
+
+def render_description(description):
+    """
+    Turns a raw entry description into sanitized HTML and a plain-text excerpt.
+
+    Input beyond ``MAX_INPUT_LENGTH`` is ignored and the HTML is capped at
+    ``MAX_HTML_LENGTH``, so the cost is bounded however large the entry.
+
+    Args:
+        description (str): The publisher's HTML (or plain text).
+
+    Returns:
+        tuple: ``(html, excerpt)``.
+    """
+    parser = DescriptionSanitizer()
+    parser.feed(description[:MAX_INPUT_LENGTH])
+    html = parser.close()
+    return html, excerpt("".join(parser.text))
+
+
+def restore_search_triggers(apps, schema_editor):
+    # Adding the columns rebuilt feeds_rssitem on SQLite, dropping the FTS triggers.
+    restore_triggers(schema_editor.connection, rebuild=True)
+
+
+def render_existing(apps, schema_editor):
+    """
+    Sanitizes the descriptions of items stored before rendering moved to ingest.
+    """
+    RSSItem = apps.get_model("feeds", "RSSItem")
+    last_pk = 0
+    while True:
+        batch = list(RSSItem.objects.filter(pk__gt=last_pk).order_by("pk").only("pk", "description")[:500])
+        if not batch:
+            break
+        for item in batch:
+            item.description_html, item.excerpt = render_description(item.description)
+        RSSItem.objects.bulk_update(batch, ["description_html", "excerpt"])
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feeds', '0016_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rssitem',
+            name='description_html',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='rssitem',
+            name='excerpt',
+            field=models.CharField(blank=True, max_length=300),
+        ),
+        migrations.RunPython(restore_search_triggers, migrations.RunPython.noop),
+        migrations.RunPython(render_existing, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2 on 2026-10-18 12:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feeds', '0018_thumbnail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FetchStats',
+            fields=[
+                ('source', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='fetch_stats', serialize=False, to='feeds.feedsource')),
+                ('fetches', models.PositiveIntegerField(default=0)),
+                ('errors', models.PositiveIntegerField(default=0)),
+                ('last_status', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('last_error', models.CharField(blank=True, max_length=255)),
+                ('last_duration', models.FloatField(blank=True, null=True)),
+                ('avg_duration', models.FloatField(blank=True, null=True)),
+                ('last_bytes', models.PositiveIntegerField(default=0)),
+                ('total_bytes', models.PositiveBigIntegerField(default=0)),
+                ('last_entries', models.PositiveIntegerField(default=0)),
+                ('last_created', models.PositiveIntegerField(default=0)),
+                ('total_created', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='HistogramBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=64)),
+                ('le', models.FloatField()),
+                ('count', models.PositiveBigIntegerField(default=0)),
+                ('total', models.FloatField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('metric', 'le'), name='histogrambucket_unique_le')],
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2 on 2026-10-18 12:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feeds', '0019_fetch_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('read', models.BooleanField(blank=True, null=True)),
+                ('watermark', models.PositiveBigIntegerField(default=0)),
+                ('starred', models.BooleanField(default=False)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='rssfeed',
+            name='read_up_to',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='rssitem',
+            index=models.Index(fields=['source', 'id'], name='rssitem_source_id'),
+        ),
+        migrations.AddField(
+            model_name='itemstate',
+            name='feed',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='item_states', to='feeds.rssfeed'),
+        ),
+        migrations.AddField(
+            model_name='itemstate',
+            name='item',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='states', to='feeds.rssitem'),
+        ),
+        migrations.AddConstraint(
+            model_name='itemstate',
+            constraint=models.UniqueConstraint(fields=('feed', 'item'), name='itemstate_unique_item'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 12:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feeds', '0020_item_state'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedsource',
+            name='pruned_through',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,113 @@
+# Generated by Django 5.2 on 2026-10-18 13:23
+
+import importlib
+
+from django.db import migrations, models
+
+# The sanitizer frozen by 0017, which also collects the visible text.
+frozen = importlib.import_module("feeds.migrations.0017_rssitem_description_html")
+
+SEARCH_TEXT_LENGTH = 20_000
+
+
+def fill_search_text(apps, schema_editor):
+    """
+    Stores the plain text of existing descriptions, for the search index.
+    """
+    RSSItem = apps.get_model("feeds", "RSSItem")
+    last_pk = 0
+    while True:
+        batch = list(RSSItem.objects.filter(pk__gt=last_pk).order_by("pk").only("pk", "description")[:500])
+        if not batch:
+            break
+        for item in batch:
+            parser = frozen.DescriptionSanitizer()
+            parser.feed(item.description[:frozen.MAX_INPUT_LENGTH])
+            parser.close()
+            text = frozen.WHITESPACE_RE.sub(" ", "".join(parser.text)).strip()
+            item.search_text = text[:SEARCH_TEXT_LENGTH]
+        RSSItem.objects.bulk_update(batch, ["search_text"])
+        last_pk = batch[-1].pk
+
+
+def fts_table(column):
+    """
+    Statements creating the FTS5 index and its triggers over ``title`` and ``column``.
+    """
+    return [
+        f"""
+        CREATE VIRTUAL TABLE feeds_rssitem_fts USING fts5(
+            title, {column}, content='feeds_rssitem', content_rowid='id', tokenize='porter unicode61'
+        )
+        """,
+        f"""
+        CREATE TRIGGER feeds_rssitem_fts_insert AFTER INSERT ON feeds_rssitem BEGIN
+            INSERT INTO feeds_rssitem_fts(rowid, title, {column})
+            VALUES (new.id, new.title, new.{column});
+        END
+        """,
+        f"""
+        CREATE TRIGGER feeds_rssitem_fts_delete AFTER DELETE ON feeds_rssitem BEGIN
+            INSERT INTO feeds_rssitem_fts(feeds_rssitem_fts, rowid, title, {column})
+            VALUES ('delete', old.id, old.title, old.{column});
+        END
+        """,
+        f"""
+        CREATE TRIGGER feeds_rssitem_fts_update AFTER UPDATE OF title, {column} ON feeds_rssitem BEGIN
+            INSERT INTO feeds_rssitem_fts(feeds_rssitem_fts, rowid, title, {column})
+            VALUES ('delete', old.id, old.title, old.{column});
+            INSERT INTO feeds_rssitem_fts(rowid, title, {column})
+            VALUES (new.id, new.title, new.{column});
+        END
+        """,
+        "INSERT INTO feeds_rssitem_fts(feeds_rssitem_fts) VALUES ('rebuild')",
+    ]
+
+
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS feeds_rssitem_fts_update",
+    "DROP TRIGGER IF EXISTS feeds_rssitem_fts_delete",
+    "DROP TRIGGER IF EXISTS feeds_rssitem_fts_insert",
+    "DROP TABLE IF EXISTS feeds_rssitem_fts",
+]
+
+
+def postgres_index(column):
+    # Must match the expression in feeds.services.search.POSTGRES_DOCUMENT.
+    return [
+        "DROP INDEX IF EXISTS feeds_rssitem_search",
+        f"""
+        CREATE INDEX feeds_rssitem_search ON feeds_rssitem USING gin ((
+            setweight(to_tsvector('english', title), 'A') || setweight(to_tsvector('english', {column}), 'B')
+        ))
+        """,
+    ]
+
+
+def run_for_vendor(sqlite, postgresql):
+    def run(apps, schema_editor):
+        statements = {"sqlite": sqlite, "postgresql": postgresql}.get(schema_editor.connection.vendor, [])
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feeds', '0021_feedsource_pruned_through'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rssitem',
+            name='search_text',
+            field=models.TextField(blank=True),
+        ),
+        migrations.RunPython(fill_search_text, migrations.RunPython.noop),
+        # Index the sanitized text rather than the publisher's markup.
+        migrations.RunPython(
+            run_for_vendor(SQLITE_DROP + fts_table("search_text"), postgres_index("search_text")),
+            run_for_vendor(SQLITE_DROP + fts_table("description"), postgres_index("description")),
+        ),
+    ]
@@ -1,22 +1,343 @@
+from urllib.parse import urlsplit, urlunsplit
 from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Coalesce, Greatest
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 User = get_user_model()
 
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url):
+    """
+    Canonical form of a feed URL, used to share one FeedSource between users.
+
+    Lower-cases the scheme and host, drops default ports and fragments and
+    turns an empty path into ``/``. The path and query are kept as-is.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    if parts.username:
+        userinfo = parts.username + (f":{parts.password}" if parts.password else "")
+        host = f"{userinfo}@{host}"
+    return urlunsplit((scheme, host, parts.path or "/", parts.query, ""))
+
+
+class FeedSourceQuerySet(models.QuerySet):
+    def for_url(self, url):
+        """
+        Returns the source for ``url``, creating it if needed.
+        """
+        source, _ = self.get_or_create(url=normalize_url(url))
+        return source
+
+    def subscribed(self):
+        """
+        Sources with at least one subscription.
+        """
+        return self.filter(models.Exists(RSSFeed.objects.filter(source=models.OuterRef("pk"))))
+
+    def due(self, now=None):
+        """
+        Subscribed sources whose next scheduled fetch is at or before ``now``, oldest first.
+        """
+        return (
+            self.filter(next_fetch_at__lte=now or timezone.now())
+            .subscribed()
+            .order_by("next_fetch_at")
+        )
+
+
+class FeedSource(models.Model):
+    """
+    A feed document, shared by every user subscribed to the same URL.
+
+    Owns the fetched items and the fetch state, so fetch cost and item
+    storage scale with unique URLs rather than with subscriptions.
+    """
+    url = models.URLField(max_length=255, unique=True)
+    title = models.CharField(max_length=255, blank=True)
+    etag = models.CharField(max_length=255, blank=True)
+    modified = models.CharField(max_length=64, blank=True)
+    last_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    last_fetched_at = models.DateTimeField(null=True, blank=True)
+    next_fetch_at = models.DateTimeField(default=timezone.now, db_index=True)
+    poll_interval = models.PositiveIntegerField(null=True, blank=True)
+    error_count = models.PositiveIntegerField(default=0)
+    item_count = models.PositiveIntegerField(default=0)
+    latest_pub_date = models.DateTimeField(null=True, blank=True)
+    # Newest pub_date removed by pruning; entries at or before it that are
+    # no longer stored are not ingested again.
+    pruned_through = models.DateTimeField(null=True, blank=True)
+    # Last time a fetch changed something shown to subscribers.
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    objects = FeedSourceQuerySet.as_manager()
+
+    def __str__(self):
+        return self.url
+
+    def record_items(self, created, newest):
+        """
+        Updates the denormalized item statistics after an ingest.
+
+        Uses a single UPDATE with database-side arithmetic so concurrent
+        writers and stale instances cannot lose counts.
+
+        Args:
+            created (int): Number of items inserted.
+            newest (datetime): The most recent ``pub_date`` in the batch.
+        """
+        FeedSource.objects.filter(pk=self.pk).update(
+            item_count=models.F("item_count") + created,
+            latest_pub_date=Coalesce(Greatest("latest_pub_date", Value(newest)), Value(newest)),
+        )
+        self.item_count += created
+        self.latest_pub_date = max(filter(None, [self.latest_pub_date, newest]))
+
+    @property
+    def is_pending(self):
+        """
+        True until the first fetch of this source has completed.
+        """
+        return self.last_fetched_at is None
+
+    @property
+    def has_error(self):
+        """
+        True if the latest fetch of this source failed.
+        """
+        return self.error_count > 0
+
+
 class RSSFeed(models.Model):
+    """
+    A user's subscription to a FeedSource, holding per-user settings.
+    """
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="feeds")
     url = models.URLField()
     title = models.CharField(max_length=255, blank=True)
+    source = models.ForeignKey(FeedSource, on_delete=models.CASCADE, related_name="subscriptions")
+    # Read watermark: items of the source with an id up to this are read,
+    # apart from the exceptions recorded in ItemState.
+    read_up_to = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
     def __str__(self):
         return self.url
 
+    def save(self, *args, **kwargs):
+        """
+        Points the subscription at the source for its URL before saving.
+
+        Moving to another source resets the read state, which refers to the
+        old source's items.
+        """
+        moved = False
+        if self.source_id is None or normalize_url(self.url) != self.source.url:
+            moved = self.pk is not None
+            self.source = FeedSource.objects.for_url(self.url)
+            self.read_up_to = 0
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "source", "read_up_to"}
+        super().save(*args, **kwargs)
+        if moved:
+            self.item_states.all().delete()
+
+    @property
+    def items(self):
+        """
+        The items of the subscribed source.
+        """
+        return self.source.items
+
+    @property
+    def display_title(self):
+        """
+        The user's custom title, falling back to the channel title and URL.
+        """
+        return self.title or self.source.title or self.url
+
+
+class Thumbnail(models.Model):
+    """
+    Resized copies of an item image, generated in the background.
+
+    Files are named after the SHA-256 of the original image, so the same
+    picture behind several URLs is stored once and its URLs never change.
+    """
+    PENDING = "pending"
+    READY = "ready"
+    FAILED = "failed"
+    STATUS_CHOICES = [(PENDING, "Pending"), (READY, "Ready"), (FAILED, "Failed")]
+
+    url = models.URLField(max_length=500, unique=True)
+    digest = models.CharField(max_length=64, blank=True, db_index=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    error = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.url
+
+    @property
+    def is_ready(self):
+        """
+        True once the resized files have been generated.
+        """
+        return self.status == self.READY
+
+
+class RSSItemQuerySet(models.QuerySet):
+    def for_user(self, user):
+        """
+        Items of every source ``user`` is subscribed to.
+
+        To page through them newest first, pass the source ids to
+        ``KeysetPaginator(sources=...)`` instead, which reads only the
+        newest items of each source.
+        """
+        return self.filter(source__in=RSSFeed.objects.filter(user=user).values("source"))
+
 
 class RSSItem(models.Model):
-    feed = models.ForeignKey(RSSFeed, on_delete=models.CASCADE, related_name="items")
+    # Lookups by source are served by the composite index below.
+    source = models.ForeignKey(FeedSource, on_delete=models.CASCADE, related_name="items", db_index=False)
     title = models.CharField(max_length=200)
     description = models.TextField()
+    # Sanitized, size-capped rendering of ``description`` made at ingest time.
+    description_html = models.TextField(blank=True)
+    excerpt = models.CharField(max_length=300, blank=True)
+    # Plain text of the description, indexed for search.
+    search_text = models.TextField(blank=True)
     pub_date = models.DateTimeField()
     link = models.URLField(blank=True, null=True)
-    image_url = models.URLField(blank=True, null=True)
+    image_url = models.URLField(max_length=500, blank=True, null=True)
+    thumbnail = models.ForeignKey(Thumbnail, null=True, blank=True, on_delete=models.SET_NULL, related_name="items")
+    guid = models.CharField(max_length=255)
+    content_hash = models.CharField(max_length=64, blank=True)
+
+    objects = RSSItemQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            # Deduplication key: the entry's guid, link or a hash of its title.
+            models.UniqueConstraint(fields=["source", "guid"], name="rssitem_unique_guid"),
+        ]
+        indexes = [
+            # Per-feed timelines and keyset pagination on (pub_date, id).
+            models.Index(fields=["source", "-pub_date", "-id"], name="rssitem_source_timeline"),
+            # The river across all of a user's sources, scanned newest first.
+            models.Index(fields=["-pub_date", "-id"], name="rssitem_timeline"),
+            # Items above a subscription's read watermark, for unread counts.
+            models.Index(fields=["source", "id"], name="rssitem_source_id"),
+        ]
+
     def __str__(self):
         return self.title
+
+
+class ItemState(models.Model):
+    """
+    A user's exception to the read watermark of a subscription, or a star.
+
+    Most items are read or unread by their position relative to
+    ``RSSFeed.read_up_to``, so rows exist only for items read above the
+    watermark, marked unread below it, or starred. ``read`` applies only
+    while ``watermark`` still equals the subscription's ``read_up_to``:
+    moving the watermark (mark all as read) overrides every earlier
+    exception at once without touching this table.
+    """
+    feed = models.ForeignKey(RSSFeed, on_delete=models.CASCADE, related_name="item_states")
+    item = models.ForeignKey(RSSItem, on_delete=models.CASCADE, related_name="states")
+    read = models.BooleanField(null=True, blank=True)
+    watermark = models.PositiveBigIntegerField(default=0)
+    starred = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["feed", "item"], name="itemstate_unique_item")]
+
+    def __str__(self):
+        return f"State of {self.item_id} for feed {self.feed_id}"
+
+
+class Job(models.Model):
+    """
+    A unit of background work in the database-backed job queue.
+
+    Jobs are claimed by ``run_feed_worker`` and dispatched to the handler
+    registered for their ``kind`` in ``feeds.services.jobs``.
+    """
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [(QUEUED, "Queued"), (RUNNING, "Running"), (DONE, "Done"), (FAILED, "Failed")]
+
+    kind = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=64, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "run_after"])]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+
+class FetchStats(models.Model):
+    """
+    Rolling fetch statistics of one source, updated after every fetch.
+
+    Keeps the latest values, running totals and moving averages rather
+    than a row per fetch, so its size does not grow over time.
+    """
+    source = models.OneToOneField(FeedSource, on_delete=models.CASCADE, primary_key=True, related_name="fetch_stats")
+    fetches = models.PositiveIntegerField(default=0)
+    errors = models.PositiveIntegerField(default=0)
+    last_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    last_error = models.CharField(max_length=255, blank=True)
+    last_duration = models.FloatField(null=True, blank=True)
+    # Exponentially weighted moving average of the fetch duration, in seconds.
+    avg_duration = models.FloatField(null=True, blank=True)
+    last_bytes = models.PositiveIntegerField(default=0)
+    total_bytes = models.PositiveBigIntegerField(default=0)
+    last_entries = models.PositiveIntegerField(default=0)
+    last_created = models.PositiveIntegerField(default=0)
+    total_created = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Fetch stats for {self.source}"
+
+
+class HistogramBucket(models.Model):
+    """
+    One cumulative bucket of a Prometheus histogram, shared by all processes.
+
+    A bucket counts the observations less than or equal to ``le``; the
+    ``+Inf`` bucket counts all of them and its ``total`` is the histogram's
+    sum. Observations are recorded with a single UPDATE, so the web server
+    can export what the workers measured.
+    """
+    metric = models.CharField(max_length=64)
+    le = models.FloatField()
+    count = models.PositiveBigIntegerField(default=0)
+    total = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["metric", "le"], name="histogrambucket_unique_le")]
+
+    def __str__(self):
+        return f"{self.metric} le={self.le}"
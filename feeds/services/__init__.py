@@ -1 +1,2 @@
-from .rss_parser import parse_and_save_feed
+from .rss_parser import IngestResult, aparse_and_save_feed, parse_and_save_feed
+from .refresh import arefresh_sources, refresh_sources
@@ -0,0 +1,164 @@
+import logging
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+from django.db.models import F
+from django.utils import timezone
+from feeds.models import FeedSource, Job
+from feeds.services.refresh import refresh_sources
+from feeds.services.thumbnails import make_thumbnails
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 3
+RETRY_DELAY = timedelta(minutes=1)
+STALE_AFTER = timedelta(minutes=30)
+HANDLERS = {}
+
+
+def job_handler(kind):
+    """
+    Registers a function as the handler for jobs of ``kind``.
+
+    Handlers receive a list of claimed jobs of that kind, so they can batch
+    work, and return a dict mapping job ids to an error message for the jobs
+    that failed. Jobs not in the dict are marked done.
+    """
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+def enqueue(kind, **payload):
+    """
+    Adds a job to the queue.
+
+    Args:
+        kind (str): A kind registered with ``job_handler``.
+        **payload: JSON-serializable arguments for the handler.
+
+    Returns:
+        Job: The queued job.
+    """
+    return Job.objects.create(kind=kind, payload=payload)
+
+
+def claim_jobs(limit, now=None):
+    """
+    Atomically claims up to ``limit`` queued jobs that are ready to run.
+
+    Claiming is a conditional UPDATE, so several workers can poll the same
+    queue without running a job twice. Jobs left running for longer than
+    ``STALE_AFTER`` (e.g. by a crashed worker) are put back in the queue.
+
+    Returns:
+        list: The claimed Job instances.
+    """
+    now = now or timezone.now()
+    Job.objects.filter(status=Job.RUNNING, updated_at__lt=now - STALE_AFTER).update(
+        status=Job.QUEUED, locked_by=""
+    )
+    token = uuid.uuid4().hex
+    ids = list(
+        Job.objects.filter(status=Job.QUEUED, run_after__lte=now)
+        .order_by("run_after")
+        .values_list("pk", flat=True)[:limit]
+    )
+    Job.objects.filter(pk__in=ids, status=Job.QUEUED).update(
+        status=Job.RUNNING, locked_by=token, attempts=F("attempts") + 1, updated_at=now
+    )
+    return list(Job.objects.filter(locked_by=token, status=Job.RUNNING))
+
+
+def run_jobs(limit=100):
+    """
+    Claims a batch of jobs and runs them through their handlers.
+
+    A handler exception requeues its jobs with a delay until they have been
+    attempted ``MAX_ATTEMPTS`` times, after which they are marked failed.
+
+    Args:
+        limit (int): Maximum number of jobs to claim.
+
+    Returns:
+        int: The number of jobs processed.
+    """
+    jobs = claim_jobs(limit)
+    by_kind = defaultdict(list)
+    for job in jobs:
+        by_kind[job.kind].append(job)
+
+    for kind, batch in by_kind.items():
+        handler = HANDLERS.get(kind)
+        if handler is None:
+            Job.objects.filter(pk__in=[job.pk for job in batch]).update(
+                status=Job.FAILED, error=f"No handler for job kind {kind!r}"
+            )
+            continue
+        try:
+            errors = handler(batch) or {}
+        except Exception as exc:
+            logger.exception("Job handler %s failed", kind)
+            for job in batch:
+                if job.attempts < MAX_ATTEMPTS:
+                    job.status = Job.QUEUED
+                    job.run_after = timezone.now() + RETRY_DELAY * job.attempts
+                else:
+                    job.status = Job.FAILED
+                job.error = str(exc)
+                job.save(update_fields=["status", "run_after", "error", "updated_at"])
+            continue
+        for job in batch:
+            job.status = Job.FAILED if job.pk in errors else Job.DONE
+            job.error = errors.get(job.pk, "")
+            job.save(update_fields=["status", "error", "updated_at"])
+    return len(jobs)
+
+
+def enqueue_fetch(source):
+    """
+    Queues the first fetch of a source unless one is already waiting.
+    """
+    waiting = Job.objects.filter(
+        kind="fetch_source", status__in=[Job.QUEUED, Job.RUNNING], payload__source_id=source.pk
+    )
+    if not waiting.exists():
+        enqueue("fetch_source", source_id=source.pk)
+
+
+@job_handler("fetch_source")
+def fetch_sources(jobs):
+    """
+    Fetches and ingests the sources of a batch of jobs concurrently.
+    """
+    jobs_by_source = defaultdict(list)
+    for job in jobs:
+        jobs_by_source[job.payload["source_id"]].append(job)
+    sources = list(FeedSource.objects.filter(pk__in=jobs_by_source))
+
+    errors = {}
+    missing = jobs_by_source.keys() - {source.pk for source in sources}
+    for source_id in missing:
+        for job in jobs_by_source[source_id]:
+            errors[job.pk] = "Feed source no longer exists"
+
+    report = refresh_sources(sources)
+    for outcome in report.outcomes:
+        if outcome.error:
+            for job in jobs_by_source[outcome.source.pk]:
+                errors[job.pk] = outcome.error
+    return errors
+
+
+@job_handler("thumbnail")
+def generate_thumbnails(jobs):
+    """
+    Generates the thumbnails queued by ingests, one batch for all jobs.
+    """
+    errors = make_thumbnails({pk for job in jobs for pk in job.payload["thumbnail_ids"]})
+    return {
+        job.pk: "; ".join(errors[pk] for pk in job.payload["thumbnail_ids"] if pk in errors)
+        for job in jobs
+        if any(pk in errors for pk in job.payload["thumbnail_ids"])
+    }
@@ -0,0 +1,179 @@
+import logging
+import math
+from django.db import transaction
+from django.db.models import Case, F, FloatField, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import Coalesce
+from feeds.models import FetchStats, HistogramBucket
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest fetch in the moving average duration.
+EWMA_WEIGHT = 0.2
+SLOWEST_SOURCES = 20
+HISTOGRAMS = {
+    "feeds_fetch_duration_seconds": (
+        "Time to download a feed document.",
+        (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+    ),
+    "feeds_parse_duration_seconds": (
+        "Time to parse a downloaded feed document.",
+        (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5),
+    ),
+    "feeds_db_write_duration_seconds": (
+        "Time to store the result of a fetch.",
+        (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5),
+    ),
+}
+
+
+def observe(values):
+    """
+    Adds one observation to each of several histograms with a single UPDATE.
+
+    Every bucket at or above its metric's value is incremented and its
+    ``total`` grows by the value. Buckets are created on first use, which
+    is detected by fewer rows being updated than the bounds call for.
+
+    Args:
+        values (dict): Observed values by metric name, a subset of ``HISTOGRAMS``.
+    """
+    values = {metric: value for metric, value in values.items() if value is not None}
+    if not values:
+        return
+    matching = Q()
+    for metric, value in values.items():
+        matching |= Q(metric=metric, le__gte=value)
+    added = Case(
+        *(When(metric=metric, then=Value(float(value))) for metric, value in values.items()),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+    buckets = HistogramBucket.objects.filter(matching)
+    expected = sum(1 + sum(le >= value for le in HISTOGRAMS[metric][1]) for metric, value in values.items())
+    if buckets.update(count=F("count") + 1, total=F("total") + added) >= expected:
+        return
+    # Some buckets do not exist yet: undo, create them and count again.
+    with transaction.atomic():
+        buckets.update(count=F("count") - 1, total=F("total") - added)
+        HistogramBucket.objects.bulk_create(
+            [
+                HistogramBucket(metric=metric, le=le)
+                for metric in values
+                for le in (*HISTOGRAMS[metric][1], math.inf)
+            ],
+            ignore_conflicts=True,
+        )
+        buckets.update(count=F("count") + 1, total=F("total") + added)
+
+
+def record_fetch_stats(source, parsed, result, error="", write_duration=None):
+    """
+    Records the measurements of one fetch and ingest.
+
+    Updates the source's FetchStats row with database-side arithmetic
+    (creating it on the first fetch) and observes the fetch, parse and
+    write durations in one more query.
+
+    Args:
+        source (FeedSource): The source that was fetched.
+        parsed (FeedParserDict): The result of ``fetch_feed``, carrying
+            ``fetch_duration``, ``parse_duration`` and ``bytes`` when measured.
+        result (IngestResult): What the ingest stored.
+        error (str): Why the fetch failed, if it did.
+        write_duration (float, optional): Seconds spent storing the result.
+    """
+    duration = getattr(parsed, "fetch_duration", None)
+    size = getattr(parsed, "bytes", None) or 0
+    status = getattr(parsed, "status", None)
+    entries = result.created + result.updated + result.skipped
+    logger.info(
+        "Fetched source %s: status=%s bytes=%s entries=%s created=%s duration=%s error=%s",
+        source.pk, status, size, entries, result.created, duration, error or "-",
+    )
+
+    changes = {
+        "fetches": F("fetches") + 1,
+        "errors": F("errors") + (1 if error else 0),
+        "last_status": status,
+        "last_error": error[:255],
+        "last_bytes": size,
+        "total_bytes": F("total_bytes") + size,
+        "last_entries": entries,
+        "last_created": result.created,
+        "total_created": F("total_created") + result.created,
+    }
+    if duration is not None:
+        changes["last_duration"] = duration
+        changes["avg_duration"] = Coalesce(
+            F("avg_duration") * (1 - EWMA_WEIGHT) + duration * EWMA_WEIGHT, Value(duration), output_field=FloatField()
+        )
+    if not FetchStats.objects.filter(source=source).update(**changes):
+        FetchStats.objects.bulk_create([FetchStats(source=source)], ignore_conflicts=True)
+        FetchStats.objects.filter(source=source).update(**changes)
+
+    observe({
+        "feeds_fetch_duration_seconds": duration,
+        "feeds_parse_duration_seconds": getattr(parsed, "parse_duration", None),
+        "feeds_db_write_duration_seconds": write_duration,
+    })
+
+
+def format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def escape_label(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render_metrics():
+    """
+    Renders the fetch metrics in the Prometheus text exposition format.
+
+    Includes the duration histograms, fetch counters summed over all
+    sources and the moving average duration of the slowest sources.
+
+    Returns:
+        str: The metrics page.
+    """
+    lines = []
+    buckets = {}
+    for bucket in HistogramBucket.objects.order_by("metric", "le"):
+        buckets.setdefault(bucket.metric, []).append(bucket)
+    for metric, (help_text, bounds) in HISTOGRAMS.items():
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+        rows = buckets.get(metric) or [HistogramBucket(metric=metric, le=le) for le in (*bounds, math.inf)]
+        for bucket in rows:
+            lines.append(f'{metric}_bucket{{le="{format_value(bucket.le)}"}} {bucket.count}')
+        lines.append(f"{metric}_sum {format_value(rows[-1].total)}")
+        lines.append(f"{metric}_count {rows[-1].count}")
+
+    totals = FetchStats.objects.aggregate(
+        fetches=Coalesce(Sum("fetches"), 0, output_field=IntegerField()),
+        errors=Coalesce(Sum("errors"), 0, output_field=IntegerField()),
+        bytes=Coalesce(Sum("total_bytes"), 0, output_field=IntegerField()),
+        created=Coalesce(Sum("total_created"), 0, output_field=IntegerField()),
+    )
+    for name, key, help_text in (
+        ("feeds_fetches_total", "fetches", "Feed fetches, including failures."),
+        ("feeds_fetch_errors_total", "errors", "Feed fetches that failed."),
+        ("feeds_fetched_bytes_total", "bytes", "Bytes of feed documents downloaded."),
+        ("feeds_items_created_total", "created", "Items inserted by ingests."),
+    ):
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter", f"{name} {totals[key]}"]
+
+    name = "feeds_source_fetch_duration_seconds"
+    lines += [
+        f"# HELP {name} Moving average fetch duration of the {SLOWEST_SOURCES} slowest sources.",
+        f"# TYPE {name} gauge",
+    ]
+    slowest = (
+        FetchStats.objects.filter(avg_duration__isnull=False)
+        .order_by("-avg_duration")
+        .values_list("source__url", "avg_duration")[:SLOWEST_SOURCES]
+    )
+    for url, duration in slowest:
+        lines.append(f'{name}{{url="{escape_label(url)}"}} {format_value(duration)}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,204 @@
+"""
+Per-subscription read and starred state.
+
+Each subscription keeps a watermark, ``RSSFeed.read_up_to``: items of its
+source with an id at or below it are read, newer ones are unread. Item ids
+only grow, so items fetched later are always unread. Individual changes
+against the watermark, and stars, are sparse ``ItemState`` rows that carry
+the watermark they were recorded under and lapse once it moves.
+"""
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from feeds.cache import bump_feed, bump_versions
+from feeds.models import ItemState, RSSFeed, RSSItem
+
+
+def _count(queryset, group):
+    """
+    Counts the rows of a correlated queryset, as a subquery expression.
+    """
+    counted = queryset.order_by().values(group).annotate(total=Count("pk")).values("total")
+    return Coalesce(Subquery(counted), Value(0))
+
+
+def with_unread_counts(feeds):
+    """
+    Annotates subscriptions with ``unread_count``.
+
+    The count is the number of items above the watermark, read on the
+    ``(source, id)`` index, corrected by the current exceptions, all in the
+    same query as the subscriptions themselves.
+
+    Args:
+        feeds (QuerySet): RSSFeed objects.
+
+    Returns:
+        QuerySet: The subscriptions with ``unread_count`` set.
+    """
+    current = ItemState.objects.filter(feed=OuterRef("pk"), watermark=OuterRef("read_up_to"))
+    above = RSSItem.objects.filter(source=OuterRef("source"), pk__gt=OuterRef("read_up_to"))
+    return feeds.annotate(
+        unread_count=_count(above, "source")
+        - _count(current.filter(read=True), "feed")
+        + _count(current.filter(read=False), "feed")
+    )
+
+
+def unread_items(feed, items=None):
+    """
+    Filters items down to those unread in a subscription.
+
+    Args:
+        feed (RSSFeed): The subscription.
+        items (QuerySet, optional): Items of its source; all of them by default.
+
+    Returns:
+        QuerySet: The unread items.
+    """
+    items = feed.items.all() if items is None else items
+    current = ItemState.objects.filter(feed=feed, watermark=feed.read_up_to)
+    return items.filter(
+        (Q(pk__gt=feed.read_up_to) & ~Q(pk__in=current.filter(read=True).values("item")))
+        | Q(pk__in=current.filter(read=False).values("item"))
+    )
+
+
+def apply_item_state(feeds, items):
+    """
+    Sets ``feed_pk``, ``is_read`` and ``is_starred`` on items for rendering.
+
+    Args:
+        feeds (iterable): The user's subscriptions; an item is matched to
+            the subscription of its source.
+        items (iterable): RSSItem instances.
+    """
+    by_source, items = {feed.source_id: feed for feed in feeds}, list(items)
+    _set_item_state(by_source, items, _states_of(by_source, items))
+
+
+async def aapply_item_state(feeds, items):
+    """
+    Asynchronous ``apply_item_state``, using the async ORM.
+    """
+    by_source, items = {feed.source_id: feed for feed in feeds}, list(items)
+    _set_item_state(by_source, items, [state async for state in _states_of(by_source, items)])
+
+
+def _states_of(by_source, items):
+    return ItemState.objects.filter(
+        feed__in=[feed.pk for feed in by_source.values()], item__in=[item.pk for item in items]
+    )
+
+
+def _set_item_state(by_source, items, states):
+    states = {(state.feed_id, state.item_id): state for state in states}
+    for item in items:
+        feed = by_source.get(item.source_id)
+        state = states.get((feed.pk, item.pk)) if feed else None
+        item.feed_pk = feed.pk if feed else None
+        item.is_read = is_read(feed, item, state) if feed else False
+        item.is_starred = bool(state and state.starred)
+
+
+def is_read(feed, item, state=None):
+    """
+    Whether an item is read in a subscription, given its ItemState row if any.
+    """
+    if state is not None and state.read is not None and state.watermark == feed.read_up_to:
+        return state.read
+    return item.pk <= feed.read_up_to
+
+
+def _touch(feed):
+    """
+    Marks the subscription as changed for its ETags and cached fragments.
+    """
+    RSSFeed.objects.filter(pk=feed.pk).update(updated_at=timezone.now())
+    bump_feed(feed)
+
+
+def _discard(feed, item):
+    """
+    Deletes the item's row once it records neither a star nor a current exception.
+    """
+    ItemState.objects.filter(feed=feed, item=item, starred=False).exclude(
+        read__isnull=False, watermark=feed.read_up_to
+    ).delete()
+
+
+def set_read(feed, item, read=True):
+    """
+    Marks one item of a subscription as read or unread.
+
+    An exception row is only kept when the state differs from what the
+    watermark implies.
+
+    Args:
+        feed (RSSFeed): The subscription, with a current ``read_up_to``.
+        item (RSSItem): An item of its source.
+        read (bool): The new state.
+    """
+    if read != (item.pk <= feed.read_up_to):
+        ItemState.objects.update_or_create(
+            feed=feed, item=item, defaults={"read": read, "watermark": feed.read_up_to}
+        )
+    else:
+        ItemState.objects.filter(feed=feed, item=item).update(read=None)
+        _discard(feed, item)
+    _touch(feed)
+
+
+def set_starred(feed, item, starred=True):
+    """
+    Stars or unstars one item of a subscription.
+
+    Starred items are kept by ``prune_items``.
+
+    Args:
+        feed (RSSFeed): The subscription.
+        item (RSSItem): An item of its source.
+        starred (bool): The new state.
+    """
+    if starred:
+        ItemState.objects.update_or_create(feed=feed, item=item, defaults={"starred": True})
+    else:
+        ItemState.objects.filter(feed=feed, item=item).update(starred=False)
+        _discard(feed, item)
+    _touch(feed)
+
+
+def mark_all_read(feeds):
+    """
+    Marks every item of the given subscriptions as read.
+
+    Each watermark moves to the newest item of its source in a single
+    UPDATE, which retires all earlier exceptions. The watermark stays put
+    when the source has nothing newer, so current read exceptions are
+    cleared in a second UPDATE; either way the rows are then deleted by
+    ``prune_item_states``.
+
+    Args:
+        feeds (QuerySet): RSSFeed objects, such as one subscription or all of a user's.
+
+    Returns:
+        int: Number of subscriptions updated.
+    """
+    newest = RSSItem.objects.filter(source=OuterRef("source")).order_by("-pk").values("pk")[:1]
+    ItemState.objects.filter(feed__in=feeds, read__isnull=False).update(read=None)
+    updated = feeds.update(read_up_to=Coalesce(Subquery(newest), F("read_up_to")), updated_at=timezone.now())
+    if updated:
+        changed = list(feeds.values_list("pk", "user_id"))
+        bump_versions(user_ids=[user_id for _, user_id in changed], feed_ids=[pk for pk, _ in changed])
+    return updated
+
+
+def prune_item_states():
+    """
+    Deletes state rows that no longer record a star or a current exception.
+
+    Returns:
+        int: Number of rows deleted.
+    """
+    stale = ItemState.objects.filter(starred=False).exclude(read__isnull=False, watermark=F("feed__read_up_to"))
+    return stale.delete()[0]
@@ -0,0 +1,158 @@
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+from feeds.cache import bump_source
+from feeds.models import FeedSource, ItemState, RSSItem
+
+DEFAULT_BATCH_SIZE = 500
+
+
+@dataclass
+class PruneResult:
+    """
+    Outcome of pruning one source.
+
+    Attributes:
+        deleted (int): Items removed.
+        batches (int): Delete transactions used.
+    """
+    deleted: int = 0
+    batches: int = 0
+
+
+def expired_items(source, max_items=None, max_age=None, now=None):
+    """
+    Returns the items of a source that fall outside the retention policy.
+
+    An item expires when it is older than ``max_age`` or when more than
+    ``max_items`` newer items exist. The cut-off item for ``max_items`` is
+    found with one lookup on the ``(source, pub_date, id)`` index. Items
+    starred by any subscriber never expire.
+
+    Args:
+        source (FeedSource): The source to inspect.
+        max_items (int, optional): Number of newest items to keep.
+        max_age (timedelta, optional): Age beyond which items are removed.
+        now (datetime, optional): The current time.
+
+    Returns:
+        QuerySet: The expired items; empty when no limit is given.
+    """
+    items = RSSItem.objects.filter(source=source)
+    expired = Q(pk__in=[])
+    if max_age is not None:
+        expired |= Q(pub_date__lt=(now or timezone.now()) - max_age)
+    if max_items is not None:
+        boundary = list(items.order_by("-pub_date", "-id").values_list("pub_date", "id")[max_items:max_items + 1])
+        if boundary:
+            pub_date, pk = boundary[0]
+            expired |= Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lte=pk)
+    return items.filter(expired).exclude(pk__in=ItemState.objects.filter(starred=True).values("item"))
+
+
+def prune_source(source, max_items=None, max_age=None, batch_size=DEFAULT_BATCH_SIZE, pause=0, now=None):
+    """
+    Deletes the expired items of a source in bounded batches.
+
+    Each batch is its own short transaction that also adjusts the source's
+    item count and moves ``pruned_through`` up to the newest deleted
+    ``pub_date``, so entries still listed in the publisher's document are
+    not stored again on the next fetch. Writers are only ever blocked for one batch and an
+    interrupted run leaves consistent data behind; running it again simply
+    continues. Subscribers' cached pages are invalidated once at the end.
+
+    Args:
+        source (FeedSource): The source to prune.
+        max_items (int, optional): Number of newest items to keep.
+        max_age (timedelta, optional): Age beyond which items are removed.
+        batch_size (int): Maximum items deleted per transaction.
+        pause (float): Seconds to sleep between batches.
+        now (datetime, optional): The current time.
+
+    Returns:
+        PruneResult: Number of items deleted and batches used.
+    """
+    result = PruneResult()
+    expired = expired_items(source, max_items=max_items, max_age=max_age, now=now)
+    while True:
+        rows = list(expired.values_list("pk", "pub_date")[:batch_size])
+        if not rows:
+            break
+        pks = [pk for pk, _ in rows]
+        cutoff = max(pub_date for _, pub_date in rows)
+        with transaction.atomic():
+            _, per_model = RSSItem.objects.filter(pk__in=pks).delete()
+            deleted = per_model.get(RSSItem._meta.label, 0)
+            FeedSource.objects.filter(pk=source.pk).update(
+                item_count=F("item_count") - deleted,
+                pruned_through=Greatest(Coalesce("pruned_through", Value(cutoff)), Value(cutoff)),
+            )
+        source.pruned_through = max(filter(None, [source.pruned_through, cutoff]))
+        result.deleted += deleted
+        result.batches += 1
+        if len(pks) < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+
+    if result.deleted:
+        FeedSource.objects.filter(pk=source.pk).update(updated_at=timezone.now())
+        bump_source(source)
+    return result
+
+
+def storage_stats():
+    """
+    Measures the space used by the database, to report what pruning reclaimed.
+
+    Returns:
+        dict: On SQLite, ``used`` and ``free`` bytes of the database file,
+        where ``free`` pages are reused by new rows but only returned to the
+        filesystem by VACUUM. On PostgreSQL, ``used`` is the total size of
+        the item table with its indexes. Empty on other backends.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute("PRAGMA page_size")
+            page_size = cursor.fetchone()[0]
+            cursor.execute("PRAGMA page_count")
+            pages = cursor.fetchone()[0]
+            cursor.execute("PRAGMA freelist_count")
+            free = cursor.fetchone()[0]
+            return {"used": (pages - free) * page_size, "free": free * page_size}
+        if connection.vendor == "postgresql":
+            cursor.execute("SELECT pg_total_relation_size(%s)", [RSSItem._meta.db_table])
+            return {"used": cursor.fetchone()[0]}
+    return {}
+
+
+def vacuum():
+    """
+    Returns free space to the filesystem (SQLite) or to the table (PostgreSQL).
+
+    On SQLite this rewrites the whole database file and blocks writers
+    while it runs.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute("VACUUM")
+        elif connection.vendor == "postgresql":
+            cursor.execute(f"VACUUM {connection.ops.quote_name(RSSItem._meta.db_table)}")
+
+
+def retention_policy(max_items=None, max_age_days=None):
+    """
+    Resolves the retention limits, falling back to the FEEDS_RETENTION_* settings.
+
+    Returns:
+        tuple: ``(max_items, max_age)`` where either may be None.
+    """
+    max_items = max_items if max_items is not None else getattr(settings, "FEEDS_RETENTION_MAX_ITEMS", None)
+    if max_age_days is None:
+        max_age_days = getattr(settings, "FEEDS_RETENTION_MAX_AGE_DAYS", None)
+    return max_items, (timedelta(days=max_age_days) if max_age_days is not None else None)
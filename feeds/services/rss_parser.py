@@ -1,47 +1,676 @@
+import hashlib
+import itertools
+import re
+import time
+import zlib
 import feedparser
+import httpx
+from asgiref.sync import sync_to_async
+from http.client import HTTPException
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from feeds.models import RSSItem
+from xml.etree.ElementTree import ParseError
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone as dj_timezone
+from feeds.cache import bump_source
+from feeds.models import FeedSource, RSSItem, normalize_url
+from feeds.services.http import afetch_document, fetch_document
+from feeds.services.metrics import record_fetch_stats
+from feeds.services.sanitize import render_description
+from feeds.services.stream_parser import iter_document
+from feeds.services.thumbnails import attach_thumbnails
+from feeds.services.scheduler import record_failure, schedule_next_fetch
 
-def parse_and_save_feed(feed):
+TITLE_MAX_LENGTH = RSSItem._meta.get_field("title").max_length
+GUID_MAX_LENGTH = RSSItem._meta.get_field("guid").max_length
+IMAGE_URL_MAX_LENGTH = RSSItem._meta.get_field("image_url").max_length
+UPDATABLE_FIELDS = (
+    "title", "description", "description_html", "excerpt", "pub_date", "link", "image_url", "thumbnail",
+    "content_hash", "search_text",
+)
+FETCH_FIELDS = ["etag", "modified", "last_status", "last_fetched_at", "next_fetch_at", "poll_interval", "error_count"]
+SKIP_HOURS_RE = re.compile(rb"<skipHours>(.*?)</skipHours>", re.DOTALL | re.IGNORECASE)
+HOUR_RE = re.compile(rb"<hour>\s*(\d{1,2})\s*</hour>", re.IGNORECASE)
+DEFAULT_STREAMING_BYTES = 2 * 1024 * 1024
+STREAM_BATCH_SIZE = 100
+
+
+@dataclass
+class IngestResult:
+    """
+    Summary of a single ingest run, used by refresh jobs to report throughput.
+
+    Attributes:
+        created (int): Items inserted by this run.
+        updated (int): Existing items whose content changed and was rewritten.
+        skipped (int): Entries that were invalid or already stored unchanged.
+        not_modified (bool): True when the server answered 304 Not Modified.
+    """
+    created: int = 0
+    updated: int = 0
+    skipped: int = 0
+    not_modified: bool = False
+
+
+def entry_guid(entry, title):
+    """
+    Returns the stable key an entry is deduplicated by within its source.
+
+    Uses the entry's ``id`` (the RSS ``<guid>`` or Atom ``<id>``), falling
+    back to its link and then to a hash of its title. Keys that do not fit
+    the column are hashed.
+
+    Args:
+        entry (dict): A single entry from ``feedparser.parse(...).entries``.
+        title (str): The normalized title of the entry.
+
+    Returns:
+        str: The key to store in ``RSSItem.guid``.
+    """
+    key = (entry.get("id") or entry.get("link") or "").strip()
+    if not key:
+        key = "title:" + hashlib.sha256(title.encode()).hexdigest()
+    elif len(key) > GUID_MAX_LENGTH:
+        key = "sha256:" + hashlib.sha256(key.encode()).hexdigest()
+    return key
+
+
+def entry_image(entry):
+    """
+    Finds the image of an entry.
+
+    Looks at ``media:thumbnail`` first, then image ``media:content`` and
+    finally image enclosures.
+
+    Args:
+        entry (dict): A single entry from ``feedparser.parse(...).entries``.
+
+    Returns:
+        str | None: The image URL, if any fits in ``RSSItem.image_url``.
+    """
+    candidates = [media.get("url") for media in entry.get("media_thumbnail") or []]
+    candidates += [
+        media.get("url")
+        for media in entry.get("media_content") or []
+        if media.get("medium") == "image" or media.get("type", "").startswith("image/")
+    ]
+    candidates += [
+        enclosure.get("href")
+        for enclosure in entry.get("enclosures") or []
+        if enclosure.get("type", "").startswith("image/")
+    ]
+    for url in candidates:
+        if url and len(url) <= IMAGE_URL_MAX_LENGTH:
+            return url
+    return None
+
+
+def content_hash(values):
+    """
+    Hashes the stored content of an entry, to detect edits without comparing fields.
+
+    Args:
+        values (dict): Fields as returned by ``normalize_entry``.
+
+    Returns:
+        str: A hex digest that changes whenever a stored field changes.
+    """
+    pub_date = values["pub_date"].isoformat() if values["pub_date"] else ""
+    parts = [values["title"], values["description"], pub_date, values["link"], values["image_url"] or ""]
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+def normalize_entry(entry):
+    """
+    Converts a feedparser entry into a dict of RSSItem field values.
+
+    Entries without a date get a ``pub_date`` of None; ``save_entries`` dates
+    new items at the time of ingest and keeps the date of existing ones.
+
+    Args:
+        entry (dict): A single entry from ``feedparser.parse(...).entries``.
+
+    Returns:
+        dict | None: The normalized fields, or None if the entry has no title.
+    """
+    title = entry.get("title", "").strip()[:TITLE_MAX_LENGTH]
+    if not title:
+        return None  # skip entries without a title
+
+    published = entry.get("published_parsed") or entry.get("updated_parsed")
+    pub_date = datetime(*published[:6], tzinfo=timezone.utc) if published else None
+
+    image_url = entry_image(entry)
+
+    values = {
+        "guid": entry_guid(entry, title),
+        "title": title,
+        "description": entry.get("summary", "").strip(),
+        "pub_date": pub_date,
+        "link": entry.get("link", "").strip(),
+        "image_url": image_url,
+    }
+    values["content_hash"] = content_hash(values)
+    return values
+
+
+def legacy_guid(values):
+    """
+    Returns the guid migration 0014 gave an item stored before entry ids were kept.
+
+    That backfill could only use the stored link, or the title hash when
+    there was none, so items of feeds whose entry ids differ from their
+    links are found again under this key.
+    """
+    link = values["link"]
+    if link and len(link) <= GUID_MAX_LENGTH:
+        return link
+    return "title:" + hashlib.sha256(values["title"].encode()).hexdigest()
+
+
+def adopt_legacy_items(source, batch, existing):
+    """
+    Matches entries not found by guid to items stored before guids were kept.
+
+    Such items still have an empty ``content_hash``. Each one found is
+    renamed to the entry's guid and added to ``existing``, so it is
+    rewritten instead of stored again.
+
+    Args:
+        source (FeedSource): The source the entries belong to.
+        batch (dict): Normalized entries by guid.
+        existing (dict): Items already matched by guid; updated in place.
+
+    Returns:
+        bool: Whether any item was renamed.
+    """
+    keys = {}
+    for guid, values in batch.items():
+        key = legacy_guid(values)
+        if guid not in existing and key != guid:
+            keys.setdefault(key, guid)
+    if not keys:
+        return False
+    adopted = False
+    legacy = RSSItem.objects.filter(source=source, content_hash="", guid__in=list(keys))
+    for item in legacy.only("guid", "content_hash", "pub_date"):
+        # Rows still known under a guid of this batch keep it.
+        if item.guid not in batch:
+            item.guid = keys[item.guid]
+            existing[item.guid] = item
+            adopted = True
+    return adopted
+
+
+def rendered(values):
+    """
+    Adds the sanitized HTML, excerpt and search text of the description to normalized values.
+    """
+    html, summary, text = render_description(values["description"])
+    return {**values, "description_html": html, "excerpt": summary, "search_text": text}
+
+
+def is_pruned(source, values):
+    """
+    Whether an entry that is not stored falls within what retention has removed.
+    """
+    return bool(source.pruned_through and values["pub_date"] and values["pub_date"] <= source.pruned_through)
+
+
+def save_entries(source, entries):
+    """
+    Stores a batch of normalized entries for a source.
+
+    Existing items are matched by ``guid`` with a single query on the unique
+    ``(source, guid)`` index, loading only their content hashes. New items
+    are written with ``bulk_create`` and items whose hash changed are
+    rewritten in place with ``bulk_update``, all inside one transaction
+    together with the source's item count and latest date. Items stored
+    before entry ids were kept are matched by ``adopt_legacy_items``. New
+    entries dated at or before the source's ``pruned_through`` were removed by
+    retention and are skipped. Descriptions are sanitized and thumbnails
+    queued only for the items being written.
+
+    Args:
+        source (FeedSource): The source the entries belong to.
+        entries (iterable): Dicts as returned by ``normalize_entry``.
+
+    Returns:
+        IngestResult: Counts of created, updated and skipped entries.
+    """
+    result = IngestResult()
+    batch = {}
+    for values in entries:
+        if values is None or values["guid"] in batch:
+            result.skipped += 1
+            continue
+        batch[values["guid"]] = values
+
+    if not batch:
+        return result
+
+    now = dj_timezone.now()
+    with transaction.atomic():
+        existing = {
+            item.guid: item
+            for item in RSSItem.objects.filter(source=source, guid__in=list(batch)).only(
+                "guid", "content_hash", "pub_date"
+            )
+        }
+        fields = UPDATABLE_FIELDS + ("guid",) if adopt_legacy_items(source, batch, existing) else UPDATABLE_FIELDS
+
+        to_create = []
+        to_update = []
+        for guid, values in batch.items():
+            item = existing.get(guid)
+            if item is None and is_pruned(source, values):
+                result.skipped += 1
+            elif item is None:
+                to_create.append(RSSItem(source=source, **rendered({**values, "pub_date": values["pub_date"] or now})))
+            elif item.content_hash != values["content_hash"]:
+                values = rendered({**values, "pub_date": values["pub_date"] or item.pub_date})
+                for field, value in values.items():
+                    setattr(item, field, value)
+                to_update.append(item)
+            else:
+                result.skipped += 1
+
+        attach_thumbnails(to_create + to_update)
+        RSSItem.objects.bulk_create(to_create)
+        RSSItem.objects.bulk_update(to_update, fields)
+        if to_create or to_update:
+            source.record_items(len(to_create), max(item.pub_date for item in to_create + to_update))
+
+    result.created = len(to_create)
+    result.updated = len(to_update)
+    return result
+
+
+def save_entry_stream(source, entries, batch_size=STREAM_BATCH_SIZE):
+    """
+    Stores entries read incrementally, one ``save_entries`` batch at a time.
+
+    Stops at the first batch whose entries are all stored already and dated
+    no later than the source's newest item, provided every entry read so
+    far is dated and the dates are descending: the rest of such a document
+    is older still and is neither normalized nor looked up. Documents in
+    any other order, such as oldest-first archives, are read to the end.
+
+    Args:
+        source (FeedSource): The source the entries belong to.
+        entries (iterable): Dicts as returned by ``normalize_entry``, in
+            document order.
+        batch_size (int): Entries written per transaction.
+
+    Returns:
+        IngestResult: Counts of created, updated and skipped entries, up to
+        where reading stopped.
+    """
+    result = IngestResult()
+    entries = iter(entries)
+    latest, dates = source.latest_pub_date, []
+    newest_first = True
+    while batch := list(itertools.islice(entries, batch_size)):
+        counts = save_entries(source, batch)
+        result.created += counts.created
+        result.updated += counts.updated
+        result.skipped += counts.skipped
+
+        batch_dates = [values["pub_date"] for values in batch if values is not None]
+        dates = dates[-1:] + batch_dates
+        newest_first = newest_first and None not in dates and all(
+            newer >= older for newer, older in itertools.pairwise(dates)
+        )
+        if newest_first and batch_dates and latest and batch_dates[0] <= latest and not (
+            counts.created or counts.updated
+        ):
+            break
+    return result
+
+
+def record_fetch(source, parsed):
+    """
+    Stores the HTTP validators and status of a fetch on the source.
+
+    The ``etag`` and ``modified`` values are sent back on the next fetch so
+    an unchanged feed can be answered with 304 Not Modified. Validators are
+    kept when the server omits them from a 304 response.
+
+    Args:
+        source (FeedSource): The source that was fetched.
+        parsed (FeedParserDict): The result of ``feedparser.parse``.
+    """
+    source.last_status = getattr(parsed, "status", None)
+    source.last_fetched_at = dj_timezone.now()
+    etag = getattr(parsed, "etag", None)
+    modified = getattr(parsed, "modified", None)
+    if etag or source.last_status != 304:
+        source.etag = (etag or "")[:255]
+    if modified or source.last_status != 304:
+        source.modified = (modified or "")[:64]
+
+
+def parse_skip_hours(body):
+    """
+    Extracts the RSS ``<skipHours>`` values, which feedparser does not expose.
+
+    Args:
+        body (bytes): The raw feed document.
+
+    Returns:
+        set: Hours of the day (0-23, GMT) in which the feed should not be polled.
+    """
+    match = SKIP_HOURS_RE.search(body)
+    if not match:
+        return set()
+    return {int(hour) for hour in HOUR_RE.findall(match.group(1)) if int(hour) < 24}
+
+
+def parse_document(document):
+    """
+    Parses a fetched document into a feedparser result.
+
+    HTTP metadata is copied onto the result as ``status``, ``etag``,
+    ``modified`` and ``headers``, plus the ``skip_hours`` of the feed.
+    Error and 304 responses produce a result without entries. Documents of
+    at least ``FEEDS_STREAMING_PARSE_BYTES`` are parsed incrementally, see
+    ``stream_document``.
+
+    Args:
+        document (FetchedDocument): The response returned by ``fetch_document``.
+
+    Returns:
+        FeedParserDict: The parsed feed.
+    """
+    threshold = getattr(settings, "FEEDS_STREAMING_PARSE_BYTES", DEFAULT_STREAMING_BYTES)
+    if 200 <= document.status < 300 and document.body:
+        parsed = None
+        if threshold is not None and len(document.body) >= threshold:
+            parsed = stream_document(document.body)
+        if parsed is None:
+            parsed = feedparser.parse(
+                document.body,
+                response_headers={**document.headers, "content-location": document.url},
+            )
+    else:
+        parsed = feedparser.FeedParserDict(feed=feedparser.FeedParserDict(), entries=[], bozo=False)
+    parsed["status"] = document.status
+    parsed["href"] = document.url
+    parsed["headers"] = document.headers
+    parsed["etag"] = document.headers.get("etag")
+    parsed["modified"] = document.headers.get("last-modified")
+    parsed["skip_hours"] = parse_skip_hours(document.body)
+    return parsed
+
+
+def stream_document(body):
+    """
+    Parses a large document lazily instead of with ``feedparser.parse``.
+
+    Only the channel metadata and the first entry are read here; the rest
+    of ``entries`` is an iterator that parses one entry at a time as
+    ``save_entry_stream`` consumes it. The result is flagged ``streaming``.
+
+    Args:
+        body (bytes): The feed document.
+
+    Returns:
+        FeedParserDict | None: The lazily parsed feed, or None if the
+        document is not well-formed XML, to fall back to feedparser's more
+        lenient parser.
+    """
+    stream = iter_document(body)
+    try:
+        feed = next(stream)
+        first = next(stream, None)
+    except ParseError:
+        return None
+    entries = itertools.chain([first], stream) if first is not None else []
+    return feedparser.FeedParserDict(
+        feed=feedparser.FeedParserDict(feed), entries=entries, bozo=False, streaming=True
+    )
+
+
+def fetch_feed(source, timeout=None):
+    """
+    Downloads and parses a feed source without touching the database.
+
+    The request is conditional on the validators stored by the previous
+    fetch. This is the network stage of an ingest and is safe to run from a
+    worker thread.
+
+    Args:
+        source (FeedSource): The source to fetch.
+        timeout (float, optional): Socket timeout in seconds.
+
+    Returns:
+        FeedParserDict: The parsed feed, see ``parse_document``, with the
+        ``fetch_duration`` and ``parse_duration`` in seconds and the size in
+        ``bytes`` of the document. Like ``feedparser.parse``, connection
+        errors are not raised but reported through ``bozo`` and
+        ``bozo_exception`` with no ``status``.
+    """
+    started = time.perf_counter()
+    try:
+        document = fetch_document(source.url, etag=source.etag, modified=source.modified, timeout=timeout)
+    except (OSError, HTTPException, ValueError, zlib.error) as exc:
+        return failed_fetch(exc, started)
+    return timed_parse(document, started)
+
+
+async def afetch_feed(source, timeout=None, client=None):
+    """
+    Asynchronous ``fetch_feed``: downloads with httpx on the event loop.
+
+    The network wait holds no thread. Parsing is CPU-bound and runs on a
+    worker thread, so a large document does not stall other requests.
+
+    Args:
+        source (FeedSource): The source to fetch.
+        timeout (float, optional): Socket timeout in seconds.
+        client (httpx.AsyncClient, optional): Client shared between fetches.
+
+    Returns:
+        FeedParserDict: The parsed feed, as returned by ``fetch_feed``.
+    """
+    started = time.perf_counter()
+    try:
+        document = await afetch_document(
+            source.url, etag=source.etag, modified=source.modified, timeout=timeout, client=client
+        )
+    except (httpx.HTTPError, httpx.InvalidURL, OSError, ValueError, zlib.error) as exc:
+        return failed_fetch(exc, started)
+    return await sync_to_async(timed_parse, thread_sensitive=False)(document, started)
+
+
+def failed_fetch(exc, started):
+    """
+    Returns the result of a fetch that raised ``exc``, reported through ``bozo``.
+    """
+    return feedparser.FeedParserDict(
+        feed=feedparser.FeedParserDict(), entries=[], bozo=True, bozo_exception=exc, status=None,
+        fetch_duration=time.perf_counter() - started,
+    )
+
+
+def timed_parse(document, started):
+    """
+    Parses a fetched document and records the fetch and parse durations and size.
+    """
+    fetched = time.perf_counter()
+    parsed = parse_document(document)
+    parsed["fetch_duration"] = fetched - started
+    parsed["parse_duration"] = time.perf_counter() - fetched
+    parsed["bytes"] = len(document.body)
+    return parsed
+
+
+def fetch_error(parsed):
+    """
+    Describes why a fetch failed.
+
+    Args:
+        parsed (FeedParserDict): The result of ``fetch_feed``.
+
+    Returns:
+        str: The failure reason, or an empty string if the fetch succeeded.
+    """
+    status = getattr(parsed, "status", None)
+    if status is None and getattr(parsed, "bozo", False):
+        return str(getattr(parsed, "bozo_exception", None) or "fetch failed")
+    if status is not None and status >= 400:
+        return f"HTTP {status}"
+    return ""
+
+
+def is_valid_feed(parsed):
+    """
+    Tells whether a fetch result is a usable feed.
+
+    A 304 response counts as valid, since it confirms a document that was
+    already ingested for the same URL.
+
+    Args:
+        parsed (FeedParserDict): The result of ``fetch_feed``.
+
+    Returns:
+        bool: True if the feed can be subscribed to.
+    """
+    if fetch_error(parsed):
+        return False
+    if getattr(parsed, "status", None) == 304:
+        return True
+    return bool(parsed.entries) and not getattr(parsed, "bozo", False)
+
+
+def fetch_url(url, timeout=None):
+    """
+    Fetches the feed at ``url`` before anyone is subscribed to it.
+
+    When the URL already has a FeedSource the request is conditional on its
+    validators. No FeedSource is created, so invalid URLs leave no trace.
+
+    Args:
+        url (str): The feed URL as entered by the user.
+        timeout (float, optional): Socket timeout in seconds.
+
+    Returns:
+        FeedParserDict: The parsed feed, see ``fetch_feed``.
+    """
+    url = normalize_url(url)
+    source = FeedSource.objects.filter(url=url).first() or FeedSource(url=url)
+    return fetch_feed(source, timeout=timeout)
+
+
+async def afetch_url(url, timeout=None, client=None):
+    """
+    Asynchronous ``fetch_url``, looking up the source with the async ORM.
+
+    Returns:
+        FeedParserDict: The parsed feed, see ``fetch_feed``.
+    """
+    url = normalize_url(url)
+    source = await FeedSource.objects.filter(url=url).afirst() or FeedSource(url=url)
+    return await afetch_feed(source, timeout=timeout, client=client)
+
+
+def save_parsed_feed(source, parsed):
+    """
+    Stores the result of ``fetch_feed`` in the database.
+
+    A 304 response only records the fetch status and skips item writes, and
+    a failed fetch backs the source off via ``record_failure``. Either way the
+    source's next fetch time is rescheduled. Unless nothing shown to
+    subscribers has changed, ``updated_at`` is advanced and their cached
+    pages are invalidated. The fetch's timings and counts are then added to
+    the source's FetchStats and the metrics histograms; for a streamed
+    document the write time includes parsing the entries.
+
+    Args:
+        source (FeedSource): The source that was fetched.
+        parsed (FeedParserDict): The result of ``fetch_feed``.
+
+    Returns:
+        IngestResult: Counts of created, updated and skipped entries.
+    """
+    started = time.perf_counter()
+    was_shown_as = (source.is_pending, source.has_error, source.title)
+
+    error = fetch_error(parsed)
+    if error:
+        record_failure(source, status=getattr(parsed, "status", None))
+        result = IngestResult()
+        fields = []
+    else:
+        record_fetch(source, parsed)
+        if source.last_status == 304:
+            result = IngestResult(not_modified=True)
+            fields = list(FETCH_FIELDS)
+        else:
+            # Set source title from channel metadata
+            feed_title = parsed.feed.get("title", "").strip()
+            if feed_title:
+                source.title = feed_title
+
+            entries = (normalize_entry(entry) for entry in parsed.entries)
+            if getattr(parsed, "streaming", False):
+                result = save_entry_stream(source, entries)
+            else:
+                result = save_entries(source, entries)
+            fields = FETCH_FIELDS + ["title"]
+        schedule_next_fetch(source, parsed, result)
+
+    if result.created or result.updated or was_shown_as != (source.is_pending, source.has_error, source.title):
+        source.updated_at = dj_timezone.now()
+        fields.append("updated_at")
+        bump_source(source)
+    if fields:
+        source.save(update_fields=fields)
+    record_fetch_stats(source, parsed, result, error=error, write_duration=time.perf_counter() - started)
+    return result
+
+
+def parse_and_save_feed(feed, parsed=None):
     """
     Parses the RSS feed URL and stores entries in the database.
 
     Extracts title, description, publication date, link, and thumbnail image.
-    Ensures no duplicate items are created by matching titles per feed.
-    """
-    parsed = feedparser.parse(feed.url)
-
-    # Set feed title from channel metadata
-    feed_title = parsed.feed.get("title", "").strip()
-    if feed_title:
-        feed.title = feed_title
-        feed.save()
-
-    for entry in parsed.entries:
-        title = entry.get("title", "").strip()
-        if not title:
-            continue  # skip entries without a title
-
-        pub_date = None
-        if entry.get("published_parsed"):
-            pub_date = datetime(*entry["published_parsed"][:6], tzinfo=timezone.utc)
-
-        description = entry.get("summary", "").strip()
-        link = entry.get("link", "").strip()
-
-        image_url = None
-        if "media_thumbnail" in entry:
-            media = entry["media_thumbnail"]
-            if isinstance(media, list) and "url" in media[0]:
-                image_url = media[0]["url"]
-
-        RSSItem.objects.get_or_create(
-            feed=feed,
-            title=title,
-            defaults={
-                "description": description,
-                "pub_date": pub_date,
-                "link": link,
-                "image_url": image_url
-            }
-        )
+    All entries are normalized first and then written in a single batch, so
+    the number of queries does not grow with the number of entries. Items are
+    stored on the feed's shared source, so every subscriber sees them.
+
+    The request is conditional on the validators stored by the previous
+    fetch; a 304 response skips parsing and item writes entirely.
+
+    Args:
+        feed (RSSFeed): The subscription whose source should be fetched.
+        parsed (FeedParserDict, optional): An already fetched result, e.g.
+            from ``fetch_url``. When given, no request is made.
+
+    Returns:
+        IngestResult: Counts of created, updated and skipped entries.
+    """
+    if parsed is None:
+        parsed = fetch_feed(feed.source)
+    return save_parsed_feed(feed.source, parsed)
+
+
+async def aparse_and_save_feed(feed, parsed=None):
+    """
+    Asynchronous ``parse_and_save_feed``: fetches with ``afetch_feed``.
+
+    Storing the result is a series of dependent writes in transactions, so
+    it runs as ``save_parsed_feed`` on the thread Django reserves for
+    synchronous database access.
+
+    Args:
+        feed (RSSFeed): The subscription, with its source already loaded.
+        parsed (FeedParserDict, optional): An already fetched result.
+
+    Returns:
+        IngestResult: Counts of created, updated and skipped entries.
+    """
+    if parsed is None:
+        parsed = await afetch_feed(feed.source)
+    return await sync_to_async(save_parsed_feed)(feed.source, parsed)
@@ -0,0 +1,139 @@
+import re
+from datetime import timedelta, timezone as dt_timezone
+from email.utils import parsedate_to_datetime
+from django.conf import settings
+from django.utils import timezone
+from feeds.models import RSSItem
+
+DEFAULT_INTERVAL = timedelta(hours=1)
+MIN_INTERVAL = timedelta(minutes=15)
+MAX_INTERVAL = timedelta(hours=24)
+MAX_BACKOFF = timedelta(hours=24)
+HISTORY_SIZE = 20
+MAX_AGE_RE = re.compile(r"(?:s-)?max-age\s*=\s*(\d+)")
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def posting_interval(source):
+    """
+    Estimates how often a source should be polled from its recent posting rate.
+
+    Uses the ``pub_date`` of the latest items and polls twice per average
+    gap between posts, so new items are picked up within half a gap.
+
+    Args:
+        source (FeedSource): The source to inspect.
+
+    Returns:
+        timedelta: The suggested polling interval, before clamping.
+    """
+    dates = list(
+        RSSItem.objects.filter(source=source)
+        .order_by("-pub_date")
+        .values_list("pub_date", flat=True)[:HISTORY_SIZE]
+    )
+    if len(dates) < 2:
+        return _setting("FEEDS_POLL_DEFAULT_INTERVAL", DEFAULT_INTERVAL)
+    mean_gap = (dates[0] - dates[-1]) / (len(dates) - 1)
+    return mean_gap / 2
+
+
+def cache_lifetime(headers, now):
+    """
+    Returns how long the publisher asked the response to be cached for.
+
+    Args:
+        headers (dict): Response headers with lower-cased names.
+        now (datetime): The current time.
+
+    Returns:
+        timedelta: The ``max-age``, or the time left until ``Expires``; zero
+        when neither is present.
+    """
+    match = MAX_AGE_RE.search(headers.get("cache-control", ""))
+    if match:
+        return timedelta(seconds=int(match.group(1)))
+    expires = headers.get("expires")
+    if expires:
+        try:
+            return max(parsedate_to_datetime(expires) - now, timedelta(0))
+        except (TypeError, ValueError):
+            pass
+    return timedelta(0)
+
+
+def feed_ttl(parsed):
+    """
+    Returns the RSS ``<ttl>`` of a feed, which is expressed in minutes.
+    """
+    try:
+        return timedelta(minutes=int(parsed.feed.get("ttl", 0)))
+    except (TypeError, ValueError):
+        return timedelta(0)
+
+
+def skip_to_allowed_hour(when, skip_hours):
+    """
+    Moves ``when`` forward to the start of the first hour not in ``skip_hours``.
+    """
+    if not skip_hours or len(skip_hours) >= 24:
+        return when
+    while when.astimezone(dt_timezone.utc).hour in skip_hours:
+        when = (when + timedelta(hours=1)).replace(minute=0, second=0, microsecond=0)
+    return when
+
+
+def schedule_next_fetch(source, parsed, result, now=None):
+    """
+    Sets ``next_fetch_at`` on a source after a successful fetch.
+
+    The interval starts from the posting rate, recomputed only when new items
+    arrived, and is never shorter than the publisher's cache lifetime or
+    ``<ttl>``. It is clamped to the configured bounds and pushed past any
+    ``<skipHours>``. The error count is reset. The caller saves the source.
+
+    Args:
+        source (FeedSource): The fetched source.
+        parsed (FeedParserDict): The result of ``fetch_feed``.
+        result (IngestResult): The outcome of storing the entries.
+        now (datetime, optional): The current time.
+    """
+    now = now or timezone.now()
+    if result.created or not source.poll_interval:
+        source.poll_interval = int(posting_interval(source).total_seconds())
+
+    interval = max(
+        timedelta(seconds=source.poll_interval),
+        cache_lifetime(getattr(parsed, "headers", None) or {}, now),
+        feed_ttl(parsed),
+    )
+    interval = min(
+        max(interval, _setting("FEEDS_POLL_MIN_INTERVAL", MIN_INTERVAL)),
+        _setting("FEEDS_POLL_MAX_INTERVAL", MAX_INTERVAL),
+    )
+    source.error_count = 0
+    source.next_fetch_at = skip_to_allowed_hour(now + interval, getattr(parsed, "skip_hours", None))
+
+
+def record_failure(source, status=None, now=None):
+    """
+    Records a failed fetch and backs the source off exponentially.
+
+    The delay doubles with each consecutive failure, starting at the minimum
+    polling interval and capped at ``FEEDS_POLL_MAX_BACKOFF``.
+
+    Args:
+        source (FeedSource): The source that failed.
+        status (int, optional): HTTP status of the failed response, if any.
+        now (datetime, optional): The current time.
+    """
+    now = now or timezone.now()
+    source.error_count += 1
+    delay = _setting("FEEDS_POLL_MIN_INTERVAL", MIN_INTERVAL) * 2 ** min(source.error_count - 1, 16)
+    source.next_fetch_at = now + min(delay, _setting("FEEDS_POLL_MAX_BACKOFF", MAX_BACKOFF))
+    source.last_status = status
+    source.last_fetched_at = now
+    source.save(update_fields=["error_count", "next_fetch_at", "last_status", "last_fetched_at"])
@@ -0,0 +1,89 @@
+import re
+from django.db import connection
+from django.db.models import Q, prefetch_related_objects
+from feeds.models import RSSItem
+
+SEARCH_LIMIT = 50
+TERM_RE = re.compile(r"\w+")
+
+# Must match the index created by migration 0022_rssitem_search_text.
+POSTGRES_DOCUMENT = (
+    "setweight(to_tsvector('english', i.title), 'A') || setweight(to_tsvector('english', i.search_text), 'B')"
+)
+
+# Everything but the raw description and its search text, which can be large and are not displayed.
+ITEM_COLUMNS = ", ".join(
+    f"i.{field.column}" for field in RSSItem._meta.concrete_fields
+    if field.name not in ("description", "search_text")
+)
+
+SQLITE_SEARCH = f"""
+    SELECT {ITEM_COLUMNS}, bm25(feeds_rssitem_fts, 4.0, 1.0) AS rank
+    FROM feeds_rssitem_fts
+    JOIN feeds_rssitem i ON i.id = feeds_rssitem_fts.rowid
+    WHERE feeds_rssitem_fts MATCH %s
+      AND i.source_id IN (SELECT source_id FROM feeds_rssfeed WHERE user_id = %s)
+    ORDER BY rank, i.pub_date DESC
+    LIMIT %s
+"""
+
+POSTGRES_SEARCH = f"""
+    SELECT {ITEM_COLUMNS}, ts_rank({POSTGRES_DOCUMENT}, query) AS rank
+    FROM feeds_rssitem i, websearch_to_tsquery('english', %s) query
+    WHERE ({POSTGRES_DOCUMENT}) @@ query
+      AND i.source_id IN (SELECT source_id FROM feeds_rssfeed WHERE user_id = %s)
+    ORDER BY rank DESC, i.pub_date DESC
+    LIMIT %s
+"""
+
+
+def fts_query(text):
+    """
+    Turns free text into an FTS5 query matching items that contain every word.
+
+    Each word is quoted so user input cannot inject FTS5 operators, and the
+    last word is matched as a prefix to support search-as-you-type.
+
+    Args:
+        text (str): The search box contents.
+
+    Returns:
+        str: The MATCH expression, or an empty string if there are no words.
+    """
+    terms = [f'"{term}"' for term in TERM_RE.findall(text)]
+    if terms:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+def search_items(user, text, limit=SEARCH_LIMIT):
+    """
+    Searches the titles and descriptions of the items in a user's feeds.
+
+    Uses the FTS5 index on SQLite and the GIN full-text index on PostgreSQL,
+    both kept up to date by the database as items are written. Matches in
+    titles weigh more than matches in descriptions. Other backends fall back
+    to an unranked substring match.
+
+    Args:
+        user (User): The user whose subscriptions scope the search.
+        text (str): The search terms.
+        limit (int): Maximum number of results.
+
+    Returns:
+        list: Matching RSSItem instances, best match first.
+    """
+    if connection.vendor == "sqlite":
+        query = fts_query(text)
+        if not query:
+            return []
+        results = list(RSSItem.objects.raw(SQLITE_SEARCH, [query, user.pk, limit]))
+    elif not text.strip():
+        return []
+    elif connection.vendor == "postgresql":
+        results = list(RSSItem.objects.raw(POSTGRES_SEARCH, [text, user.pk, limit]))
+    else:
+        matches = RSSItem.objects.for_user(user).filter(Q(title__icontains=text) | Q(search_text__icontains=text))
+        results = list(matches.order_by("-pub_date")[:limit])
+    prefetch_related_objects(results, "thumbnail")
+    return results
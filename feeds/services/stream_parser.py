@@ -0,0 +1,162 @@
+import logging
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from io import BytesIO
+from xml.etree.ElementTree import ParseError, iterparse, tostring
+
+logger = logging.getLogger(__name__)
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+RSS1 = "{http://purl.org/rss/1.0/}"
+MEDIA = "{http://search.yahoo.com/mrss/}"
+CONTENT_ENCODED = "{http://purl.org/rss/1.0/modules/content/}encoded"
+DC_DATE = "{http://purl.org/dc/elements/1.1/}date"
+ENTRY_TAGS = {"item", f"{RSS1}item", f"{ATOM}entry"}
+CHANNEL_TAGS = {"channel", f"{RSS1}channel", f"{ATOM}feed"}
+
+
+def local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def text_of(element):
+    return "".join(element.itertext()).strip() if element is not None else ""
+
+
+def markup_of(element):
+    """
+    Returns the content of an element, keeping unescaped child markup as HTML.
+    """
+    if element is None:
+        return ""
+    children = "".join(tostring(child, encoding="unicode") for child in element)
+    return ((element.text or "") + children).strip()
+
+
+def parse_date(value):
+    """
+    Parses an RFC 822 (RSS) or ISO 8601 (Atom) date.
+
+    Returns:
+        time.struct_time | None: The date in UTC, like feedparser's ``*_parsed`` values.
+    """
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).timetuple()
+
+
+def atom_link(element):
+    for link in element.findall(f"{ATOM}link"):
+        if link.get("rel", "alternate") == "alternate" and link.get("href"):
+            return link.get("href")
+    return ""
+
+
+def entry_dict(element):
+    """
+    Converts an RSS ``<item>`` or Atom ``<entry>`` into a feedparser-style entry.
+
+    Only the keys ``normalize_entry`` reads are filled in.
+
+    Args:
+        element (Element): The parsed entry element.
+
+    Returns:
+        dict: ``title``, ``summary``, ``link``, ``id``, ``published_parsed``
+        and the media and enclosure lists.
+    """
+    if element.tag == f"{ATOM}entry":
+        content = element.find(f"{ATOM}content")
+        summary = markup_of(element.find(f"{ATOM}summary")) or markup_of(content)
+        link = atom_link(element)
+        guid = text_of(element.find(f"{ATOM}id"))
+        date = text_of(element.find(f"{ATOM}published")) or text_of(element.find(f"{ATOM}updated"))
+        title = text_of(element.find(f"{ATOM}title"))
+        enclosures = [
+            {"href": node.get("href"), "type": node.get("type", "")}
+            for node in element.findall(f"{ATOM}link")
+            if node.get("rel") == "enclosure"
+        ]
+    else:
+        ns = RSS1 if element.tag == f"{RSS1}item" else ""
+        summary = markup_of(element.find(f"{ns}description")) or markup_of(element.find(CONTENT_ENCODED))
+        link = text_of(element.find(f"{ns}link"))
+        guid = text_of(element.find("guid")) or element.get("{http://www.w3.org/1999/02/22-rdf-syntax-ns#}about", "")
+        date = text_of(element.find("pubDate")) or text_of(element.find(DC_DATE))
+        title = text_of(element.find(f"{ns}title"))
+        enclosures = [
+            {"href": node.get("url"), "type": node.get("type", "")} for node in element.findall("enclosure")
+        ]
+    return {
+        "title": title,
+        "summary": summary,
+        "link": link,
+        "id": guid,
+        "published_parsed": parse_date(date),
+        "media_thumbnail": [{"url": node.get("url")} for node in element.iter(f"{MEDIA}thumbnail")],
+        "media_content": [
+            {"url": node.get("url"), "medium": node.get("medium", ""), "type": node.get("type", "")}
+            for node in element.iter(f"{MEDIA}content")
+        ],
+        "enclosures": enclosures,
+    }
+
+
+def iter_document(body):
+    """
+    Parses a feed document incrementally.
+
+    The first value yielded is a dict of channel metadata (``title`` and
+    ``ttl``) read up to the end of the first entry; each following value is one
+    entry, see ``entry_dict``. Entries are removed from the tree once read,
+    so only one is held in memory at a time, unlike ``feedparser.parse``
+    which builds all of them before returning.
+
+    Args:
+        body (bytes): The feed document.
+
+    Yields:
+        dict: The channel metadata, then the entries in document order.
+
+    Raises:
+        ParseError: If the document is malformed before the end of the
+            first entry. Later errors end the iteration, keeping the entries
+            read.
+    """
+    open_elements = []
+    feed = {}
+    started = False
+    try:
+        for event, element in iterparse(BytesIO(body), events=("start", "end")):
+            if event == "start":
+                open_elements.append(element)
+                continue
+            open_elements.pop()
+            if element.tag in ENTRY_TAGS:
+                if not started:
+                    started = True
+                    yield feed
+                yield entry_dict(element)
+                if open_elements:
+                    open_elements[-1].remove(element)
+            elif not started and open_elements and open_elements[-1].tag in CHANNEL_TAGS:
+                name = local_name(element.tag)
+                if name in ("title", "ttl"):
+                    feed.setdefault(name, text_of(element))
+    except ParseError:
+        if not started:
+            raise
+        logger.warning("Feed document is malformed after its first entries; stopping there", exc_info=True)
+        return
+    if not started:
+        yield feed
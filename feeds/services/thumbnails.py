@@ -0,0 +1,232 @@
+import hashlib
+import logging
+import os
+import time
+import zlib
+from http.client import HTTPException
+from io import BytesIO
+from pathlib import Path
+from django.conf import settings
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+from feeds.cache import bump_sources
+from feeds.models import FeedSource, Job, Thumbnail
+from feeds.services.http import fetch_document
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = (120, 240)
+DEFAULT_CACHE_BYTES = 256 * 1024 * 1024
+MAX_IMAGE_BYTES = 10 * 1024 * 1024
+# Refresh a file's mtime, used as its LRU timestamp, at most this often.
+TOUCH_INTERVAL = 24 * 3600
+JPEG_QUALITY = 82
+
+
+def thumbnail_dir():
+    return Path(getattr(settings, "FEEDS_THUMBNAIL_DIR", settings.BASE_DIR / "thumbnails"))
+
+
+def thumbnail_sizes():
+    return tuple(getattr(settings, "FEEDS_THUMBNAIL_SIZES", DEFAULT_SIZES))
+
+
+def thumbnail_path(digest, size):
+    """
+    Returns where the ``size`` pixel copy of the image with ``digest`` is stored.
+    """
+    return thumbnail_dir() / digest[:2] / f"{digest}-{size}.jpg"
+
+
+def attach_thumbnails(items):
+    """
+    Links items to Thumbnail rows for their images and queues the new ones.
+
+    Existing thumbnails are looked up in one query, missing ones are created
+    with one ``bulk_create`` and a single job is queued to generate them, so
+    the cost per ingest does not grow with the number of items. Another
+    ingest may insert the same URLs in the meantime; conflicting rows are
+    left to it, and the missing URLs are read back to link them either way.
+
+    Args:
+        items (list): Unsaved or changed RSSItem instances.
+    """
+    urls = {item.image_url for item in items if item.image_url}
+    if not urls:
+        return
+    thumbnails = {thumbnail.url: thumbnail for thumbnail in Thumbnail.objects.filter(url__in=urls)}
+    missing = urls - thumbnails.keys()
+    if missing:
+        Thumbnail.objects.bulk_create([Thumbnail(url=url) for url in missing], ignore_conflicts=True)
+        added = list(Thumbnail.objects.filter(url__in=missing))
+        thumbnails.update((thumbnail.url, thumbnail) for thumbnail in added)
+        pending = [thumbnail.pk for thumbnail in added if thumbnail.status == Thumbnail.PENDING]
+        if pending:
+            Job.objects.create(kind="thumbnail", payload={"thumbnail_ids": pending})
+    for item in items:
+        item.thumbnail = thumbnails.get(item.image_url)
+
+
+def resize(data, size):
+    """
+    Scales an image to fit in a ``size`` square and encodes it as JPEG.
+
+    Args:
+        data (bytes): The original image.
+        size (int): Maximum width and height in pixels.
+
+    Returns:
+        bytes: The JPEG file.
+    """
+    with Image.open(BytesIO(data)) as image:
+        image.draft("RGB", (size, size))  # lets JPEGs decode at a reduced scale
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((size, size))
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        output = BytesIO()
+        image.save(output, "JPEG", quality=JPEG_QUALITY, optimize=True)
+        return output.getvalue()
+
+
+def write_atomically(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_suffix(f".{os.getpid()}.tmp")
+    partial.write_bytes(data)
+    os.replace(partial, path)
+
+
+def make_thumbnail(thumbnail, timeout=None):
+    """
+    Downloads the image of a Thumbnail and writes its resized copies.
+
+    Copies that already exist under the same digest, e.g. from another URL
+    serving the same picture, are not generated again.
+
+    Args:
+        thumbnail (Thumbnail): The thumbnail to generate.
+        timeout (float, optional): Socket timeout in seconds.
+
+    Returns:
+        str: An error message, or an empty string on success.
+    """
+    try:
+        document = fetch_document(
+            thumbnail.url, timeout=timeout or getattr(settings, "FEEDS_FETCH_TIMEOUT", None), max_bytes=MAX_IMAGE_BYTES
+        )
+        if document.status != 200:
+            raise ValueError(f"HTTP {document.status}")
+        digest = hashlib.sha256(document.body).hexdigest()
+        for size in thumbnail_sizes():
+            path = thumbnail_path(digest, size)
+            if not path.exists():
+                write_atomically(path, resize(document.body, size))
+    except (
+        OSError, HTTPException, ValueError, SyntaxError, zlib.error, UnidentifiedImageError,
+        Image.DecompressionBombError,
+    ) as exc:
+        thumbnail.status = Thumbnail.FAILED
+        thumbnail.error = str(exc)
+    else:
+        thumbnail.status = Thumbnail.READY
+        thumbnail.digest = digest
+        thumbnail.error = ""
+    thumbnail.save(update_fields=["status", "digest", "error", "updated_at"])
+    return thumbnail.error
+
+
+def make_thumbnails(thumbnail_ids):
+    """
+    Generates the given thumbnails, then evicts old files over the cache budget.
+
+    Pages showing the items of thumbnails that became ready are invalidated
+    with ``show_thumbnails``, so they stop linking the original images.
+
+    Args:
+        thumbnail_ids (iterable): Primary keys of Thumbnail rows.
+
+    Returns:
+        dict: Error messages by thumbnail id, for the thumbnails that failed.
+    """
+    errors = {}
+    ready = []
+    for thumbnail in Thumbnail.objects.filter(pk__in=thumbnail_ids).exclude(status=Thumbnail.READY):
+        error = make_thumbnail(thumbnail)
+        if error:
+            logger.warning("Thumbnail for %s failed: %s", thumbnail.url, error)
+            errors[thumbnail.pk] = error
+        else:
+            ready.append(thumbnail.pk)
+    if ready:
+        show_thumbnails(ready)
+    evict()
+    return errors
+
+
+def show_thumbnails(thumbnail_ids):
+    """
+    Marks the sources whose items use the given thumbnails as changed.
+
+    Advances their ``updated_at``, which feeds the pages' ETag and
+    Last-Modified validators, and bumps the cached fragments of their
+    subscribers.
+
+    Args:
+        thumbnail_ids (list): Primary keys of thumbnails that became ready.
+    """
+    sources = FeedSource.objects.filter(items__thumbnail__in=thumbnail_ids).values("pk")
+    if FeedSource.objects.filter(pk__in=sources).update(updated_at=timezone.now()):
+        bump_sources(sources)
+
+
+def evict(max_bytes=None):
+    """
+    Deletes the least recently used files until the cache fits its budget.
+
+    Files are ranked by modification time, which ``touch`` refreshes when
+    they are served. Evicted thumbnails are regenerated on their next use.
+
+    Args:
+        max_bytes (int, optional): The budget, ``FEEDS_THUMBNAIL_CACHE_BYTES`` by default.
+
+    Returns:
+        int: The number of bytes freed.
+    """
+    if max_bytes is None:
+        max_bytes = getattr(settings, "FEEDS_THUMBNAIL_CACHE_BYTES", DEFAULT_CACHE_BYTES)
+    files = []
+    for path in thumbnail_dir().glob("*/*.jpg"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in files)
+    freed = 0
+    for _, size, path in sorted(files):
+        if total - freed <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        freed += size
+    return freed
+
+
+def touch(path):
+    """
+    Marks a served file as recently used, at most once per ``TOUCH_INTERVAL``.
+    """
+    now = time.time()
+    if now - path.stat().st_mtime > TOUCH_INTERVAL:
+        os.utime(path, (now, now))
+
+
+def requeue(thumbnail):
+    """
+    Queues an evicted thumbnail to be generated again, unless it already is.
+    """
+    reset = Thumbnail.objects.filter(pk=thumbnail.pk, status=Thumbnail.READY).update(
+        status=Thumbnail.PENDING, updated_at=timezone.now()
+    )
+    if reset:
+        Job.objects.create(kind="thumbnail", payload={"thumbnail_ids": [thumbnail.pk]})
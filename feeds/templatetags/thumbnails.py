@@ -0,0 +1,35 @@
+from django import template
+from django.urls import reverse
+from django.utils.html import format_html
+from feeds.services.thumbnails import thumbnail_sizes
+
+register = template.Library()
+
+
+@register.simple_tag
+def item_image(item):
+    """
+    Renders the image of an item, from the thumbnail cache when it is ready.
+
+    The smallest configured size is the ``src`` and the next one is offered
+    for high-density screens. Until the thumbnail exists the original image
+    is shown, scaled down by the browser.
+
+    Usage:
+        {% load thumbnails %}{% item_image item %}
+    """
+    if not item.image_url:
+        return ""
+    alt = f"Image for {item.title}"
+    thumbnail = item.thumbnail
+    if thumbnail is None or not thumbnail.is_ready:
+        return format_html('<img src="{}" alt="{}" class="img-thumbnail item-image" loading="lazy">', item.image_url, alt)
+
+    sizes = sorted(thumbnail_sizes())
+    src = reverse("thumbnail", args=[thumbnail.digest, sizes[0]])
+    srcset = ""
+    if len(sizes) > 1:
+        srcset = f"{src} 1x, {reverse('thumbnail', args=[thumbnail.digest, sizes[1]])} 2x"
+    return format_html(
+        '<img src="{}" srcset="{}" alt="{}" class="img-thumbnail item-image" loading="lazy">', src, srcset, alt
+    )
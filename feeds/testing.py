@@ -0,0 +1,95 @@
+"""
+Local stand-ins for feed publishers, shared by the tests and ``manage.py benchmark``.
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def rss_document(title, items):
+    """
+    Builds a minimal RSS 2.0 document with one <item> per (title, description) pair.
+    """
+    entries = "".join(
+        f"<item><title>{item_title}</title><description>{description}</description>"
+        f"<link>http://example.com/{index}</link>"
+        f"<pubDate>Mon, 05 May 2025 12:00:{index % 60:02d} GMT</pubDate></item>"
+        for index, (item_title, description) in enumerate(items)
+    )
+    return (
+        '<?xml version="1.0"?><rss version="2.0"><channel>'
+        f"<title>{title}</title>{entries}</channel></rss>"
+    ).encode()
+
+
+class FeedServer:
+    """
+    Local HTTP stand-in for feed publishers, used by tests.
+
+    Serves the documents registered in ``routes`` (path -> bytes) and honours
+    ``If-None-Match`` against the ETag it hands out. Tracks the number of
+    requests and the peak number of concurrent requests.
+
+    Example:
+        with FeedServer({"/a.xml": rss_document("A", [])}) as server:
+            url = server.url("/a.xml")
+    """
+
+    def __init__(self, routes, delay=0.0, headers=None):
+        self.routes = routes
+        self.delay = delay
+        self.headers = headers or {}
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server.lock:
+                    server.requests += 1
+                    server.in_flight += 1
+                    server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+                try:
+                    time.sleep(server.delay)
+                    body = server.routes.get(self.path)
+                    if body is None:
+                        self.send_response(404)
+                        self.end_headers()
+                        return
+                    etag = f'"{hash(body)}"'
+                    if self.headers.get("If-None-Match") == etag:
+                        self.send_response(304)
+                        self.end_headers()
+                        return
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/rss+xml")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.send_header("ETag", etag)
+                    for name, value in server.headers.items():
+                        self.send_header(name, value)
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with server.lock:
+                        server.in_flight -= 1
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def url(self, path):
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}{path}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
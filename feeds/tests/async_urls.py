@@ -0,0 +1,9 @@
+"""
+The project URLconf with the async feed views, as with ``FEEDS_ASYNC_VIEWS = True``.
+"""
+from feeds import urls as feed_urls
+from rssreader.urls import urlpatterns as project_patterns
+
+urlpatterns = [
+    pattern for pattern in project_patterns if getattr(pattern, "urlconf_name", None) is not feed_urls
+] + feed_urls.with_async_views(feed_urls.urlpatterns)
@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta, timezone
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from feeds.models import FeedSource, RSSFeed, RSSItem
+from feeds.services.read_state import set_read
+
+User = get_user_model()
+NOW = datetime(2025, 5, 5, 12, 0, tzinfo=timezone.utc)
+
+
+class APITest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="john", password="secret")
+        self.feed = RSSFeed.objects.create(user=self.user, url="http://example.com/rss")
+        self.other = RSSFeed.objects.create(user=self.user, url="http://example.com/other", title="Mine")
+        FeedSource.objects.filter(pk=self.feed.source_id).update(title="Example", item_count=3)
+        self.items = [
+            RSSItem.objects.create(
+                source=self.feed.source, guid=str(n), title=f"Item {n}", description="",
+                description_html=f"<p>{n}</p>", pub_date=NOW + timedelta(hours=n),
+            )
+            for n in range(3)
+        ]
+        RSSItem.objects.create(source=self.other.source, guid="x", title="Other", description="", pub_date=NOW)
+        self.client.login(username="john", password="secret")
+
+    def test_feeds(self):
+        set_read(self.feed, self.items[0])
+        data = self.client.get(reverse("api-feeds")).json()
+        self.assertIsNone(data["next"])
+        first, second = data["results"]
+        self.assertEqual(
+            first,
+            {"id": self.feed.pk, "url": "http://example.com/rss", "title": "Example", "item_count": 3,
+             "unread_count": 2, "latest_pub_date": None},
+        )
+        self.assertEqual(second["title"], "Mine")
+
+    def test_sparse_fields_and_cursors(self):
+        url = reverse("api-feed-items", args=[self.feed.pk])
+        data = self.client.get(url, {"fields": "title,content", "limit": 2}).json()
+        self.assertEqual(
+            data["results"], [{"title": "Item 2", "content": "<p>2</p>"}, {"title": "Item 1", "content": "<p>1</p>"}]
+        )
+        self.assertIsNone(data["previous"])
+
+        data = self.client.get(data["next"]).json()
+        self.assertEqual(data["results"], [{"title": "Item 0", "content": "<p>0</p>"}])
+        self.assertIsNone(data["next"])
+        newer = self.client.get(data["previous"]).json()["results"]
+        self.assertEqual([row["title"] for row in newer], ["Item 2", "Item 1"])
+
+        data = self.client.get(reverse("api-feeds"), {"fields": "id", "limit": 1}).json()
+        self.assertEqual(data["results"], [{"id": self.feed.pk}])
+        self.assertEqual(self.client.get(data["next"]).json()["results"], [{"id": self.other.pk}])
+
+    def test_river_labels_items_with_subscriptions(self):
+        with self.assertNumQueries(5):  # session, user, validators, subscriptions, page
+            data = self.client.get(reverse("api-items"), {"fields": "title,feed"}).json()
+        self.assertEqual(
+            data["results"],
+            [
+                {"title": "Item 2", "feed": self.feed.pk},
+                {"title": "Item 1", "feed": self.feed.pk},
+                {"title": "Other", "feed": self.other.pk},
+                {"title": "Item 0", "feed": self.feed.pk},
+            ],
+        )
+
+    def test_validators(self):
+        url = reverse("api-feed-items", args=[self.feed.pk])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+
+        set_read(self.feed, self.items[0])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 200)
+
+    def test_errors(self):
+        response = self.client.get(reverse("api-items"), {"fields": "title,secret"})
+        self.assertEqual((response.status_code, response.json()), (400, {"error": "Unknown fields: secret"}))
+        self.assertNotIn("ETag", response)
+        self.assertEqual(self.client.get(reverse("api-items"), {"limit": "0"}).status_code, 400)
+
+        User.objects.create_user(username="alice", password="secret")
+        self.client.login(username="alice", password="secret")
+        self.assertEqual(self.client.get(reverse("api-feed-items", args=[self.feed.pk])).status_code, 404)
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse("api-feeds")).status_code, 403)
@@ -0,0 +1,108 @@
+from datetime import datetime, timezone
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from feeds.models import FeedSource, RSSFeed, RSSItem
+from feeds.services import arefresh_sources
+from feeds.services.http import afetch_document
+from feeds.services.rss_parser import afetch_feed
+from feeds.testing import FeedServer, rss_document
+
+User = get_user_model()
+NOW = datetime(2025, 5, 5, 12, 0, tzinfo=timezone.utc)
+
+
+class AsyncFetchTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="john", password="secret")
+        self.routes = {
+            f"/feed{n}.xml": rss_document(f"Feed {n}", [(f"Item {n}-{i}", "Body") for i in range(3)])
+            for n in range(6)
+        }
+
+    async def test_fetch_document_and_not_modified(self):
+        with FeedServer(self.routes) as server:
+            document = await afetch_document(server.url("/feed0.xml"))
+            self.assertEqual(document.status, 200)
+            self.assertEqual(document.body, self.routes["/feed0.xml"])
+
+            again = await afetch_document(server.url("/feed0.xml"), etag=document.headers["etag"])
+            self.assertEqual((again.status, again.body), (304, b""))
+            self.assertEqual((await afetch_document(server.url("/missing.xml"))).status, 404)
+
+    async def test_fetch_feed_reports_errors(self):
+        source = FeedSource(url="http://127.0.0.1:1/feed.xml")
+        parsed = await afetch_feed(source, timeout=1)
+        self.assertTrue(parsed.bozo)
+
+        with FeedServer(self.routes) as server:
+            parsed = await afetch_feed(FeedSource(url=server.url("/feed1.xml")))
+        self.assertEqual(parsed.feed.title, "Feed 1")
+        self.assertEqual(len(parsed.entries), 3)
+
+    async def test_refresh_fetches_concurrently_within_host_limit(self):
+        with FeedServer(self.routes, delay=0.1) as server:
+            sources = [
+                (await RSSFeed.objects.acreate(user=self.user, url=server.url(path))).source
+                for path in sorted(self.routes)
+            ]
+            report = await arefresh_sources(sources, max_concurrency=6, per_host=2)
+
+        self.assertEqual(report.failed, 0)
+        self.assertEqual(report.total("created"), 18)
+        self.assertEqual(await RSSItem.objects.acount(), 18)
+        self.assertEqual(server.peak_in_flight, 2)
+        self.assertEqual((await FeedSource.objects.aget(pk=sources[0].pk)).title, "Feed 0")
+
+
+@override_settings(ROOT_URLCONF="feeds.tests.async_urls")
+class AsyncViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="john", password="secret")
+        self.feed = RSSFeed.objects.create(user=self.user, url="http://example.com/rss", title="Example")
+        self.items = [
+            RSSItem.objects.create(source=self.feed.source, guid=str(n), title=f"Item {n}", description="", pub_date=NOW)
+            for n in range(3)
+        ]
+
+    async def test_pages(self):
+        await self.async_client.alogin(username="john", password="secret")
+        response = await self.async_client.get(reverse("feed-list"))
+        self.assertContains(response, "Example")
+        self.assertContains(response, "3 unread")
+        response = await self.async_client.get(reverse("feed-list"), headers={"if-none-match": response["ETag"]})
+        self.assertEqual(response.status_code, 304)
+
+        response = await self.async_client.get(reverse("river"))
+        self.assertContains(response, "Item 2")
+
+    async def test_feed_detail(self):
+        await self.async_client.alogin(username="john", password="secret")
+        await RSSFeed.objects.filter(pk=self.feed.pk).aupdate(read_up_to=self.items[0].pk)
+        url = reverse("feed-detail", args=[self.feed.pk])
+        response = await self.async_client.get(url, {"unread": "1"})
+        self.assertContains(response, "Item 1")
+        self.assertNotContains(response, "Item 0")
+
+        # A second request renders from the cached fragment.
+        response = await self.async_client.get(url, {"unread": "1"})
+        self.assertContains(response, "Item 1")
+        self.assertEqual((await self.async_client.get(reverse("feed-detail", args=[0]))).status_code, 404)
+
+    async def test_login_required(self):
+        response = await self.async_client.get(reverse("river"))
+        self.assertRedirects(response, reverse("login") + "?next=" + reverse("river"), fetch_redirect_response=False)
+
+    def test_subscribe(self):
+        self.client.login(username="john", password="secret")
+        routes = {"/new.xml": rss_document("New", [("Fresh", "Body")]), "/bad.xml": b"not a feed"}
+        with FeedServer(routes) as server:
+            response = self.client.post(reverse("feed-add"), {"url": server.url("/new.xml")})
+            self.assertRedirects(response, reverse("feed-list"), fetch_redirect_response=False)
+            response = self.client.post(reverse("feed-add"), {"url": server.url("/bad.xml")})
+            self.assertContains(response, "Invalid RSS feed URL.")
+
+        feed = RSSFeed.objects.get(url=server.url("/new.xml"))
+        self.assertEqual(list(feed.items.values_list("title", flat=True)), ["Fresh"])
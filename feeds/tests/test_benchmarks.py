@@ -0,0 +1,26 @@
+import feedparser
+from django.test import TestCase
+from feeds import benchmarks
+
+
+class BenchmarkHarnessTest(TestCase):
+    def test_synthetic_feed_is_deterministic(self):
+        document = benchmarks.synthetic_feed(25, seed=3)
+        self.assertEqual(document, benchmarks.synthetic_feed(25, seed=3))
+        parsed = feedparser.parse(document)
+        self.assertEqual(len(parsed.entries), 25)
+        self.assertFalse(parsed.bozo)
+
+    def test_ingest_scenario_reports_metrics(self):
+        results = benchmarks.bench_ingest([10])["10"]
+        self.assertEqual(results["created"], 10)
+        self.assertGreater(results["peak_memory_bytes"], 0)
+        self.assertGreater(results["first_queries"], 0)
+
+    def test_compare_reports_relative_change(self):
+        before = {"meta": {"python": 3}, "ingest": {"10": {"first_seconds": 2.0, "queries": 0}}}
+        after = {"meta": {"python": 4}, "ingest": {"10": {"first_seconds": 1.0, "queries": 3}}}
+        self.assertEqual(benchmarks.compare(before, after), [
+            ("ingest.10.first_seconds", 2.0, 1.0, -0.5),
+            ("ingest.10.queries", 0, 3, None),
+        ])
@@ -0,0 +1,139 @@
+import tempfile
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from feeds.models import RSSFeed
+from feeds.services import parse_and_save_feed
+
+User = get_user_model()
+
+
+def parsed_feed(*titles):
+    return SimpleNamespace(
+        feed={"title": "Cached"},
+        entries=[
+            {
+                "title": title,
+                "summary": "",
+                "link": f"http://example.com/{title}",
+                "published_parsed": time.struct_time((2025, 5, 5, 12, n, 0, 0, 0, 0)),
+            }
+            for n, title in enumerate(titles)
+        ],
+    )
+
+
+class PageCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="john", password="secret")
+        self.feed = RSSFeed.objects.create(user=self.user, url="http://example.com/rss")
+        self.client.login(username="john", password="secret")
+        with patch("feeds.services.rss_parser.fetch_feed", return_value=parsed_feed("First")):
+            parse_and_save_feed(self.feed)
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        return response, len(queries)
+
+    def test_cached_pages_skip_item_queries(self):
+        for url in [reverse("feed-list"), reverse("feed-detail", args=[self.feed.pk]), reverse("river")]:
+            first, cold = self.get(url)
+            second, warm = self.get(url)
+            self.assertLess(warm, cold, url)
+            self.assertContains(second, "Cached")
+
+    def test_ingest_invalidates_subscriber_pages(self):
+        other = User.objects.create_user(username="alice", password="secret")
+        other_feed = RSSFeed.objects.create(user=other, url="http://example.com/rss")
+        detail = reverse("feed-detail", args=[self.feed.pk])
+        self.client.get(detail)
+        self.client.get(reverse("feed-list"))
+
+        with patch("feeds.services.rss_parser.fetch_feed", return_value=parsed_feed("First", "Second")):
+            parse_and_save_feed(other_feed)
+
+        self.assertContains(self.client.get(detail), "Second")
+        self.assertContains(self.client.get(reverse("feed-list")), "2 items")
+
+    def test_unchanged_refetch_keeps_cache(self):
+        detail = reverse("feed-detail", args=[self.feed.pk])
+        _, cold = self.get(detail)
+        with patch("feeds.services.rss_parser.fetch_feed", return_value=parsed_feed("First")):
+            parse_and_save_feed(self.feed)
+        _, warm = self.get(detail)
+        self.assertLess(warm, cold)
+
+    def test_edit_and_delete_invalidate_feed_list(self):
+        self.client.get(reverse("feed-list"))
+        self.client.post(reverse("feed-edit", args=[self.feed.pk]), {"url": self.feed.url, "title": "Renamed"})
+        self.assertContains(self.client.get(reverse("feed-list")), "Renamed")
+
+        self.client.post(reverse("feed-delete", args=[self.feed.pk]))
+        self.assertContains(self.client.get(reverse("feed-list")), "No feeds added yet.")
+
+
+@override_settings(CACHES={
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": tempfile.mkdtemp(prefix="feeds-cache-test-"),
+    }
+})
+class FileBasedPageCacheTest(PageCacheTest):
+    pass
+
+
+class ConditionalResponseTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="john", password="secret")
+        self.feed = RSSFeed.objects.create(user=self.user, url="http://example.com/rss")
+        with patch("feeds.services.rss_parser.fetch_feed", return_value=parsed_feed("First")):
+            parse_and_save_feed(self.feed)
+        self.client.login(username="john", password="secret")
+        self.detail = reverse("feed-detail", args=[self.feed.pk])
+
+    def revalidate(self, url, etag):
+        return self.client.get(url, headers={"if-none-match": etag})
+
+    def test_unchanged_pages_answer_not_modified(self):
+        for url in [self.detail, reverse("feed-list")]:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertIn("private", response["Cache-Control"])
+            # session, user, and the page's modification time
+            with self.assertNumQueries(3):
+                revalidated = self.revalidate(url, response["ETag"])
+            self.assertEqual(revalidated.status_code, 304)
+            self.assertEqual(revalidated["ETag"], response["ETag"])
+
+    def test_new_items_change_the_etag(self):
+        etag = self.client.get(self.detail)["ETag"]
+        with patch("feeds.services.rss_parser.fetch_feed", return_value=parsed_feed("First", "Second")):
+            parse_and_save_feed(self.feed)
+        response = self.revalidate(self.detail, etag)
+        self.assertContains(response, "Second")
+
+    def test_edits_and_deletes_change_the_list_etag(self):
+        other = RSSFeed.objects.create(user=self.user, url="http://example.com/other")
+        etag = self.client.get(reverse("feed-list"))["ETag"]
+        self.feed.title = "Renamed"
+        self.feed.save()
+        self.assertEqual(self.revalidate(reverse("feed-list"), etag).status_code, 200)
+
+        etag = self.client.get(reverse("feed-list"))["ETag"]
+        RSSFeed.objects.filter(pk=other.pk).delete()
+        self.assertEqual(self.revalidate(reverse("feed-list"), etag).status_code, 200)
+
+    def test_pending_messages_are_always_rendered(self):
+        etag = self.client.get(reverse("feed-list"))["ETag"]
+        self.client.post(reverse("feed-edit", args=[self.feed.pk]), {"url": self.feed.url, "title": "New"})
+        response = self.revalidate(reverse("feed-list"), etag)
+        self.assertContains(response, "Feed updated successfully.")
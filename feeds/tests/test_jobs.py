@@ -0,0 +1,66 @@
+from io import StringIO
+from unittest.mock import patch
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from feeds.models import Job, RSSFeed
+from feeds.services import jobs
+from feeds.testing import FeedServer, rss_document
+
+User = get_user_model()
+
+
+class JobQueueTest(TestCase):
+    def test_claimed_jobs_are_not_claimed_again(self):
+        jobs.enqueue("noop")
+        self.assertEqual(len(jobs.claim_jobs(10)), 1)
+        self.assertEqual(jobs.claim_jobs(10), [])
+
+    def test_failing_handler_requeues_then_fails(self):
+        job = jobs.enqueue("explode")
+        with patch.dict(jobs.HANDLERS, {"explode": lambda batch: 1 / 0}):
+            with self.assertLogs("feeds.services.jobs", "ERROR"):
+                jobs.run_jobs()
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.attempts), (Job.QUEUED, 1))
+
+            Job.objects.filter(pk=job.pk).update(run_after=job.created_at, attempts=jobs.MAX_ATTEMPTS - 1)
+            with self.assertLogs("feeds.services.jobs", "ERROR"):
+                jobs.run_jobs()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIn("division by zero", job.error)
+
+
+@override_settings(FEEDS_ASYNC_SUBSCRIBE=True)
+class AsyncSubscribeTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="john", password="secret")
+        self.client.login(username="john", password="secret")
+
+    @patch("feeds.services.rss_parser.fetch_document")
+    def test_add_feed_returns_without_fetching(self, mock_fetch):
+        response = self.client.post(reverse("feed-add"), {"url": "http://example.com/rss"})
+        feed = RSSFeed.objects.get()
+        self.assertRedirects(response, reverse("feed-detail", kwargs={"pk": feed.pk}))
+        mock_fetch.assert_not_called()
+        self.assertEqual(Job.objects.get().payload, {"source_id": feed.source_id})
+
+        response = self.client.get(reverse("feed-detail", kwargs={"pk": feed.pk}))
+        self.assertContains(response, "Fetching items for this feed")
+
+    def test_worker_runs_first_fetch(self):
+        routes = {"/rss.xml": rss_document("Async", [("One", "Body"), ("Two", "Body")])}
+        with FeedServer(routes) as server:
+            self.client.post(reverse("feed-add"), {"url": server.url("/rss.xml")})
+            self.client.post(reverse("feed-add"), {"url": server.url("/rss.xml")})
+            call_command("run_feed_worker", "--once", stdout=StringIO())
+
+        self.assertEqual(server.requests, 1)
+        self.assertEqual(Job.objects.get().status, Job.DONE)
+        feed = RSSFeed.objects.first()
+        self.assertEqual(feed.items.count(), 2)
+        response = self.client.get(reverse("feed-detail", kwargs={"pk": feed.pk}))
+        self.assertNotContains(response, "Fetching items for this feed")
+        self.assertContains(response, "Feed: Async")
@@ -0,0 +1,75 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from feeds.models import FeedSource, FetchStats, HistogramBucket
+from feeds.services.metrics import observe, render_metrics
+from feeds.services.rss_parser import fetch_feed, save_parsed_feed
+from feeds.testing import FeedServer, rss_document
+
+User = get_user_model()
+
+
+class FetchStatsTest(TestCase):
+    def test_fetches_are_recorded(self):
+        body = rss_document("Feed", [("One", "Body"), ("Two", "Body")])
+        with FeedServer({"/rss": body}) as server:
+            source = FeedSource.objects.create(url=server.url("/rss"))
+            save_parsed_feed(source, fetch_feed(source))
+            save_parsed_feed(source, fetch_feed(FeedSource.objects.get(pk=source.pk)))
+            missing = FeedSource.objects.create(url=server.url("/missing"))
+            save_parsed_feed(missing, fetch_feed(missing))
+
+        stats = FetchStats.objects.get(source=source)
+        self.assertEqual((stats.fetches, stats.errors, stats.last_status), (2, 0, 304))
+        self.assertEqual((stats.total_bytes, stats.total_created), (len(body), 2))
+        self.assertEqual(stats.last_created, 0)
+        self.assertIsNotNone(stats.avg_duration)
+
+        failed = FetchStats.objects.get(source=missing)
+        self.assertEqual((failed.errors, failed.last_error), (1, "HTTP 404"))
+
+    def test_histogram_buckets_are_cumulative(self):
+        observe({"feeds_fetch_duration_seconds": 0.3})
+        observe({"feeds_fetch_duration_seconds": 2, "feeds_parse_duration_seconds": 0.002})
+
+        counts = dict(
+            HistogramBucket.objects.filter(metric="feeds_fetch_duration_seconds").values_list("le", "count")
+        )
+        self.assertEqual((counts[0.25], counts[0.5], counts[2.5], counts[float("inf")]), (0, 1, 2, 2))
+        total = HistogramBucket.objects.get(metric="feeds_fetch_duration_seconds", le=float("inf")).total
+        self.assertAlmostEqual(total, 2.3)
+        self.assertEqual(HistogramBucket.objects.get(metric="feeds_parse_duration_seconds", le=0.005).count, 1)
+
+
+class MetricsViewTest(TestCase):
+    def setUp(self):
+        source = FeedSource.objects.create(url='http://example.com/"slow"')
+        FetchStats.objects.create(source=source, fetches=3, errors=1, avg_duration=4.5, total_created=7)
+        observe({"feeds_fetch_duration_seconds": 0.3})
+
+    def test_prometheus_format(self):
+        text = render_metrics()
+        self.assertIn("# TYPE feeds_fetch_duration_seconds histogram", text)
+        self.assertIn('feeds_fetch_duration_seconds_bucket{le="0.5"} 1', text)
+        self.assertIn('feeds_fetch_duration_seconds_bucket{le="+Inf"} 1', text)
+        self.assertIn("feeds_fetch_duration_seconds_count 1", text)
+        self.assertIn("feeds_parse_duration_seconds_count 0", text)
+        self.assertIn("feeds_fetches_total 3", text)
+        self.assertIn("feeds_items_created_total 7", text)
+        self.assertIn('feeds_source_fetch_duration_seconds{url="http://example.com/\\"slow\\""} 4.5', text)
+
+    def test_requires_staff_or_token(self):
+        User.objects.create_user(username="john", password="secret")
+        self.client.login(username="john", password="secret")
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
+
+        User.objects.create_user(username="admin", password="secret", is_staff=True)
+        self.client.login(username="admin", password="secret")
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+
+    @override_settings(FEEDS_METRICS_TOKEN="s3cret")
+    def test_token_authentication(self):
+        self.assertEqual(self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer wrong").status_code, 403)
+        self.assertEqual(self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer s3cret").status_code, 200)
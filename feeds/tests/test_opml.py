@@ -0,0 +1,114 @@
+from io import BytesIO
+from xml.etree import ElementTree
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from feeds.models import FeedSource, Job, RSSFeed
+from feeds.services.opml import OPMLError, import_opml
+
+User = get_user_model()
+
+
+def opml(*outlines):
+    body = "".join(outlines)
+    return f'<?xml version="1.0"?><opml version="2.0"><head/><body>{body}</body></opml>'.encode()
+
+
+def outline(url, title=""):
+    return f'<outline type="rss" text="{title}" xmlUrl="{url}"/>'
+
+
+class ImportOPMLTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="john", password="secret")
+
+    def test_imports_nested_feeds_and_queues_first_fetches(self):
+        document = opml(
+            outline("http://example.com/a", "Feed A"),
+            '<outline text="News">',
+            outline("http://example.com/b", "Feed B"),
+            "</outline>",
+        )
+        result = import_opml(self.user, BytesIO(document))
+
+        self.assertEqual(result.created, 2)
+        feeds = RSSFeed.objects.filter(user=self.user).order_by("url")
+        self.assertEqual([(feed.url, feed.title) for feed in feeds], [
+            ("http://example.com/a", "Feed A"),
+            ("http://example.com/b", "Feed B"),
+        ])
+        queued = sorted(job.payload["source_id"] for job in Job.objects.filter(kind="fetch_source"))
+        self.assertEqual(queued, sorted(feed.source_id for feed in feeds))
+
+    def test_skips_duplicates_and_invalid_urls(self):
+        RSSFeed.objects.create(user=self.user, url="http://example.com/a")
+        fetched = FeedSource.objects.create(url="http://example.com/b", last_fetched_at=timezone.now())
+        document = opml(
+            outline("HTTP://Example.com:80/a"),
+            outline("http://example.com/b"),
+            outline("http://example.com/b#again"),
+            outline("javascript:alert(1)"),
+            outline(""),
+        )
+        result = import_opml(self.user, BytesIO(document))
+
+        self.assertEqual((result.created, result.skipped, result.invalid), (1, 2, 2))
+        self.assertTrue(RSSFeed.objects.filter(user=self.user, source=fetched).exists())
+        # Already fetched sources are not fetched again.
+        self.assertFalse(Job.objects.filter(kind="fetch_source").exists())
+
+    def test_feeds_are_created_in_bulk(self):
+        document = opml(*(outline(f"http://example.com/{n}") for n in range(300)))
+        with CaptureQueriesContext(connection) as queries:
+            result = import_opml(self.user, BytesIO(document))
+        self.assertEqual(result.created, 300)
+        self.assertLess(len(queries), 20)
+        self.assertEqual(Job.objects.filter(kind="fetch_source").count(), 300)
+
+    def test_stops_at_the_feed_limit(self):
+        document = opml(*(outline(f"http://example.com/{n}") for n in range(5)))
+        result = import_opml(self.user, BytesIO(document), max_feeds=3)
+        self.assertEqual(result.created, 3)
+        self.assertTrue(result.truncated)
+
+    def test_malformed_file_raises(self):
+        with self.assertRaises(OPMLError):
+            import_opml(self.user, BytesIO(b"<opml><body><outline"))
+
+
+class OPMLViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="john", password="secret")
+        self.client.login(username="john", password="secret")
+
+    def test_upload_imports_feeds(self):
+        upload = SimpleUploadedFile("feeds.opml", opml(outline("http://example.com/a", "Feed A")))
+        response = self.client.post(reverse("opml-import"), {"file": upload}, follow=True)
+        self.assertRedirects(response, reverse("feed-list"))
+        self.assertContains(response, "Imported 1 feeds")
+        self.assertContains(response, "Feed A")
+
+    def test_upload_of_invalid_file_shows_error(self):
+        upload = SimpleUploadedFile("feeds.opml", b"not xml")
+        response = self.client.post(reverse("opml-import"), {"file": upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Not a valid OPML file")
+
+    def test_export_round_trips(self):
+        RSSFeed.objects.create(user=self.user, url="http://example.com/a", title='Tom & "Jerry"')
+        RSSFeed.objects.create(user=self.user, url="http://example.com/b?x=1&y=2")
+        response = self.client.get(reverse("opml-export"))
+        self.assertIn("attachment", response["Content-Disposition"])
+
+        document = ElementTree.fromstring(b"".join(response.streaming_content))
+        outlines = [(node.get("xmlUrl"), node.get("title")) for node in document.iter("outline")]
+        self.assertEqual(outlines, [
+            ("http://example.com/a", 'Tom & "Jerry"'),
+            ("http://example.com/b?x=1&y=2", "http://example.com/b?x=1&y=2"),
+        ])
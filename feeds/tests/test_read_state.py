@@ -0,0 +1,145 @@
+from datetime import datetime, timedelta, timezone
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from feeds.models import ItemState, RSSFeed, RSSItem
+from feeds.services.read_state import (
+    mark_all_read, prune_item_states, set_read, set_starred, unread_items, with_unread_counts,
+)
+from feeds.services.retention import prune_source
+
+User = get_user_model()
+NOW = datetime(2025, 5, 5, 12, 0, tzinfo=timezone.utc)
+
+
+class ReadStateTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="john", password="secret")
+        self.feed = RSSFeed.objects.create(user=self.user, url="http://example.com/rss")
+        self.items = [self.add_item(n) for n in range(5)]
+
+    def add_item(self, n):
+        return RSSItem.objects.create(
+            source=self.feed.source, guid=str(n), title=f"Item {n}", description="", pub_date=NOW + timedelta(hours=n)
+        )
+
+    def unread(self):
+        self.feed.refresh_from_db()
+        titles = sorted(unread_items(self.feed).values_list("title", flat=True))
+        count = with_unread_counts(RSSFeed.objects.filter(pk=self.feed.pk)).get().unread_count
+        self.assertEqual(count, len(titles))
+        return titles
+
+    def test_new_subscription_is_all_unread(self):
+        self.assertEqual(len(self.unread()), 5)
+
+    def test_exceptions_around_the_watermark(self):
+        set_read(self.feed, self.items[0])
+        self.assertEqual(self.unread(), ["Item 1", "Item 2", "Item 3", "Item 4"])
+
+        # Two UPDATEs, then the subscriptions whose cached pages are invalidated.
+        with self.assertNumQueries(3):
+            self.assertEqual(mark_all_read(RSSFeed.objects.filter(pk=self.feed.pk)), 1)
+        self.assertEqual(self.unread(), [])
+
+        set_read(self.feed, self.items[2], read=False)
+        new = self.add_item(5)
+        self.assertEqual(self.unread(), ["Item 2", "Item 5"])
+
+        set_read(self.feed, new)
+        set_read(self.feed, self.items[2])
+        self.assertEqual(self.unread(), [])
+        # Only the exception above the watermark is kept, once the row
+        # recorded before mark_all_read is cleared.
+        self.assertEqual(prune_item_states(), 1)
+        self.assertEqual(list(ItemState.objects.values_list("item", "read")), [(new.pk, True)])
+
+    def test_mark_all_read_overrides_earlier_exceptions(self):
+        mark_all_read(RSSFeed.objects.filter(pk=self.feed.pk))
+        self.feed.refresh_from_db()
+        set_read(self.feed, self.items[1], read=False)
+        self.add_item(5)
+        mark_all_read(RSSFeed.objects.filter(pk=self.feed.pk))
+        self.assertEqual(self.unread(), [])
+        self.assertEqual(prune_item_states(), 1)
+        self.assertFalse(ItemState.objects.exists())
+
+    def test_mark_all_read_without_new_items(self):
+        mark_all_read(RSSFeed.objects.filter(pk=self.feed.pk))
+        self.feed.refresh_from_db()
+        set_read(self.feed, self.items[1], read=False)
+        self.assertEqual(self.unread(), ["Item 1"])
+
+        mark_all_read(RSSFeed.objects.filter(pk=self.feed.pk))
+        self.assertEqual(self.unread(), [])
+        self.assertEqual(prune_item_states(), 1)
+
+    def test_stars_survive_retention_and_mark_all_read(self):
+        set_starred(self.feed, self.items[0])
+        mark_all_read(RSSFeed.objects.filter(pk=self.feed.pk))
+        self.assertEqual(prune_item_states(), 0)
+
+        self.feed.source.record_items(5, NOW)
+        prune_source(self.feed.source, max_items=2)
+        remaining = sorted(self.feed.source.items.values_list("title", flat=True))
+        self.assertEqual(remaining, ["Item 0", "Item 3", "Item 4"])
+
+        set_starred(self.feed, self.items[0], starred=False)
+        self.assertFalse(ItemState.objects.exists())
+
+    def test_changing_the_url_resets_read_state(self):
+        mark_all_read(RSSFeed.objects.filter(pk=self.feed.pk))
+        self.feed.refresh_from_db()
+        set_read(self.feed, self.items[4], read=False)
+        self.feed.url = "http://example.com/other"
+        self.feed.save()
+        self.feed.refresh_from_db()
+        self.assertEqual(self.feed.read_up_to, 0)
+        self.assertFalse(ItemState.objects.exists())
+
+
+class ReadStateViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="john", password="secret")
+        self.feed = RSSFeed.objects.create(user=self.user, url="http://example.com/rss")
+        self.item = RSSItem.objects.create(
+            source=self.feed.source, guid="1", title="First", description="", pub_date=NOW
+        )
+        RSSItem.objects.create(source=self.feed.source, guid="2", title="Second", description="", pub_date=NOW)
+        self.client.login(username="john", password="secret")
+
+    def test_unread_badges_and_filter(self):
+        response = self.client.get(reverse("feed-list"))
+        self.assertContains(response, "2 unread")
+
+        url = reverse("item-state", args=[self.feed.pk, self.item.pk])
+        detail = reverse("feed-detail", args=[self.feed.pk])
+        response = self.client.post(url, {"read": "1", "next": detail + "?unread=1"})
+        self.assertRedirects(response, detail + "?unread=1")
+
+        self.assertContains(self.client.get(reverse("feed-list")), "1 unread")
+        response = self.client.get(detail, {"unread": "1"})
+        self.assertNotContains(response, "First")
+        self.assertContains(response, "Second")
+
+        self.client.post(reverse("mark-all-read"))
+        self.assertNotContains(self.client.get(reverse("feed-list")), "unread")
+
+    def test_starred_page(self):
+        url = reverse("item-state", args=[self.feed.pk, self.item.pk])
+        response = self.client.post(url, {"starred": "1", "next": "http://evil.example.com/"})
+        self.assertRedirects(response, reverse("feed-detail", args=[self.feed.pk]), fetch_redirect_response=False)
+
+        response = self.client.get(reverse("starred"))
+        self.assertContains(response, "First")
+        self.assertNotContains(response, "Second")
+
+    def test_other_users_cannot_change_state(self):
+        User.objects.create_user(username="alice", password="secret")
+        self.client.login(username="alice", password="secret")
+        response = self.client.post(reverse("item-state", args=[self.feed.pk, self.item.pk]), {"read": "1"})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.client.post(reverse("feed-mark-read", args=[self.feed.pk])).status_code, 404)
+        self.assertFalse(ItemState.objects.exists())
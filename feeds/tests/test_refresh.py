@@ -0,0 +1,70 @@
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from feeds.models import FeedSource, RSSFeed, RSSItem
+from feeds.services import refresh_sources
+from feeds.testing import FeedServer, rss_document
+
+User = get_user_model()
+
+
+class RefreshFeedsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="john", password="secret")
+        self.routes = {
+            f"/feed{n}.xml": rss_document(f"Feed {n}", [(f"Item {n}-{i}", "Body") for i in range(3)])
+            for n in range(6)
+        }
+
+    def create_sources(self, server):
+        return [
+            RSSFeed.objects.create(user=self.user, url=server.url(path)).source
+            for path in sorted(self.routes)
+        ]
+
+    def test_refresh_fetches_concurrently_within_host_limit(self):
+        with FeedServer(self.routes, delay=0.1) as server:
+            sources = self.create_sources(server)
+            report = refresh_sources(sources, max_workers=6, per_host=2)
+
+        self.assertEqual(report.failed, 0)
+        self.assertEqual(report.total("created"), 18)
+        self.assertEqual(RSSItem.objects.count(), 18)
+        self.assertEqual(server.peak_in_flight, 2)
+        self.assertEqual(FeedSource.objects.get(pk=sources[0].pk).title, "Feed 0")
+
+    def test_second_refresh_is_not_modified(self):
+        with FeedServer(self.routes) as server:
+            sources = self.create_sources(server)
+            refresh_sources(sources)
+            report = refresh_sources(FeedSource.objects.all())
+
+        self.assertTrue(all(o.result.not_modified for o in report.outcomes))
+        self.assertEqual(RSSItem.objects.count(), 18)
+
+    def test_failing_feeds_are_reported(self):
+        with FeedServer(self.routes) as server:
+            missing = RSSFeed.objects.create(user=self.user, url=server.url("/missing.xml")).source
+            with self.assertLogs("feeds.services.refresh", "WARNING"):
+                report = refresh_sources([missing])
+            self.assertEqual(report.outcomes[0].error, "HTTP 404")
+
+        unreachable = RSSFeed.objects.create(user=self.user, url=server.url("/feed0.xml")).source
+        with self.assertLogs("feeds.services.refresh", "WARNING"):
+            report = refresh_sources([unreachable])
+        self.assertEqual(report.failed, 1)
+
+    def test_command_prints_throughput_and_percentiles(self):
+        out = StringIO()
+        other = User.objects.create_user(username="alice", password="secret")
+        with FeedServer(self.routes) as server:
+            for source in self.create_sources(server):
+                RSSFeed.objects.create(user=other, url=source.url)
+            call_command("refresh_feeds", "--workers", "4", stdout=out)
+        output = out.getvalue()
+        self.assertEqual(server.requests, 6)
+        self.assertIn("Refreshed 6 feeds", output)
+        self.assertIn("18 new", output)
+        self.assertIn("feeds/s", output)
+        self.assertIn("p99=", output)
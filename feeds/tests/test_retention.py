@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta, timezone
+from io import StringIO
+import feedparser
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from feeds.models import FeedSource, RSSFeed, RSSItem
+from feeds.services.retention import prune_source
+from feeds.services.rss_parser import normalize_entry, save_entries
+from feeds.services.search import search_items
+from feeds.testing import rss_document
+
+User = get_user_model()
+NOW = datetime(2025, 5, 5, 12, 0, tzinfo=timezone.utc)
+
+
+class RetentionTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="john", password="secret")
+        self.source = RSSFeed.objects.create(user=self.user, url="http://example.com/rss").source
+        # Items 0..9, one day apart, newest first; items 8 and 9 share a date.
+        for n in range(10):
+            RSSItem.objects.create(
+                source=self.source, guid=str(n), title=f"Item {n}", description="oldnews", search_text="oldnews",
+                pub_date=NOW - timedelta(days=min(n, 8)),
+            )
+        self.source.record_items(10, NOW)
+
+    def remaining(self):
+        return sorted(int(guid) for guid in self.source.items.values_list("guid", flat=True))
+
+    def test_keeps_newest_items_in_bounded_batches(self):
+        result = prune_source(self.source, max_items=3, batch_size=2)
+        self.assertEqual((result.deleted, result.batches), (7, 4))
+        self.assertEqual(self.remaining(), [0, 1, 2])
+        self.source.refresh_from_db()
+        self.assertEqual(self.source.item_count, 3)
+
+    def test_cut_off_between_items_with_the_same_date(self):
+        prune_source(self.source, max_items=9)
+        self.assertEqual(self.remaining(), list(range(8)) + [9])
+
+    def test_max_age_and_max_items_combine(self):
+        prune_source(self.source, max_items=5, max_age=timedelta(days=2, hours=1), now=NOW)
+        self.assertEqual(self.remaining(), [0, 1, 2])
+
+    def test_pruned_items_leave_the_search_index(self):
+        prune_source(self.source, max_items=1)
+        self.assertEqual(len(search_items(self.user, "oldnews")), 1)
+
+    def test_pruned_entries_are_not_ingested_again(self):
+        source = RSSFeed.objects.create(user=self.user, url="http://example.com/other").source
+
+        def ingest(count):
+            parsed = feedparser.parse(rss_document("Other", [(f"Entry {n}", "Body") for n in range(count)]))
+            return save_entries(FeedSource.objects.get(pk=source.pk), map(normalize_entry, parsed.entries))
+
+        self.assertEqual(ingest(10).created, 10)
+        self.assertEqual(prune_source(source, max_items=3).deleted, 7)
+        self.assertEqual(ingest(10).created, 0)
+        self.assertEqual(ingest(11).created, 1)
+        source.refresh_from_db()
+        self.assertEqual((source.item_count, source.items.count()), (4, 4))
+
+    def test_command_reports_deleted_items_and_space(self):
+        out = StringIO()
+        call_command("prune_items", "--max-items", "4", stdout=out)
+        self.assertIn(f"Source {self.source.pk}: deleted 6 items", out.getvalue())
+        self.assertIn("Reclaimed", out.getvalue())
+
+        call_command("prune_items", "--max-items", "4", "--resume-after", str(self.source.pk), stdout=out)
+        self.assertIn("Deleted 0 items from 0 sources", out.getvalue())
+
+    def test_command_requires_a_limit(self):
+        with self.assertRaises(CommandError):
+            call_command("prune_items", stdout=StringIO())
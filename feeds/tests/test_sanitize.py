@@ -0,0 +1,32 @@
+from django.test import SimpleTestCase
+from feeds.services.sanitize import MAX_HTML_LENGTH, render_description
+
+
+class SanitizeTest(SimpleTestCase):
+    def test_dangerous_markup_is_removed(self):
+        html, _, _ = render_description(
+            '<p onclick="steal()">Hi<script>alert(1)</script>'
+            '<a href="javascript:alert(1)">x</a><img src="http://example.com/a.png" onerror="y()">'
+            '<iframe src="http://evil.example"></iframe><style>p{}</style></p>'
+        )
+        self.assertEqual(
+            html,
+            '<p>Hi<a rel="nofollow noopener noreferrer" target="_blank">x</a>'
+            '<img src="http://example.com/a.png"></p>',
+        )
+
+    def test_unknown_tags_are_unwrapped_and_text_escaped(self):
+        html, text, _ = render_description("<div>Fish &amp; <blink>chips</blink> &lt;3</div>")
+        self.assertEqual(html, "Fish &amp; chips &lt;3")
+        self.assertEqual(text, "Fish & chips <3")
+
+    def test_unclosed_and_misnested_tags_are_balanced(self):
+        self.assertEqual(render_description("<ul><li>one<li>two")[0], "<ul><li>one</li><li>two</li></ul>")
+        self.assertEqual(render_description("<b><i>x</b> y</i>")[0], "<b><i>x</i></b> y")
+
+    def test_output_and_excerpt_are_capped(self):
+        html, text, _ = render_description("<p>" + "word &amp; " * 100_000 + "</p>")
+        self.assertLessEqual(len(html), MAX_HTML_LENGTH)
+        self.assertTrue(html.endswith("…</p>"))
+        self.assertLessEqual(len(text), 281)
+        self.assertTrue(text.endswith("…"))
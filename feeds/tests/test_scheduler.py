@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta, timezone
+from io import StringIO
+from types import SimpleNamespace
+from django.core.management import call_command
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from feeds.models import FeedSource, RSSFeed, RSSItem
+from feeds.services.rss_parser import IngestResult, parse_skip_hours
+from feeds.services.scheduler import record_failure, schedule_next_fetch
+from feeds.testing import FeedServer, rss_document
+
+User = get_user_model()
+NOW = datetime(2025, 5, 5, 12, 0, tzinfo=timezone.utc)
+
+
+def parsed_feed(headers=None, ttl=None, skip_hours=None):
+    return SimpleNamespace(
+        feed={"ttl": ttl} if ttl else {},
+        headers=headers or {},
+        skip_hours=skip_hours or set(),
+    )
+
+
+class ScheduleNextFetchTest(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username="john", password="secret")
+        self.source = RSSFeed.objects.create(user=user, url="http://example.com/rss").source
+
+    def add_items(self, count, gap):
+        for n in range(count):
+            RSSItem.objects.create(
+                source=self.source, guid=str(n), title=f"Item {n}", description="", pub_date=NOW - gap * n
+            )
+
+    def test_interval_follows_posting_rate(self):
+        self.add_items(5, timedelta(hours=4))
+        schedule_next_fetch(self.source, parsed_feed(), IngestResult(created=5), now=NOW)
+        self.assertEqual(self.source.next_fetch_at, NOW + timedelta(hours=2))
+
+    def test_busy_feed_is_clamped_to_minimum_interval(self):
+        self.add_items(5, timedelta(minutes=1))
+        schedule_next_fetch(self.source, parsed_feed(), IngestResult(created=5), now=NOW)
+        self.assertEqual(self.source.next_fetch_at, NOW + timedelta(minutes=15))
+
+    def test_cache_headers_and_ttl_extend_interval(self):
+        self.source.poll_interval = 1800
+        schedule_next_fetch(self.source, parsed_feed(headers={"cache-control": "max-age=7200"}), IngestResult(), now=NOW)
+        self.assertEqual(self.source.next_fetch_at, NOW + timedelta(hours=2))
+
+        schedule_next_fetch(self.source, parsed_feed(ttl="180"), IngestResult(), now=NOW)
+        self.assertEqual(self.source.next_fetch_at, NOW + timedelta(hours=3))
+
+    def test_skip_hours_are_honoured(self):
+        self.source.poll_interval = 3600
+        schedule_next_fetch(self.source, parsed_feed(skip_hours={13, 14}), IngestResult(), now=NOW)
+        self.assertEqual(self.source.next_fetch_at, datetime(2025, 5, 5, 15, 0, tzinfo=timezone.utc))
+
+    def test_parse_skip_hours(self):
+        body = b"<rss><channel><skipHours><hour>1</hour><hour> 2 </hour></skipHours></channel></rss>"
+        self.assertEqual(parse_skip_hours(body), {1, 2})
+        self.assertEqual(parse_skip_hours(b"<rss/>"), set())
+
+    def test_failures_back_off_exponentially(self):
+        record_failure(self.source, status=500, now=NOW)
+        self.assertEqual(self.source.next_fetch_at, NOW + timedelta(minutes=15))
+        record_failure(self.source, status=500, now=NOW)
+        record_failure(self.source, status=500, now=NOW)
+        self.assertEqual(self.source.next_fetch_at, NOW + timedelta(hours=1))
+        for _ in range(10):
+            record_failure(self.source, now=NOW)
+        self.source.refresh_from_db()
+        self.assertEqual(self.source.error_count, 13)
+        self.assertEqual(self.source.next_fetch_at, NOW + timedelta(hours=24))
+
+
+class FeedWorkerTest(TestCase):
+    def test_worker_refreshes_only_due_sources(self):
+        user = User.objects.create_user(username="john", password="secret")
+        routes = {"/a.xml": rss_document("A", [("One", "Body")]), "/b.xml": rss_document("B", [])}
+        with FeedServer(routes) as server:
+            due = RSSFeed.objects.create(user=user, url=server.url("/a.xml")).source
+            later = RSSFeed.objects.create(user=user, url=server.url("/b.xml")).source
+            later.next_fetch_at = NOW + timedelta(days=36500)
+            later.save()
+            FeedSource.objects.create(url=server.url("/unsubscribed.xml"))
+            self.assertEqual(list(FeedSource.objects.due()), [due])
+
+            out = StringIO()
+            call_command("run_feed_worker", "--once", stdout=out)
+
+        self.assertEqual(server.requests, 1)
+        self.assertIn("Refreshed 1 feeds", out.getvalue())
+        due.refresh_from_db()
+        self.assertGreater(due.next_fetch_at, NOW)
+        self.assertFalse(FeedSource.objects.due().filter(pk=due.pk).exists())
@@ -0,0 +1,70 @@
+from datetime import datetime, timezone
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from feeds.models import RSSFeed, RSSItem
+from feeds.services.sanitize import render_description
+from feeds.services.search import fts_query, search_items
+
+User = get_user_model()
+
+
+class SearchTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="john", password="secret")
+        other_user = User.objects.create_user(username="alice", password="secret")
+        self.source = RSSFeed.objects.create(user=self.user, url="http://example.com/rss", title="Mine").source
+        self.other_source = RSSFeed.objects.create(user=other_user, url="http://example.com/other").source
+
+    def add_item(self, source, guid, title, description=""):
+        return RSSItem.objects.create(
+            source=source, guid=guid, title=title, description=description,
+            search_text=render_description(description)[2], pub_date=datetime(2025, 5, 5, tzinfo=timezone.utc),
+        )
+
+    def titles(self, text):
+        return [item.title for item in search_items(self.user, text)]
+
+    def test_results_are_ranked_and_scoped_to_user(self):
+        self.add_item(self.source, "1", "Weekly roundup", "Notes about python packaging")
+        self.add_item(self.source, "2", "Python 3.14 released", "Release notes")
+        self.add_item(self.other_source, "3", "Python tips", "Only for alice")
+
+        self.assertEqual(self.titles("python"), ["Python 3.14 released", "Weekly roundup"])
+
+    def test_index_follows_updates_and_deletes(self):
+        item = self.add_item(self.source, "1", "Kernel news", "Scheduler changes")
+        item.search_text = "Filesystem changes"
+        item.save()
+        self.assertEqual(self.titles("scheduler"), [])
+        self.assertEqual(self.titles("filesystem"), ["Kernel news"])
+
+        item.delete()
+        self.assertEqual(self.titles("kernel"), [])
+
+    def test_markup_is_not_indexed(self):
+        self.add_item(self.source, "1", "Links", '<div class="sidebar"><a href="http://example.com/x">Hello</a></div>')
+        self.assertEqual(self.titles("sidebar"), [])
+        self.assertEqual(self.titles("href"), [])
+        self.assertEqual(self.titles("hello"), ["Links"])
+
+    def test_operators_in_input_are_treated_as_words(self):
+        self.add_item(self.source, "1", "AND or NOT", "")
+        self.assertEqual(fts_query('"AND" (or'), '"AND" "or"*')
+        self.assertEqual(self.titles('"AND" (or'), ["AND or NOT"])
+        self.assertEqual(self.titles('"*()'), [])
+
+    def test_search_view_and_api(self):
+        self.add_item(self.source, "1", "Django tips", "")
+        self.client.login(username="john", password="secret")
+
+        response = self.client.get(reverse("search"), {"q": "djan"})
+        self.assertContains(response, "Django tips")
+        self.assertContains(response, "Mine &middot;")
+
+        data = self.client.get(reverse("api-search"), {"q": "django"}).json()
+        self.assertEqual([result["title"] for result in data["results"]], ["Django tips"])
+        self.assertEqual(data["results"][0]["feed"], "Mine")
+
+    def test_api_requires_authentication(self):
+        self.assertEqual(self.client.get(reverse("api-search"), {"q": "x"}).status_code, 403)
@@ -1,17 +1,21 @@
-from unittest.mock import patch, Mock
+from unittest.mock import patch
+from types import SimpleNamespace
 from django.test import TestCase
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 from feeds.models import RSSFeed, RSSItem
 from feeds.services import parse_and_save_feed
+from feeds.services.http import FetchedDocument
+from feeds.services.rss_parser import entry_guid
 import time
 
 User = get_user_model()
 
 class RSSFeedParserTest(TestCase):
-    @patch("feeds.services.rss_parser.feedparser.parse")
+    @patch("feeds.services.rss_parser.fetch_feed")
     def test_parse_and_save_feed_creates_items(self, mock_parse):
         # Mock the parsed feed structure
-        mock_parsed = Mock()
+        mock_parsed = SimpleNamespace()
         mock_parsed.feed = {"title": "Mock Feed Title"}
         mock_parsed.entries = [{
             "title": "Mock Title",
@@ -30,9 +34,191 @@ class RSSFeedParserTest(TestCase):
         parse_and_save_feed(feed)
 
         # Assert that item was saved
-        item = RSSItem.objects.get(feed=feed)
+        item = feed.items.get()
         self.assertEqual(item.title, "Mock Title")
         self.assertEqual(item.description, "Mock Description")
+        self.assertEqual(item.description_html, "Mock Description")
+        self.assertEqual(item.excerpt, "Mock Description")
         self.assertEqual(item.link, "http://example.com/test-item")
         self.assertEqual(item.image_url, "http://example.com/image.jpg")
         self.assertIsNotNone(item.pub_date)
+
+
+class BatchedIngestTest(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username="john", password="secret")
+        self.feed = RSSFeed.objects.create(user=user, url="http://mock.url/rss")
+
+    def make_parsed(self, entries):
+        mock_parsed = SimpleNamespace()
+        mock_parsed.feed = {"title": "Mock Feed Title"}
+        mock_parsed.entries = entries
+        return mock_parsed
+
+    def make_entry(self, n, summary="Body"):
+        return {
+            "title": f"Item {n}",
+            "summary": summary,
+            "link": f"http://example.com/{n}",
+            "published_parsed": time.struct_time((2025, 5, 5, 12, 0, n % 60, 0, 0, 0)),
+        }
+
+    @patch("feeds.services.rss_parser.fetch_feed")
+    def test_query_count_does_not_grow_with_entries(self, mock_parse):
+        mock_parse.return_value = self.make_parsed([self.make_entry(n) for n in range(50)])
+        # savepoint, existing-item select, insert, item stats update, release,
+        # posting-rate select, source update, subscriber select for cache invalidation,
+        # then the fetch stats (3) and histogram updates (6), which create their rows
+        # on this first fetch and take one query each afterwards
+        with self.assertNumQueries(17):
+            result = parse_and_save_feed(self.feed)
+        self.assertEqual(result.created, 50)
+        self.assertEqual(self.feed.items.count(), 50)
+        self.feed.source.refresh_from_db()
+        self.assertEqual(self.feed.source.item_count, 50)
+        self.assertEqual(self.feed.source.latest_pub_date, self.feed.items.latest("pub_date").pub_date)
+
+    @patch("feeds.services.rss_parser.fetch_feed")
+    def test_reingest_reports_skipped_and_updated(self, mock_parse):
+        entries = [self.make_entry(n) for n in range(3)]
+        mock_parse.return_value = self.make_parsed(entries)
+        parse_and_save_feed(self.feed)
+
+        entries[0] = self.make_entry(0, summary="Edited")
+        entries.append({"summary": "no title"})
+        result = parse_and_save_feed(self.feed)
+
+        self.assertEqual((result.created, result.updated, result.skipped), (0, 1, 3))
+        self.assertEqual(self.feed.items.get(title="Item 0").description, "Edited")
+
+
+    @patch("feeds.services.rss_parser.fetch_feed")
+    def test_items_are_keyed_by_guid_not_title(self, mock_parse):
+        entries = [
+            {"id": "urn:1", "title": "Daily digest", "summary": "Monday"},
+            {"id": "urn:2", "title": "Daily digest", "summary": "Tuesday"},
+        ]
+        mock_parse.return_value = self.make_parsed(entries)
+        self.assertEqual(parse_and_save_feed(self.feed).created, 2)
+
+        entries[0] = {"id": "urn:1", "title": "Daily digest (corrected)", "summary": "Monday"}
+        result = parse_and_save_feed(self.feed)
+
+        self.assertEqual((result.created, result.updated, result.skipped), (0, 1, 1))
+        self.assertEqual(self.feed.items.get(guid="urn:1").title, "Daily digest (corrected)")
+        self.assertEqual(self.feed.items.count(), 2)
+
+    @patch("feeds.services.rss_parser.fetch_feed")
+    def test_items_stored_before_guids_are_adopted(self, mock_parse):
+        # As left by migration 0014: keyed by link or title hash, without a content hash.
+        for guid, title in [("http://example.com/post", "Post"), (entry_guid({}, "Linkless"), "Linkless")]:
+            RSSItem.objects.create(
+                source=self.feed.source, guid=guid, title=title, description="Old", pub_date=timezone.now()
+            )
+        entries = [
+            {"id": "urn:uuid:1", "title": "Post", "link": "http://example.com/post", "summary": "Body"},
+            {"id": "urn:uuid:2", "title": "Linkless", "summary": "Body"},
+        ]
+        mock_parse.return_value = self.make_parsed(entries)
+
+        result = parse_and_save_feed(self.feed)
+        self.assertEqual((result.created, result.updated), (0, 2))
+        self.assertEqual(sorted(self.feed.items.values_list("guid", flat=True)), ["urn:uuid:1", "urn:uuid:2"])
+        self.assertEqual(parse_and_save_feed(self.feed).skipped, 2)
+
+    def test_guid_falls_back_to_link_then_title_hash(self):
+        self.assertEqual(entry_guid({"id": "urn:1", "link": "http://example.com/1"}, "T"), "urn:1")
+        self.assertEqual(entry_guid({"link": "http://example.com/1"}, "T"), "http://example.com/1")
+        self.assertTrue(entry_guid({}, "T").startswith("title:"))
+        self.assertEqual(entry_guid({}, "T"), entry_guid({}, "T"))
+        self.assertLessEqual(len(entry_guid({"id": "x" * 1000}, "T")), 255)
+
+    @patch("feeds.services.rss_parser.fetch_feed")
+    def test_undated_entries_keep_their_first_date(self, mock_parse):
+        entries = [{"id": "urn:1", "title": "Undated", "summary": "Old"}]
+        mock_parse.return_value = self.make_parsed(entries)
+        parse_and_save_feed(self.feed)
+        first_date = self.feed.items.get().pub_date
+
+        entries[0] = {"id": "urn:1", "title": "Undated", "summary": "New"}
+        parse_and_save_feed(self.feed)
+
+        item = self.feed.items.get()
+        self.assertEqual(item.description, "New")
+        self.assertEqual(item.pub_date, first_date)
+
+
+class ConditionalFetchTest(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username="john", password="secret")
+        self.feed = RSSFeed.objects.create(user=user, url="http://mock.url/rss")
+        self.source = self.feed.source
+
+    @patch("feeds.services.rss_parser.fetch_document")
+    def test_validators_are_stored_and_sent_back(self, mock_fetch):
+        mock_fetch.return_value = FetchedDocument(
+            url="http://mock.url/rss",
+            status=200,
+            headers={"etag": '"abc"', "last-modified": "Mon, 05 May 2025 12:00:00 GMT"},
+            body=b'<rss version="2.0"><channel><title>Mock Feed Title</title></channel></rss>',
+        )
+        parse_and_save_feed(self.feed)
+        self.source.refresh_from_db()
+        self.assertEqual(self.source.etag, '"abc"')
+        self.assertEqual(self.source.last_status, 200)
+        self.assertEqual(self.source.title, "Mock Feed Title")
+        self.assertIsNotNone(self.source.last_fetched_at)
+
+        parse_and_save_feed(self.feed)
+        mock_fetch.assert_called_with(
+            "http://mock.url/rss", etag='"abc"', modified="Mon, 05 May 2025 12:00:00 GMT", timeout=None
+        )
+
+    @patch("feeds.services.rss_parser.fetch_document")
+    def test_not_modified_skips_item_writes(self, mock_fetch):
+        self.source.etag = '"abc"'
+        self.source.poll_interval = 3600
+        self.source.last_fetched_at = timezone.now()
+        self.source.save()
+        mock_fetch.return_value = FetchedDocument(url="http://mock.url/rss", status=304)
+
+        parse_and_save_feed(self.feed)
+        # source update, fetch stats update, histogram update
+        with self.assertNumQueries(3):
+            result = parse_and_save_feed(self.feed)
+
+        self.assertTrue(result.not_modified)
+        self.source.refresh_from_db()
+        self.assertEqual(self.source.etag, '"abc"')
+        self.assertEqual(self.source.last_status, 304)
+
+
+class SharedSourceTest(TestCase):
+    @patch("feeds.services.rss_parser.fetch_feed")
+    def test_subscribers_share_items(self, mock_parse):
+        mock_parse.return_value = SimpleNamespace(
+            feed={"title": "Shared"},
+            entries=[{"title": "One", "summary": "", "link": "http://example.com/1"}],
+        )
+        john = User.objects.create_user(username="john", password="secret")
+        alice = User.objects.create_user(username="alice", password="secret")
+        first = RSSFeed.objects.create(user=john, url="HTTP://Example.com:80/rss#top")
+        second = RSSFeed.objects.create(user=alice, url="http://example.com/rss", title="Mine")
+
+        parse_and_save_feed(first)
+
+        self.assertEqual(first.source_id, second.source_id)
+        self.assertEqual(first.source.url, "http://example.com/rss")
+        self.assertEqual(RSSItem.objects.count(), 1)
+        self.assertEqual(second.items.count(), 1)
+        self.assertEqual(first.display_title, "Shared")
+        self.assertEqual(second.display_title, "Mine")
+
+    def test_changing_url_moves_subscription_to_another_source(self):
+        user = User.objects.create_user(username="john", password="secret")
+        feed = RSSFeed.objects.create(user=user, url="http://example.com/rss")
+        old_source = feed.source
+        feed.url = "http://example.org/rss"
+        feed.save()
+        self.assertNotEqual(feed.source_id, old_source.pk)
+        self.assertEqual(feed.source.url, "http://example.org/rss")
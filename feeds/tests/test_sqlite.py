@@ -0,0 +1,102 @@
+import tempfile
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+from unittest import skipUnless
+from django.db import connection, connections
+from django.test import SimpleTestCase
+
+
+@skipUnless(connection.vendor == "sqlite", "SQLite tuning")
+class SQLiteConcurrencyTest(SimpleTestCase):
+    """
+    Runs against a database file, since the in-memory test database has no WAL.
+    """
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "db.sqlite3"
+        with closing(self.open_connection()) as setup:
+            setup.cursor().execute("CREATE TABLE item (id INTEGER PRIMARY KEY, title TEXT)")
+            setup.cursor().executemany("INSERT INTO item (title) VALUES (%s)", [(f"Item {n}",) for n in range(100)])
+
+    def open_connection(self):
+        """
+        Opens a connection to the file with the project's database options.
+        """
+        default = connections["default"]
+        wrapper = default.__class__({**default.settings_dict, "NAME": str(self.path)}, alias="tuned")
+        wrapper.ensure_connection()
+        return wrapper
+
+    def count(self, db):
+        with db.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM item")
+            return cursor.fetchone()[0]
+
+    def ingest(self, writing, release, rows=5000):
+        """
+        Inserts rows in one transaction, holding the write lock until ``release`` is set.
+        """
+        db = self.open_connection()
+        try:
+            db.set_autocommit(False)
+            with db.cursor() as cursor:
+                cursor.executemany("INSERT INTO item (title) VALUES (%s)", [(f"New {n}",) for n in range(rows)])
+            writing.set()
+            release.wait(5)
+            db.commit()
+        finally:
+            db.close()
+
+    def test_pragmas_are_applied_to_every_connection(self):
+        with closing(self.open_connection()) as db, db.cursor() as cursor:
+            pragmas = {}
+            for name in ("journal_mode", "synchronous", "busy_timeout", "temp_store"):
+                cursor.execute(f"PRAGMA {name}")
+                pragmas[name] = cursor.fetchone()[0]
+        self.assertEqual(pragmas, {"journal_mode": "wal", "synchronous": 1, "busy_timeout": 20000, "temp_store": 2})
+
+    def test_readers_are_not_blocked_by_a_running_ingest(self):
+        writing, release = threading.Event(), threading.Event()
+        writer = threading.Thread(target=self.ingest, args=(writing, release))
+        writer.start()
+        self.assertTrue(writing.wait(5))
+
+        reader = self.open_connection()
+        try:
+            started = time.perf_counter()
+            counts = [self.count(reader) for _ in range(20)]
+            elapsed = time.perf_counter() - started
+            # Reads see the last committed state, without waiting for the writer.
+            self.assertEqual(set(counts), {100})
+            self.assertLess(elapsed, 1)
+            release.set()
+            writer.join()
+            self.assertEqual(self.count(reader), 5100)
+        finally:
+            release.set()
+            writer.join()
+            reader.close()
+
+    def test_concurrent_writers_wait_for_the_lock(self):
+        writing, release = threading.Event(), threading.Event()
+        first = threading.Thread(target=self.ingest, args=(writing, release, 10))
+        first.start()
+        self.assertTrue(writing.wait(5))
+
+        second_done, no_wait = threading.Event(), threading.Event()
+        no_wait.set()
+        second = threading.Thread(target=self.ingest, args=(second_done, no_wait, 10))
+        second.start()
+        time.sleep(0.3)
+        # The second transaction is queued behind the first instead of failing.
+        self.assertFalse(second_done.is_set())
+        release.set()
+        first.join()
+        second.join()
+
+        with closing(self.open_connection()) as db:
+            self.assertEqual(self.count(db), 120)
@@ -0,0 +1,129 @@
+import gzip
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from feeds.models import FeedSource, RSSFeed, RSSItem
+from feeds.services.http import FetchedDocument
+from feeds.services.rss_parser import (
+    fetch_error, fetch_feed, normalize_entry, parse_document, save_entry_stream, save_parsed_feed,
+)
+from feeds.testing import FeedServer, rss_document
+
+User = get_user_model()
+
+ATOM_DOCUMENT = b"""<?xml version="1.0"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:media="http://search.yahoo.com/mrss/">
+  <title>Atom Feed</title>
+  <entry>
+    <title>First</title>
+    <id>urn:first</id>
+    <link rel="alternate" href="http://example.com/first"/>
+    <updated>2025-05-05T12:00:00+02:00</updated>
+    <summary>Hello &lt;b&gt;world&lt;/b&gt;</summary>
+    <media:thumbnail url="http://example.com/first.jpg"/>
+  </entry>
+</feed>"""
+
+
+def channel(items):
+    return f'<rss version="2.0"><channel><title>Feed</title>{"".join(items)}</channel></rss>'.encode()
+
+
+def item(title, minute):
+    return (
+        f"<item><title>{title}</title><guid>{title}</guid>"
+        f"<pubDate>Mon, 05 May 2025 {10 + minute // 60}:{minute % 60:02d}:00 GMT</pubDate></item>"
+    )
+
+
+def document(body):
+    return FetchedDocument(url="http://example.com/rss", status=200, body=body)
+
+
+@override_settings(FEEDS_STREAMING_PARSE_BYTES=0)
+class StreamingParseTest(TestCase):
+    def test_entries_match_feedparser(self):
+        body = rss_document("Big Feed", [(f"Item {n}", f"<p>Body {n}</p>") for n in range(5)])
+        streamed = parse_document(document(body))
+        with override_settings(FEEDS_STREAMING_PARSE_BYTES=None):
+            parsed = parse_document(document(body))
+
+        self.assertTrue(streamed.streaming)
+        self.assertEqual(streamed.feed["title"], "Big Feed")
+        self.assertEqual(
+            [normalize_entry(entry) for entry in streamed.entries],
+            [normalize_entry(entry) for entry in parsed.entries],
+        )
+
+    def test_atom_entries(self):
+        entry = normalize_entry(next(iter(parse_document(document(ATOM_DOCUMENT)).entries)))
+        self.assertEqual(entry["guid"], "urn:first")
+        self.assertEqual(entry["link"], "http://example.com/first")
+        self.assertEqual(entry["pub_date"].isoformat(), "2025-05-05T10:00:00+00:00")
+        self.assertEqual(entry["description"], "Hello <b>world</b>")
+        self.assertEqual(entry["image_url"], "http://example.com/first.jpg")
+
+    def test_malformed_document_falls_back_to_feedparser(self):
+        body = rss_document("Feed", [("Caf&eacute;", "Body")])
+        parsed = parse_document(document(body))
+        self.assertFalse(parsed.get("streaming", False))
+        self.assertEqual(parsed.entries[0].title, "Café")
+
+    def setUp(self):
+        user = User.objects.create_user(username="john", password="secret")
+        self.source = RSSFeed.objects.create(user=user, url="http://example.com/rss").source
+
+    def stream(self, items):
+        read = []
+
+        def entries():
+            for entry in parse_document(document(channel(items))).entries:
+                read.append(entry)
+                yield normalize_entry(entry)
+
+        return save_entry_stream(self.source, entries(), batch_size=3), len(read)
+
+    def test_stops_at_already_stored_entries(self):
+        old = [item(f"Old {n}", 59 - n) for n in range(10)]
+        save_parsed_feed(self.source, parse_document(document(channel(old))))
+        self.assertEqual(RSSItem.objects.count(), 10)
+
+        result, read = self.stream([item("New", 60)] + old)
+        self.assertEqual((result.created, result.skipped), (1, 5))
+        self.assertEqual(read, 6)
+        self.assertTrue(RSSItem.objects.filter(title="New").exists())
+
+    def test_reads_oldest_first_documents_to_the_end(self):
+        old = [item(f"Old {n}", n) for n in range(10)]
+        save_parsed_feed(self.source, parse_document(document(channel(old))))
+
+        result, read = self.stream(old + [item("New", 10)])
+        self.assertEqual((result.created, result.skipped, read), (1, 10, 11))
+        self.assertEqual(RSSItem.objects.count(), 11)
+
+    def test_reads_undated_documents_to_the_end(self):
+        old = [f"<item><title>Old {n}</title><guid>old-{n}</guid></item>" for n in range(10)]
+        save_parsed_feed(self.source, parse_document(document(channel(old))))
+
+        result, read = self.stream(old + ["<item><title>New</title><guid>new</guid></item>"])
+        self.assertEqual((result.created, read), (1, 11))
+
+
+class DocumentSizeLimitTest(TestCase):
+    def test_oversized_document_fails_the_fetch(self):
+        body = rss_document("Feed", [("Item", "x" * 5000)])
+        with FeedServer({"/rss": body}) as server, override_settings(FEEDS_MAX_DOCUMENT_BYTES=1000):
+            parsed = fetch_feed(FeedSource(url=server.url("/rss")))
+        self.assertIn("larger than 1000 bytes", fetch_error(parsed))
+
+    def test_limit_applies_after_decompression(self):
+        body = gzip.compress(rss_document("Feed", [("Item", "x" * 50000)]))
+        routes = {"/rss": body}
+        with FeedServer(routes, headers={"Content-Encoding": "gzip"}) as server:
+            with override_settings(FEEDS_MAX_DOCUMENT_BYTES=10000):
+                parsed = fetch_feed(FeedSource(url=server.url("/rss")))
+            self.assertLess(len(body), 10000)
+            self.assertIn("larger than", fetch_error(parsed))
+
+            parsed = fetch_feed(FeedSource(url=server.url("/rss")))
+            self.assertEqual(fetch_error(parsed), "")
+            self.assertEqual(parsed.entries[0].title, "Item")
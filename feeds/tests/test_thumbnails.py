@@ -0,0 +1,164 @@
+import os
+import tempfile
+from io import BytesIO
+from pathlib import Path
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from feeds.cache import page_version
+from feeds.models import FeedSource, Job, RSSFeed, RSSItem, Thumbnail
+from feeds.services.http import FetchedDocument
+from feeds.services.rss_parser import entry_image
+from feeds.services.thumbnails import attach_thumbnails, evict, make_thumbnails, thumbnail_path
+
+User = get_user_model()
+
+
+def png(width=800, height=600):
+    output = BytesIO()
+    Image.new("RGB", (width, height), "red").save(output, "PNG")
+    return output.getvalue()
+
+
+class EntryImageTest(TestCase):
+    def test_prefers_media_thumbnail_over_enclosures(self):
+        entry = {
+            "media_thumbnail": [{"url": "http://example.com/thumb.jpg"}],
+            "enclosures": [{"href": "http://example.com/full.jpg", "type": "image/jpeg"}],
+        }
+        self.assertEqual(entry_image(entry), "http://example.com/thumb.jpg")
+
+    def test_ignores_non_image_enclosures(self):
+        entry = {"enclosures": [
+            {"href": "http://example.com/episode.mp3", "type": "audio/mpeg"},
+            {"href": "http://example.com/cover.png", "type": "image/png"},
+        ]}
+        self.assertEqual(entry_image(entry), "http://example.com/cover.png")
+
+
+class ThumbnailTest(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.settings_override = override_settings(FEEDS_THUMBNAIL_DIR=Path(directory.name))
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+        self.user = User.objects.create_user(username="john", password="secret")
+        self.source = RSSFeed.objects.create(user=self.user, url="http://example.com/rss").source
+
+    def item(self, n, image_url):
+        return RSSItem(source=self.source, guid=str(n), title=f"Item {n}", description="", image_url=image_url)
+
+    def test_attach_queues_one_job_for_new_images(self):
+        Thumbnail.objects.create(url="http://example.com/known.jpg")
+        items = [
+            self.item(0, "http://example.com/known.jpg"),
+            self.item(1, "http://example.com/a.jpg"),
+            self.item(2, "http://example.com/a.jpg"),
+            self.item(3, ""),
+        ]
+        attach_thumbnails(items)
+
+        self.assertEqual(Thumbnail.objects.count(), 2)
+        self.assertEqual(items[1].thumbnail, items[2].thumbnail)
+        self.assertIsNone(items[3].thumbnail)
+        job = Job.objects.get(kind="thumbnail")
+        self.assertEqual(job.payload["thumbnail_ids"], [items[1].thumbnail.pk])
+
+    def test_attach_tolerates_a_concurrent_insert(self):
+        bulk_create = Thumbnail.objects.bulk_create
+
+        def racing(thumbnails, **kwargs):
+            Thumbnail.objects.create(url="http://example.com/a.jpg", status=Thumbnail.READY)
+            return bulk_create(thumbnails, **kwargs)
+
+        items = [self.item(0, "http://example.com/a.jpg"), self.item(1, "http://example.com/b.jpg")]
+        with patch.object(Thumbnail.objects, "bulk_create", side_effect=racing):
+            attach_thumbnails(items)
+
+        self.assertEqual(Thumbnail.objects.count(), 2)
+        self.assertTrue(items[0].thumbnail.is_ready)
+        job = Job.objects.get(kind="thumbnail")
+        self.assertEqual(job.payload["thumbnail_ids"], [items[1].thumbnail.pk])
+
+    @patch("feeds.services.thumbnails.fetch_document")
+    def test_generates_resized_copies_named_by_digest(self, mock_fetch):
+        mock_fetch.return_value = FetchedDocument(url="http://example.com/a.png", status=200, body=png())
+        thumbnail = Thumbnail.objects.create(url="http://example.com/a.png")
+
+        self.assertEqual(make_thumbnails([thumbnail.pk]), {})
+
+        thumbnail.refresh_from_db()
+        self.assertTrue(thumbnail.is_ready)
+        with Image.open(thumbnail_path(thumbnail.digest, 240)) as image:
+            self.assertEqual((image.format, image.size), ("JPEG", (240, 180)))
+
+    @patch("feeds.services.thumbnails.fetch_document")
+    def test_ready_thumbnails_refresh_the_pages_showing_them(self, mock_fetch):
+        mock_fetch.return_value = FetchedDocument(url="http://example.com/a.png", status=200, body=png())
+        thumbnail = Thumbnail.objects.create(url="http://example.com/a.png")
+        item = self.item(0, thumbnail.url)
+        item.thumbnail, item.pub_date = thumbnail, timezone.now()
+        item.save()
+        FeedSource.objects.filter(pk=self.source.pk).update(updated_at="2020-01-01T00:00:00Z")
+        feed = RSSFeed.objects.get(source=self.source)
+        versions = page_version(user=self.user.pk), page_version(feed=feed.pk)
+
+        make_thumbnails([thumbnail.pk])
+
+        self.source.refresh_from_db()
+        self.assertGreater(self.source.updated_at.year, 2020)
+        self.assertNotEqual((page_version(user=self.user.pk), page_version(feed=feed.pk)), versions)
+
+    @patch("feeds.services.thumbnails.fetch_document")
+    def test_broken_image_marks_thumbnail_failed(self, mock_fetch):
+        mock_fetch.return_value = FetchedDocument(url="http://example.com/a.png", status=200, body=b"not an image")
+        thumbnail = Thumbnail.objects.create(url="http://example.com/a.png")
+
+        errors = make_thumbnails([thumbnail.pk])
+
+        thumbnail.refresh_from_db()
+        self.assertIn(thumbnail.pk, errors)
+        self.assertEqual(thumbnail.status, Thumbnail.FAILED)
+
+    @patch("feeds.services.thumbnails.fetch_document")
+    def test_served_with_immutable_cache_headers(self, mock_fetch):
+        mock_fetch.return_value = FetchedDocument(url="http://example.com/a.png", status=200, body=png())
+        thumbnail = Thumbnail.objects.create(url="http://example.com/a.png")
+        make_thumbnails([thumbnail.pk])
+        thumbnail.refresh_from_db()
+
+        response = self.client.get(reverse("thumbnail", args=[thumbnail.digest, 120]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+        self.assertIn("immutable", response["Cache-Control"])
+        response.close()
+
+        self.assertEqual(self.client.get(reverse("thumbnail", args=[thumbnail.digest, 77])).status_code, 404)
+
+    def test_evicted_file_redirects_and_requeues(self):
+        digest = "ab" * 32
+        thumbnail = Thumbnail.objects.create(url="http://example.com/a.png", digest=digest, status=Thumbnail.READY)
+
+        response = self.client.get(reverse("thumbnail", args=[digest, 120]))
+        self.assertRedirects(response, "http://example.com/a.png", fetch_redirect_response=False)
+        thumbnail.refresh_from_db()
+        self.assertEqual(thumbnail.status, Thumbnail.PENDING)
+
+        # A second miss before the job ran does not queue it again.
+        self.client.get(reverse("thumbnail", args=[digest, 120]))
+        self.assertEqual(Job.objects.filter(kind="thumbnail").count(), 1)
+
+    def test_evict_removes_least_recently_used_files(self):
+        paths = [thumbnail_path(f"{n:02d}" * 32, 120) for n in range(3)]
+        for age, path in zip((300, 200, 100), paths):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b"x" * 100)
+            os.utime(path, (1_000_000 - age, 1_000_000 - age))
+
+        self.assertEqual(evict(max_bytes=150), 200)
+        self.assertEqual([path.exists() for path in paths], [False, False, True])
@@ -1,8 +1,12 @@
 import time
+from datetime import datetime, timezone
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.test import TestCase
 from django.urls import reverse
 from django.contrib.auth import get_user_model
-from feeds.models import RSSFeed
+from feeds.models import FeedSource, RSSFeed, RSSItem
 from unittest.mock import patch
 from types import SimpleNamespace
 
@@ -11,6 +15,7 @@ User = get_user_model()
 
 class FeedListViewTest(TestCase):
     def setUp(self):
+        cache.clear()
         self.user = User.objects.create_user(username="john", password="secret")
         self.other_user = User.objects.create_user(username="alice", password="secret")
         self.feed1 = RSSFeed.objects.create(user=self.user, url="http://example.com/rss1")
@@ -27,9 +32,26 @@ class FeedListViewTest(TestCase):
         self.assertIn(self.feed2, feeds)
         self.assertEqual(len(feeds), 2)
 
+    def test_feed_list_query_count_does_not_grow_with_feeds(self):
+        def list_queries():
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(reverse("feed-list"))
+            return len(queries)
+
+        baseline = list_queries()
+        for n in range(10):
+            feed = RSSFeed.objects.create(user=self.user, url=f"http://example.com/more{n}")
+            feed.source.record_items(1, datetime(2025, 5, 5, tzinfo=timezone.utc))
+        self.assertEqual(list_queries(), baseline)
+
+        response = self.client.get(reverse("feed-list"))
+        self.assertContains(response, "1 items", count=10)
+
 
 class FeedDetailViewTest(TestCase):
     def setUp(self):
+        cache.clear()
         self.user = User.objects.create_user(username="john", password="secret")
         self.other_user = User.objects.create_user(username="alice", password="secret")
         self.feed = RSSFeed.objects.create(user=self.user, url="http://example.com/rss")
@@ -49,8 +71,126 @@ class FeedDetailViewTest(TestCase):
         self.assertEqual(response.status_code, 404)
 
 
+class FeedDetailPaginationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="john", password="secret")
+        self.feed = RSSFeed.objects.create(user=self.user, url="http://example.com/rss")
+        same_time = datetime(2025, 5, 5, tzinfo=timezone.utc)
+        # Twelve items sharing one pub_date, so ordering relies on the id tiebreaker.
+        RSSItem.objects.bulk_create(
+            RSSItem(source=self.feed.source, guid=str(n), title=f"Item {n}", description="", pub_date=same_time)
+            for n in range(12)
+        )
+        self.client.login(username="john", password="secret")
+        self.url = reverse("feed-detail", kwargs={"pk": self.feed.pk})
+
+    def titles(self, response):
+        return [item.title for item in response.context["page_obj"]]
+
+    def test_cursor_pages_walk_forward_and_back(self):
+        first = self.client.get(self.url)
+        self.assertEqual(self.titles(first), [f"Item {n}" for n in range(11, 6, -1)])
+        self.assertFalse(first.context["page_obj"].has_previous)
+
+        second = self.client.get(self.url, {"after": first.context["page_obj"].next_cursor})
+        self.assertEqual(self.titles(second), [f"Item {n}" for n in range(6, 1, -1)])
+
+        third = self.client.get(self.url, {"after": second.context["page_obj"].next_cursor})
+        self.assertEqual(self.titles(third), ["Item 1", "Item 0"])
+        self.assertFalse(third.context["page_obj"].has_next)
+
+        back = self.client.get(self.url, {"before": third.context["page_obj"].previous_cursor})
+        self.assertEqual(self.titles(back), self.titles(second))
+
+    def test_cursor_pages_do_not_count_items(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url)
+        self.assertFalse(any("COUNT(" in query["sql"] for query in queries))
+
+    def test_malformed_cursor_shows_first_page(self):
+        response = self.client.get(self.url, {"after": "not-a-cursor"})
+        self.assertEqual(self.titles(response)[0], "Item 11")
+
+    def test_numbered_pages_still_work(self):
+        response = self.client.get(self.url, {"page": 3})
+        self.assertEqual(self.titles(response), ["Item 1", "Item 0"])
+        self.assertContains(response, "?page=2")
+
+
+class RiverViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="john", password="secret")
+        other_user = User.objects.create_user(username="alice", password="secret")
+        first = RSSFeed.objects.create(user=self.user, url="http://example.com/a", title="Feed A")
+        second = RSSFeed.objects.create(user=self.user, url="http://example.com/b", title="Feed B")
+        other = RSSFeed.objects.create(user=other_user, url="http://example.com/c")
+        for n, source in enumerate([first.source, second.source, other.source] * 15):
+            RSSItem.objects.create(
+                source=source, guid=str(n), title=f"Item {n}", description="",
+                pub_date=datetime(2025, 5, 5, 12, n, tzinfo=timezone.utc),
+            )
+        self.client.login(username="john", password="secret")
+
+    def test_river_merges_user_feeds_newest_first(self):
+        response = self.client.get(reverse("river"))
+        page = response.context["page_obj"]
+        titles = [item.title for item in page]
+        expected = [f"Item {n}" for n in range(44, -1, -1) if n % 3 != 2]
+        self.assertEqual(titles, expected[:20])
+        self.assertContains(response, "Feed B &middot;")
+
+        older = self.client.get(reverse("river"), {"after": page.next_cursor})
+        self.assertEqual([item.title for item in older.context["page_obj"]], expected[20:])
+
+    def test_sources_are_merged_across_queries(self):
+        expected = [f"Item {n}" for n in range(44, -1, -1) if n % 3 != 2]
+        with patch("feeds.pagination.SOURCES_PER_QUERY", 1):
+            first = self.client.get(reverse("river")).context["page_obj"]
+            older = self.client.get(reverse("river"), {"after": first.next_cursor}).context["page_obj"]
+            newer = self.client.get(reverse("river"), {"before": older.previous_cursor}).context["page_obj"]
+        self.assertEqual([item.title for item in first], expected[:20])
+        self.assertEqual([item.title for item in older], expected[20:])
+        self.assertEqual([item.title for item in newer], expected[:20])
+
+    def test_quiet_feed_next_to_a_busy_source(self):
+        busy = RSSFeed.objects.create(user=self.user, url="http://example.com/busy").source
+        now = datetime(2025, 6, 1, tzinfo=timezone.utc)
+        RSSItem.objects.bulk_create(
+            RSSItem(source=busy, guid=str(n), title="Busy", description="", pub_date=now)
+            for n in range(300)
+        )
+        quiet_user = User.objects.create_user(username="bob", password="secret")
+        quiet = RSSFeed.objects.create(user=quiet_user, url="http://example.com/quiet")
+        RSSItem.objects.create(
+            source=quiet.source, guid="q", title="Quiet", description="",
+            pub_date=datetime(2020, 1, 1, tzinfo=timezone.utc),
+        )
+        self.client.login(username="bob", password="secret")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("river"))
+        self.assertEqual([item.title for item in response.context["page_obj"]], ["Quiet"])
+        if connection.vendor == "sqlite":
+            # The page is read through the per-source index, never the global timeline.
+            page_sql = next(query["sql"] for query in queries if query["sql"].startswith('SELECT "feeds_rssitem"'))
+            with connection.cursor() as cursor:
+                cursor.execute("EXPLAIN QUERY PLAN " + page_sql)
+                plan = " ".join(row[-1] for row in cursor.fetchall())
+            self.assertIn("rssitem_source_timeline", plan)
+            self.assertNotIn("SCAN", plan)
+
+    def test_duplicate_subscriptions_do_not_repeat_items(self):
+        RSSFeed.objects.create(user=self.user, url="http://example.com/a", title="Again")
+        response = self.client.get(reverse("river"), {"after": ""})
+        titles = [item.title for item in response.context["page_obj"]]
+        self.assertEqual(len(titles), len(set(titles)))
+
+
 class FeedCreateViewTest(TestCase):
     def setUp(self):
+        cache.clear()
         self.user = User.objects.create_user(username="john", password="secret")
         self.client.login(username="john", password="secret")
 
@@ -59,7 +199,7 @@ class FeedCreateViewTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, "feeds/feed_form.html")
 
-    @patch("feeds.views.feed.feedparser.parse")
+    @patch("feeds.services.rss_parser.fetch_feed")
     def test_feed_create_view_post_creates_feed(self, mock_parse):
         mock_parse.return_value = SimpleNamespace(
             entries=[{
@@ -76,6 +216,16 @@ class FeedCreateViewTest(TestCase):
         self.assertEqual(response.status_code, 302)
         self.assertEqual(RSSFeed.objects.count(), 1)
         self.assertEqual(RSSFeed.objects.first().user, self.user)
+        self.assertEqual(RSSFeed.objects.first().items.count(), 1)
+        mock_parse.assert_called_once()
+
+    @patch("feeds.services.rss_parser.fetch_feed")
+    def test_feed_create_view_rejects_invalid_feed(self, mock_parse):
+        mock_parse.return_value = SimpleNamespace(entries=[], feed={}, bozo=True)
+        response = self.client.post(reverse("feed-add"), {"url": "http://example.com/not-a-feed"})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(RSSFeed.objects.exists())
+        self.assertFalse(FeedSource.objects.exists())
 
     def test_feed_create_requires_authentication(self):
         self.client.logout()
@@ -85,6 +235,7 @@ class FeedCreateViewTest(TestCase):
 
 class FeedUpdateDeleteViewTests(TestCase):
     def setUp(self):
+        cache.clear()
         self.user = User.objects.create_user(username="john", password="secret")
         self.other_user = User.objects.create_user(username="alice", password="secret")
         self.feed = RSSFeed.objects.create(user=self.user, url="http://example.com/rss")
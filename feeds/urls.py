@@ -1,12 +1,57 @@
-from django.urls import path
-from feeds.views.feed import FeedListView, FeedCreateView, FeedDetailView, FeedUpdateView, FeedDeleteView
+from django.conf import settings
+from django.urls import path, re_path
+from feeds.views.api import FeedItemsAPIView, FeedsAPIView, RiverAPIView
+from feeds.views.async_feed import AsyncFeedCreateView, AsyncFeedDetailView, AsyncFeedListView, AsyncRiverView
+from feeds.views.feed import FeedListView, FeedCreateView, FeedDetailView, FeedUpdateView, FeedDeleteView, RiverView
+from feeds.views.metrics import MetricsView
+from feeds.views.opml import OPMLExportView, OPMLImportView
+from feeds.views.read_state import ItemStateView, MarkAllReadView, StarredView
+from feeds.views.search import SearchView, SearchAPIView
+from feeds.views.thumbnails import ThumbnailView
 
 
 urlpatterns = [
     path("", FeedListView.as_view(), name="feed-list"),
+    path("river/", RiverView.as_view(), name="river"),
+    path("starred/", StarredView.as_view(), name="starred"),
+    path("mark-read/", MarkAllReadView.as_view(), name="mark-all-read"),
+    path("search/", SearchView.as_view(), name="search"),
+    path("api/search/", SearchAPIView.as_view(), name="api-search"),
+    path("api/feeds/", FeedsAPIView.as_view(), name="api-feeds"),
+    path("api/feeds/<int:pk>/items/", FeedItemsAPIView.as_view(), name="api-feed-items"),
+    path("api/items/", RiverAPIView.as_view(), name="api-items"),
+    path("metrics", MetricsView.as_view(), name="metrics"),
+    re_path(
+        r"^thumbnails/(?P<digest>[0-9a-f]{64})-(?P<size>[0-9]+)\.jpg$", ThumbnailView.as_view(), name="thumbnail"
+    ),
     path("add/", FeedCreateView.as_view(), name="feed-add"),
+    path("import/", OPMLImportView.as_view(), name="opml-import"),
+    path("export.opml", OPMLExportView.as_view(), name="opml-export"),
     path("<int:pk>/", FeedDetailView.as_view(), name="feed-detail"),
     path("<int:pk>/edit/", FeedUpdateView.as_view(), name="feed-edit"),
     path("<int:pk>/delete/", FeedDeleteView.as_view(), name="feed-delete"),
+    path("<int:pk>/mark-read/", MarkAllReadView.as_view(), name="feed-mark-read"),
+    path("<int:pk>/items/<int:item_pk>/state/", ItemStateView.as_view(), name="item-state"),
 ]
+
+
+def with_async_views(patterns):
+    """
+    Swaps the async versions of the feed views into ``patterns``, for ASGI servers.
+    """
+    async_views = {
+        "feed-list": AsyncFeedListView,
+        "river": AsyncRiverView,
+        "feed-add": AsyncFeedCreateView,
+        "feed-detail": AsyncFeedDetailView,
+    }
+    return [
+        path(str(pattern.pattern), async_views[pattern.name].as_view(), name=pattern.name)
+        if pattern.name in async_views else pattern
+        for pattern in patterns
+    ]
+
+
+if getattr(settings, "FEEDS_ASYNC_VIEWS", False):
+    urlpatterns = with_async_views(urlpatterns)
 print("urls.py carregado")
\ No newline at end of file
@@ -0,0 +1,262 @@
+"""
+Read-only JSON API for the user's feeds and items.
+
+Rows are built straight from ``.values()`` querysets, selecting only the
+columns behind the requested ``fields=``, so no model instances are
+created. Lists are paginated with cursors and answered with ETag and
+Last-Modified validators, like the HTML pages.
+"""
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db.models import CharField, F, Value
+from django.db.models.functions import Coalesce, NullIf
+from django.http import JsonResponse
+from django.views import View
+from feeds.models import RSSFeed, RSSItem
+from feeds.pagination import KeysetPaginator
+from feeds.services.read_state import with_unread_counts
+from feeds.views.feed import ConditionalPageMixin, subscription_last_modified, subscriptions_last_modified
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+# Each field is either a column selected under its own name or an
+# expression selected under the field's name.
+FEED_FIELDS = {
+    "id": "id",
+    "url": "url",
+    "title": Coalesce(
+        NullIf("title", Value("")), NullIf("source__title", Value("")), "url", output_field=CharField()
+    ),
+    "site_title": F("source__title"),
+    "item_count": F("source__item_count"),
+    "unread_count": "unread_count",
+    "latest_pub_date": F("source__latest_pub_date"),
+    "last_fetched_at": F("source__last_fetched_at"),
+    "updated_at": "updated_at",
+}
+DEFAULT_FEED_FIELDS = ("id", "url", "title", "item_count", "unread_count", "latest_pub_date")
+
+ITEM_FIELDS = {
+    "id": "id",
+    "feed": "source_id",
+    "title": "title",
+    "link": "link",
+    "excerpt": "excerpt",
+    "content": F("description_html"),
+    "image_url": "image_url",
+    "pub_date": "pub_date",
+}
+DEFAULT_ITEM_FIELDS = ("id", "feed", "title", "link", "excerpt", "pub_date")
+
+
+def select(queryset, available, fields, required=()):
+    """
+    Calls ``.values()`` with the columns and expressions behind ``fields``.
+
+    Expressions are selected under an ``api_`` alias, since a name such as
+    ``title`` may already be a model field.
+
+    Args:
+        queryset (QuerySet): The queryset to select from.
+        available (dict): Field names mapped to a column name or an expression.
+        fields (iterable): The requested field names.
+        required (iterable): Fields needed internally, such as for cursors.
+
+    Returns:
+        tuple: The ``.values()`` queryset and a dict of field name to row key.
+    """
+    columns, expressions, keys = [], {}, {}
+    for name in dict.fromkeys([*fields, *required]):
+        source = available[name]
+        if isinstance(source, str):
+            columns.append(source)
+            keys[name] = source
+        else:
+            keys[name] = f"api_{name}"
+            expressions[keys[name]] = source
+    return queryset.values(*columns, **expressions), keys
+
+
+class JSONListView(View):
+    """
+    Base for the JSON list endpoints: parses ``fields=`` and ``limit=``.
+
+    Subclasses set ``available_fields`` and ``default_fields`` and implement
+    ``get_results``.
+    """
+    available_fields = {}
+    default_fields = ()
+
+    def get_fields(self):
+        """
+        Returns the requested fields in order, or the defaults.
+
+        Raises:
+            ValueError: If a field does not exist.
+        """
+        requested = [name.strip() for name in self.request.GET.get("fields", "").split(",") if name.strip()]
+        unknown = [name for name in requested if name not in self.available_fields]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        return list(dict.fromkeys(requested)) or list(self.default_fields)
+
+    def get_limit(self):
+        """
+        Returns the page size from ``?limit=``.
+
+        Raises:
+            ValueError: If it is not a number between 1 and MAX_LIMIT.
+        """
+        value = self.request.GET.get("limit")
+        if value is None:
+            return DEFAULT_LIMIT
+        if not value.isdigit() or not 1 <= int(value) <= MAX_LIMIT:
+            raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+        return int(value)
+
+    def page_url(self, **params):
+        """
+        Returns this URL with its query string updated by ``params``.
+        """
+        query = self.request.GET.copy()
+        for name in ("after", "before"):
+            query.pop(name, None)
+        query.update(params)
+        return f"{self.request.path}?{query.urlencode()}"
+
+    def get(self, request, *args, **kwargs):
+        """
+        Returns a page of results as JSON, or a 400 error for bad parameters.
+
+        Returns:
+            JsonResponse: ``{"results": [...], "next": ..., "previous": ...}``.
+        """
+        try:
+            fields, limit = self.get_fields(), self.get_limit()
+        except ValueError as exc:
+            return JsonResponse({"error": str(exc)}, status=400)
+        return self.get_results(fields, limit)
+
+    def get_results(self, fields, limit):
+        raise NotImplementedError
+
+
+class APIView(LoginRequiredMixin, ConditionalPageMixin, JSONListView):
+    """
+    A JSON list for logged-in users, answered with 304 when unchanged.
+    """
+    raise_exception = True
+
+    def get_etag_salt(self):
+        """
+        Responses embed no CSRF token, so the ETag does not depend on it.
+        """
+        return "api"
+
+
+class FeedsAPIView(APIView):
+    """
+    Lists the user's subscriptions, by id with ``?after=<id>`` cursors.
+    """
+    available_fields = FEED_FIELDS
+    default_fields = DEFAULT_FEED_FIELDS
+
+    def get_last_modified(self):
+        return subscriptions_last_modified(self.request.user)
+
+    def get_results(self, fields, limit):
+        """
+        Returns one page of subscriptions.
+
+        Unread counts are only computed when ``unread_count`` is requested.
+        """
+        feeds = RSSFeed.objects.filter(user=self.request.user)
+        after = self.request.GET.get("after", "")
+        if after.isdigit():
+            feeds = feeds.filter(pk__gt=int(after))
+        if "unread_count" in fields:
+            feeds = with_unread_counts(feeds)
+        values, keys = select(feeds, FEED_FIELDS, fields, required=["id"])
+        rows = list(values.order_by("pk")[: limit + 1])
+        has_next = len(rows) > limit
+        rows = rows[:limit]
+        return JsonResponse({
+            "results": [{name: row[keys[name]] for name in fields} for row in rows],
+            "next": self.page_url(after=rows[-1]["id"]) if has_next else None,
+        })
+
+
+class ItemsAPIView(APIView):
+    """
+    Base for item lists, newest first with ``?after=`` / ``?before=`` cursors.
+
+    ``feed`` is the id of the user's subscription the item came from.
+    """
+    available_fields = ITEM_FIELDS
+    default_fields = DEFAULT_ITEM_FIELDS
+
+    def get_items(self):
+        """
+        Returns the items to list and a map of source id to subscription id.
+        """
+        raise NotImplementedError
+
+    def get_sources(self, feeds):
+        """
+        Returns the source ids to merge the page from, or None to read ``get_items`` directly.
+        """
+        return None
+
+    def get_results(self, fields, limit):
+        """
+        Returns one page of items.
+        """
+        items, feeds = self.get_items()
+        if items is None:
+            return JsonResponse({"error": "Not found"}, status=404)
+        values, keys = select(items, ITEM_FIELDS, fields, required=["id", "pub_date"])
+        page = KeysetPaginator(values, limit, sources=self.get_sources(feeds)).get_page(
+            after=self.request.GET.get("after"), before=self.request.GET.get("before")
+        )
+        results = [{name: row[keys[name]] for name in fields} for row in page]
+        if "feed" in fields:
+            for row in results:
+                row["feed"] = feeds.get(row["feed"])
+        return JsonResponse({
+            "results": results,
+            "next": self.page_url(after=page.next_cursor) if page.has_next else None,
+            "previous": self.page_url(before=page.previous_cursor) if page.has_previous else None,
+        })
+
+
+class FeedItemsAPIView(ItemsAPIView):
+    """
+    Lists the items of one of the user's subscriptions.
+    """
+
+    def get_last_modified(self):
+        return subscription_last_modified(self.request.user, self.kwargs["pk"])
+
+    def get_items(self):
+        source_id = RSSFeed.objects.filter(user=self.request.user, pk=self.kwargs["pk"]).values_list(
+            "source_id", flat=True
+        ).first()
+        if source_id is None:
+            return None, {}
+        return RSSItem.objects.filter(source_id=source_id), {source_id: self.kwargs["pk"]}
+
+
+class RiverAPIView(ItemsAPIView):
+    """
+    Lists the items of all of the user's subscriptions, like the river page.
+    """
+
+    def get_last_modified(self):
+        return subscriptions_last_modified(self.request.user)
+
+    def get_items(self):
+        feeds = dict(RSSFeed.objects.filter(user=self.request.user).values_list("source_id", "pk"))
+        return RSSItem.objects.all(), feeds
+
+    def get_sources(self, feeds):
+        return list(feeds)
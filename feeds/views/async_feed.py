@@ -0,0 +1,191 @@
+"""
+Async versions of the feed views, for serving under ASGI (``rssreader.asgi``).
+
+They subclass the synchronous views and replace their handlers with
+coroutines that query through the async ORM and fetch feeds with httpx, so
+a single process can wait on the database and on slow publishers for many
+requests at once. Querysets are only run when the page's cached fragment
+is missing. Templates are rendered by Django on a worker thread, where any
+remaining lazy lookups are allowed. ``urls.py`` routes to these views when
+``settings.FEEDS_ASYNC_VIEWS`` is enabled.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.views import redirect_to_login
+from django.http import Http404
+from django.template.response import TemplateResponse
+from django.utils.cache import get_conditional_response
+from django.utils.functional import SimpleLazyObject
+from feeds.cache import apage_version, fragment_timeout, is_fragment_cached
+from feeds.models import RSSFeed, RSSItem
+from feeds.pagination import KeysetPaginator
+from feeds.services.read_state import aapply_item_state, unread_items
+from feeds.services.rss_parser import afetch_url, is_valid_feed
+from feeds.views.feed import (
+    ConditionalPageMixin, FeedCreateView, FeedDetailView, FeedListView, RiverView,
+    alabel_items, asubscription_last_modified, asubscriptions_last_modified, auser_feeds,
+)
+
+
+class AsyncLoginRequiredMixin:
+    """
+    Redirects anonymous users to the login page, resolving the user with ``request.auser()``.
+
+    The resolved user replaces the lazy ``request.user``, so later code
+    and templates do not query for it again.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        request.user = await request.auser()
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await super().dispatch(request, *args, **kwargs)
+
+
+class AsyncConditionalPageMixin(ConditionalPageMixin):
+    """
+    ``ConditionalPageMixin`` for async views.
+
+    Views implement ``aget_last_modified`` and ``get_page_response`` as coroutines.
+    """
+
+    async def aget_last_modified(self):
+        raise NotImplementedError
+
+    async def get_page_response(self, request):
+        raise NotImplementedError
+
+    async def get(self, request, *args, **kwargs):
+        """
+        Renders the page, or returns 304 if the client's copy is current.
+        """
+        state = await self.aget_last_modified()
+        if state is None or await sync_to_async(len)(messages.get_messages(request)):
+            return await self.get_page_response(request)
+
+        etag, timestamp = self.validators(state)
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = await self.get_page_response(request)
+            if response.status_code != 200:
+                return response
+        self.add_validators(response, etag, timestamp)
+        return response
+
+
+class AsyncFeedListView(AsyncLoginRequiredMixin, AsyncConditionalPageMixin, FeedListView):
+    """
+    Async ``FeedListView``.
+    """
+
+    async def aget_last_modified(self):
+        return await asubscriptions_last_modified(self.request.user)
+
+    async def get_page_response(self, request):
+        version = await apage_version(user=request.user.pk)
+        feeds = self.get_queryset()
+        if not await is_fragment_cached("feed_list", request.user.pk, version):
+            feeds = [feed async for feed in feeds]
+        context = {"feeds": feeds, "page_version": version, "cache_timeout": fragment_timeout()}
+        return TemplateResponse(request, self.template_name, context)
+
+
+class AsyncFeedDetailView(AsyncLoginRequiredMixin, AsyncConditionalPageMixin, FeedDetailView):
+    """
+    Async ``FeedDetailView``.
+
+    Cursor pages are read with the async ORM; numbered ``?page=`` links,
+    which need a COUNT through Django's synchronous Paginator, are left to
+    the render thread.
+    """
+
+    async def aget_last_modified(self):
+        return await asubscription_last_modified(self.request.user, self.kwargs["pk"])
+
+    async def get_page_response(self, request):
+        try:
+            self.object = await self.get_queryset().aget(pk=self.kwargs["pk"])
+        except RSSFeed.DoesNotExist:
+            raise Http404("No feed found matching the query")
+
+        version = await apage_version(feed=self.object.pk)
+        cached = await is_fragment_cached("feed_items", self.object.pk, version, request.GET.urlencode())
+        if cached or request.GET.get("page"):
+            page = SimpleLazyObject(self.get_page)
+        else:
+            items = self.object.items.defer("description").select_related("thumbnail")
+            if self.unread_only:
+                items = unread_items(self.object, items)
+            page = await KeysetPaginator(items, self.paginate_by).aget_page(
+                after=request.GET.get("after"), before=request.GET.get("before")
+            )
+            await aapply_item_state([self.object], page.object_list)
+
+        context = {
+            "feed": self.object,
+            "object": self.object,
+            "page_obj": page,
+            "unread_only": self.unread_only,
+            "page_query": "unread=1&" if self.unread_only else "",
+            "page_version": version,
+            "cache_timeout": fragment_timeout(),
+        }
+        return TemplateResponse(request, self.template_name, context)
+
+
+class AsyncRiverView(AsyncLoginRequiredMixin, RiverView):
+    """
+    Async ``RiverView``.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        version = await apage_version(user=request.user.pk)
+        if await is_fragment_cached("river", request.user.pk, version, request.GET.urlencode()):
+            page = SimpleLazyObject(self.get_page)
+        else:
+            feeds = await auser_feeds(request.user)
+            items = RSSItem.objects.defer("description").select_related("thumbnail")
+            paginator = KeysetPaginator(items, self.paginate_by, sources=[feed.source_id for feed in feeds])
+            page = await paginator.aget_page(after=request.GET.get("after"), before=request.GET.get("before"))
+            await alabel_items(request.user, page, feeds)
+        context = {"page_obj": page, "page_version": version, "cache_timeout": fragment_timeout()}
+        return TemplateResponse(request, self.template_name, context)
+
+
+class AsyncFeedCreateView(AsyncLoginRequiredMixin, FeedCreateView):
+    """
+    Async ``FeedCreateView``.
+
+    The validation fetch waits on the publisher through httpx without
+    holding a thread; only saving the feed and its items runs on Django's
+    database thread.
+    """
+    # ProcessFormView's synchronous put() would make the view mix sync and async handlers.
+    http_method_names = ["get", "post", "head", "options"]
+
+    async def get(self, request, *args, **kwargs):
+        self.object = None
+        return self.render_to_response(self.get_context_data())
+
+    async def post(self, request, *args, **kwargs):
+        """
+        Validates the URL with an async fetch and subscribes the user.
+
+        Returns:
+            HttpResponse: A redirect, or the form with its errors.
+        """
+        self.object = None
+        form = self.get_form()
+        if not form.is_valid():
+            return self.form_invalid(form)
+
+        form.instance.user = request.user
+        if getattr(settings, "FEEDS_ASYNC_SUBSCRIBE", False):
+            return await sync_to_async(self.subscribe_later)(form)
+
+        parsed = await afetch_url(form.cleaned_data["url"])
+        if not is_valid_feed(parsed):
+            messages.error(request, "Invalid RSS feed URL.")
+            return self.form_invalid(form)
+        return await sync_to_async(self.subscribe)(form, parsed)
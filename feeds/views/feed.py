@@ -1,18 +1,212 @@
-import feedparser
+import hashlib
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.http import HttpResponse
-from django.views.generic import ListView, CreateView, DetailView, UpdateView, DeleteView
+from django.shortcuts import redirect
+from django.views.generic import ListView, CreateView, DetailView, UpdateView, DeleteView, TemplateView
 from django.urls import reverse_lazy
 from django.contrib import messages
 from django.core.paginator import Paginator
-from feeds.models import RSSFeed
+from django.middleware.csrf import get_token
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.utils.functional import SimpleLazyObject
+from feeds.cache import bump_feed, bump_versions, fragment_timeout, page_version
+from feeds.models import RSSFeed, RSSItem
+from feeds.pagination import KeysetPaginator
 from feeds.services import parse_and_save_feed
+from feeds.services.jobs import enqueue_fetch
+from feeds.services.read_state import aapply_item_state, apply_item_state, unread_items, with_unread_counts
+from feeds.services.rss_parser import fetch_url, is_valid_feed
 
 
-class FeedListView(LoginRequiredMixin, ListView):
+def label_items(user, items, feeds=None):
+    """
+    Sets ``feed_title`` on items to the title of the user's subscription.
+
+    Also sets the read and starred state of each item, see ``apply_item_state``.
+
+    Args:
+        user (User): The user viewing the items.
+        items (iterable): RSSItem instances from the user's feeds.
+        feeds (list, optional): The user's subscriptions with their sources,
+            if already loaded.
+    """
+    if feeds is None:
+        feeds = user_feeds(user)
+    set_feed_titles(feeds, items)
+    apply_item_state(feeds, items)
+
+
+async def alabel_items(user, items, feeds=None):
+    """
+    Asynchronous ``label_items``, using the async ORM.
+    """
+    if feeds is None:
+        feeds = await auser_feeds(user)
+    set_feed_titles(feeds, items)
+    await aapply_item_state(feeds, items)
+
+
+def user_feeds(user):
+    """
+    Returns the user's subscriptions with their sources, for labelling items.
+    """
+    return list(RSSFeed.objects.filter(user=user).select_related("source"))
+
+
+async def auser_feeds(user):
+    """
+    Asynchronous ``user_feeds``.
+    """
+    return [feed async for feed in RSSFeed.objects.filter(user=user).select_related("source")]
+
+
+def set_feed_titles(feeds, items):
+    titles = {feed.source_id: feed.display_title for feed in feeds}
+    for item in items:
+        item.feed_title = titles.get(item.source_id)
+
+
+SUBSCRIPTIONS_CHANGED = {"feed": Max("updated_at"), "source": Max("source__updated_at"), "count": Count("pk")}
+
+
+def subscriptions_last_modified(user):
+    """
+    Latest change to any of a user's subscriptions or their sources, in one query.
+
+    Returns:
+        tuple | None: The change time and the number of feeds, which
+        catches deletions, or None if the user has no feeds.
+    """
+    return _latest_subscription_change(RSSFeed.objects.filter(user=user).aggregate(**SUBSCRIPTIONS_CHANGED))
+
+
+async def asubscriptions_last_modified(user):
+    """
+    Asynchronous ``subscriptions_last_modified``.
+    """
+    return _latest_subscription_change(await RSSFeed.objects.filter(user=user).aaggregate(**SUBSCRIPTIONS_CHANGED))
+
+
+def _latest_subscription_change(state):
+    if not state["count"]:
+        return None
+    return max(state["feed"], state["source"]), state["count"]
+
+
+def subscription_last_modified(user, pk):
+    """
+    Latest change to one of a user's subscriptions or its source, in one query.
+
+    Returns:
+        tuple | None: The change time and the feed id, or None if the feed
+        does not exist for this user, which then renders the 404.
+    """
+    state = RSSFeed.objects.filter(user=user, pk=pk).values_list("updated_at", "source__updated_at").first()
+    return (max(state), pk) if state is not None else None
+
+
+async def asubscription_last_modified(user, pk):
+    """
+    Asynchronous ``subscription_last_modified``.
+    """
+    state = await RSSFeed.objects.filter(user=user, pk=pk).values_list("updated_at", "source__updated_at").afirst()
+    return (max(state), pk) if state is not None else None
+
+
+class CachedFragmentMixin:
+    """
+    Adds ``page_version`` and ``cache_timeout`` to the context for ``{% cache %}``.
+
+    Templates key their cached fragments on the version, which is bumped
+    whenever the underlying feeds are fetched, edited or deleted. Querysets
+    in the context are left lazy so a cache hit does not run them.
+    """
+
+    def get_page_version(self):
+        """
+        Returns the version stamp of the user's cached fragments.
+        """
+        return page_version(user=self.request.user.pk)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["page_version"] = self.get_page_version()
+        context["cache_timeout"] = fragment_timeout()
+        return context
+
+
+class ConditionalPageMixin:
+    """
+    Answers ``If-None-Match`` / ``If-Modified-Since`` with 304 Not Modified.
+
+    Views implement ``get_last_modified``, a single cheap query returning
+    the time the page content last changed and a fingerprint of anything
+    else it depends on. The ETag also covers the CSRF secret, so a page is
+    re-sent when the token embedded in its forms rotates, and pages with
+    pending flash messages are always rendered so the messages are shown.
+    """
+
+    def get_last_modified(self):
+        """
+        Returns ``(last_modified, fingerprint)``, or None to skip conditional handling.
+        """
+        raise NotImplementedError
+
+    def get_etag_salt(self):
+        """
+        Returns the CSRF secret, so the ETag changes when the page's token would.
+        """
+        get_token(self.request)  # makes sure the secret is the one the page will use
+        return self.request.META["CSRF_COOKIE"]
+
+    def get(self, request, *args, **kwargs):
+        """
+        Renders the page, or returns 304 if the client's copy is current.
+
+        Returns:
+            HttpResponse: The page or a 304 response, with validators set.
+        """
+        state = self.get_last_modified()
+        if state is None or len(messages.get_messages(request)):
+            return super().get(request, *args, **kwargs)
+
+        etag, timestamp = self.validators(state)
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        self.add_validators(response, etag, timestamp)
+        return response
+
+    def validators(self, state):
+        """
+        Turns the result of ``get_last_modified`` into an ETag and a timestamp.
+        """
+        last_modified, fingerprint = state
+        digest = hashlib.sha256(
+            f"{last_modified.isoformat()}|{fingerprint}|{self.get_etag_salt()}".encode()
+        ).hexdigest()[:32]
+        return quote_etag(digest), int(last_modified.timestamp())
+
+    def add_validators(self, response, etag, timestamp):
+        response.headers["ETag"] = etag
+        response.headers["Last-Modified"] = http_date(timestamp)
+        patch_cache_control(response, private=True, no_cache=True)
+
+
+class FeedListView(LoginRequiredMixin, ConditionalPageMixin, CachedFragmentMixin, ListView):
     """
     View that displays all RSS feeds associated with the currently authenticated user.
 
+    Item counts and latest dates are read from the denormalized columns on
+    FeedSource and unread counts are computed by subqueries, so the page
+    costs one query however many feeds are listed, and none while the
+    rendered list is cached.
+
     Attributes:
         model (Model): The Django model associated with this view.
         template_name (str): The path to the HTML template.
@@ -29,7 +223,13 @@ class FeedListView(LoginRequiredMixin, ListView):
         Returns:
             QuerySet: A queryset of RSSFeed objects.
         """
-        return RSSFeed.objects.filter(user=self.request.user)
+        return with_unread_counts(RSSFeed.objects.filter(user=self.request.user).select_related("source"))
+
+    def get_last_modified(self):
+        """
+        Latest change to any of the user's subscriptions or their sources.
+        """
+        return subscriptions_last_modified(self.request.user)
 
 
 class FeedCreateView(LoginRequiredMixin, CreateView):
@@ -37,7 +237,12 @@ class FeedCreateView(LoginRequiredMixin, CreateView):
     View that allows a logged-in user to add a new RSS feed.
 
     Validates the URL by checking if the parsed RSS has content.
-    On success, saves the feed and parses its items.
+    On success, saves the feed and stores the items from that same fetch,
+    so adding a feed costs a single download and parse.
+
+    With ``settings.FEEDS_ASYNC_SUBSCRIBE`` enabled the feed is saved right
+    away without fetching, and its first fetch is queued for the background
+    worker. The detail page shows progress until that fetch completes.
 
     Attributes:
         model (Model): The Django model used for creating a new instance.
@@ -65,26 +270,58 @@ class FeedCreateView(LoginRequiredMixin, CreateView):
             HttpResponse: The HTTP response after processing.
         """
         form.instance.user = self.request.user
-        url = form.cleaned_data["url"]
+        if getattr(settings, "FEEDS_ASYNC_SUBSCRIBE", False):
+            return self.subscribe_later(form)
 
-        parsed = feedparser.parse(url)
-        if not parsed.entries or parsed.bozo:
+        parsed = fetch_url(form.cleaned_data["url"])
+        if not is_valid_feed(parsed):
             messages.error(self.request, "Invalid RSS feed URL.")
             return self.form_invalid(form)
+        return self.subscribe(form, parsed)
 
+    def subscribe(self, form, parsed):
+        """
+        Saves the feed and stores the items of the fetch that validated it.
+
+        Returns:
+            HttpResponseRedirect: Redirects to the success URL.
+        """
         response = super().form_valid(form)
-        parse_and_save_feed(self.object)
+        bump_feed(self.object)
+        parse_and_save_feed(self.object, parsed=parsed)
         messages.success(self.request, "Feed added successfully!")
         return response
 
+    def subscribe_later(self, form):
+        """
+        Saves the feed and queues its first fetch for the background worker.
+
+        Returns:
+            HttpResponseRedirect: Redirects to the feed's page.
+        """
+        self.object = form.save()
+        bump_feed(self.object)
+        if self.object.source.is_pending:
+            enqueue_fetch(self.object.source)
+        messages.success(self.request, "Feed added! Its items are being fetched.")
+        return redirect("feed-detail", pk=self.object.pk)
+
 
-class FeedDetailView(LoginRequiredMixin, DetailView):
+class FeedDetailView(LoginRequiredMixin, ConditionalPageMixin, CachedFragmentMixin, DetailView):
     """
     View that shows a single RSS feed and its associated items, with pagination.
+
+    Items are paginated with keyset cursors (``?after=`` / ``?before=``) on
+    ``(pub_date, id)``, which avoids COUNT and OFFSET so deep pages are as
+    fast as the first. Numbered ``?page=`` links are still honoured, and
+    ``?unread=1`` lists only unread items. The rendered item list is cached
+    per subscription and page, and unchanged pages are answered with 304
+    Not Modified.
     """
     model = RSSFeed
     template_name = "feeds/feed_detail.html"
     context_object_name = "feed"
+    paginate_by = 5
 
     def get_queryset(self):
         """
@@ -93,7 +330,7 @@ class FeedDetailView(LoginRequiredMixin, DetailView):
         Returns:
             QuerySet: Filtered queryset of RSSFeed objects.
         """
-        return RSSFeed.objects.filter(user=self.request.user)
+        return RSSFeed.objects.filter(user=self.request.user).select_related("source")
 
     def get_context_data(self, **kwargs):
         """
@@ -106,19 +343,98 @@ class FeedDetailView(LoginRequiredMixin, DetailView):
             dict: Context data for the template.
         """
         context = super().get_context_data(**kwargs)
-        items = self.object.items.all().order_by("-pub_date")
-        paginator = Paginator(items, 5)  # Show 5 items per page
+        context["page_obj"] = SimpleLazyObject(self.get_page)
+        context["unread_only"] = self.unread_only
+        context["page_query"] = "unread=1&" if self.unread_only else ""
+        return context
+
+    @property
+    def unread_only(self):
+        return self.request.GET.get("unread") == "1"
+
+    def get_page(self):
+        """
+        Returns the requested page of items, with their read state.
+
+        Returns:
+            Page | KeysetPage: A numbered page for ``?page=``, else a cursor page.
+        """
+        items = self.object.items.defer("description").select_related("thumbnail")
+        if self.unread_only:
+            items = unread_items(self.object, items)
         page_number = self.request.GET.get("page")
-        context["page_obj"] = paginator.get_page(page_number)
+        if page_number:
+            paginator = Paginator(items.order_by("-pub_date", "-id"), self.paginate_by)
+            page = paginator.get_page(page_number)
+        else:
+            page = KeysetPaginator(items, self.paginate_by).get_page(
+                after=self.request.GET.get("after"), before=self.request.GET.get("before")
+            )
+        apply_item_state([self.object], page.object_list)
+        return page
+
+    def get_page_version(self):
+        """
+        Returns the version stamp of this subscription's cached item pages.
+        """
+        return page_version(feed=self.object.pk)
+
+    def get_last_modified(self):
+        """
+        Latest change to the subscription or its source.
+        """
+        return subscription_last_modified(self.request.user, self.kwargs["pk"])
+
+
+class RiverView(LoginRequiredMixin, CachedFragmentMixin, TemplateView):
+    """
+    View that merges the items of all of the user's feeds into one timeline.
+
+    Pages are merged from the newest items of each subscribed source with
+    keyset cursors (see ``KeysetPaginator``), so a page costs the same
+    however many items the user's feeds, or anyone else's, hold.
+    """
+    template_name = "feeds/river.html"
+    paginate_by = 20
+
+    def get_context_data(self, **kwargs):
+        """
+        Adds a page of the user's items, labelled with their feed titles.
+
+        Args:
+            **kwargs: Additional keyword arguments.
+
+        Returns:
+            dict: Context data for the template.
+        """
+        context = super().get_context_data(**kwargs)
+        context["page_obj"] = SimpleLazyObject(self.get_page)
         return context
 
+    def get_page(self):
+        """
+        Returns the requested page of the river, labelled with feed titles.
+
+        Returns:
+            KeysetPage: The items on the page.
+        """
+        feeds = user_feeds(self.request.user)
+        items = RSSItem.objects.defer("description").select_related("thumbnail")
+        page = KeysetPaginator(items, self.paginate_by, sources=[feed.source_id for feed in feeds]).get_page(
+            after=self.request.GET.get("after"), before=self.request.GET.get("before")
+        )
+        label_items(self.request.user, page, feeds)
+        return page
+
 
 class FeedUpdateView(LoginRequiredMixin, UpdateView):
     """
     View to update an existing RSSFeed. Only the owner can update.
+
+    Besides the URL, the owner can set a custom title for the subscription.
     """
     model = RSSFeed
-    fields = ["url"]
+    fields = ["url", "title"]
     template_name = "feeds/feed_form.html"
     success_url = reverse_lazy("feed-list")
 
@@ -135,7 +451,7 @@ class FeedUpdateView(LoginRequiredMixin, UpdateView):
         """
         Called when the submitted form is valid for an update.
 
-        Displays a success message.
+        Displays a success message and invalidates the cached pages showing the feed.
 
         Args:
             form (ModelForm): The validated form instance.
@@ -144,7 +460,9 @@ class FeedUpdateView(LoginRequiredMixin, UpdateView):
             HttpResponse: The HTTP response after processing.
         """
         messages.success(self.request, "Feed updated successfully.")
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        bump_feed(self.object)
+        return response
 
 
 class FeedDeleteView(LoginRequiredMixin, DeleteView):
@@ -174,5 +492,14 @@ class FeedDeleteView(LoginRequiredMixin, DeleteView):
         messages.add_message(self.request, messages.WARNING, "Feed deleted successfully.")
         return super().post(request, *args, **kwargs)
 
+    def form_valid(self, form):
+        """
+        Deletes the feed and invalidates the cached pages that showed it.
 
-
+        Returns:
+            HttpResponseRedirect: Redirects to the success URL.
+        """
+        user_id, pk = self.object.user_id, self.object.pk
+        response = super().form_valid(form)
+        bump_versions(user_ids=[user_id], feed_ids=[pk])
+        return response
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.utils.crypto import constant_time_compare
+from django.http import HttpResponse
+from django.views import View
+from feeds.services.metrics import render_metrics
+
+
+class MetricsView(View):
+    """
+    Exposes fetch metrics in the Prometheus text format.
+
+    Scrapers authenticate with ``Authorization: Bearer <FEEDS_METRICS_TOKEN>``;
+    without a configured token only logged-in staff can read the page.
+    """
+
+    def get(self, request):
+        """
+        Returns the current metrics.
+
+        Args:
+            request (HttpRequest): The incoming request.
+
+        Returns:
+            HttpResponse: The metrics as ``text/plain; version=0.0.4``.
+        """
+        token = getattr(settings, "FEEDS_METRICS_TOKEN", "")
+        if token:
+            if not constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}"):
+                raise PermissionDenied
+        elif not request.user.is_staff:
+            raise PermissionDenied
+        return HttpResponse(render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
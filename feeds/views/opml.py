@@ -0,0 +1,71 @@
+from django.contrib import messages
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import StreamingHttpResponse
+from django.urls import reverse_lazy
+from django.views import View
+from django.views.generic import FormView
+from feeds.forms import OPMLImportForm
+from feeds.models import RSSFeed
+from feeds.services.opml import OPMLError, export_opml, import_opml
+
+
+class OPMLImportView(LoginRequiredMixin, FormView):
+    """
+    View that subscribes the user to every feed of an uploaded OPML file.
+
+    Feeds are not fetched during the request; their first fetch is queued
+    for the background worker, so large files are accepted in seconds.
+    """
+    form_class = OPMLImportForm
+    template_name = "feeds/opml_import.html"
+    success_url = reverse_lazy("feed-list")
+
+    def form_valid(self, form):
+        """
+        Imports the uploaded file and reports what was added.
+
+        Args:
+            form (OPMLImportForm): The validated form instance.
+
+        Returns:
+            HttpResponse: A redirect to the feed list, or the form with an error.
+        """
+        try:
+            result = import_opml(self.request.user, form.cleaned_data["file"])
+        except OPMLError as exc:
+            form.add_error("file", str(exc))
+            return self.form_invalid(form)
+
+        summary = f"Imported {result.created} feeds; their items are being fetched."
+        if result.skipped:
+            summary += f" {result.skipped} were already in your list."
+        if result.invalid:
+            summary += f" {result.invalid} had no valid feed URL."
+        messages.success(self.request, summary)
+        if result.truncated:
+            messages.warning(self.request, "The file lists too many feeds; only the first ones were imported.")
+        return super().form_valid(form)
+
+
+class OPMLExportView(LoginRequiredMixin, View):
+    """
+    Streams the user's subscriptions as an OPML download.
+    """
+
+    def get(self, request):
+        """
+        Returns the OPML document as an attachment.
+
+        Args:
+            request (HttpRequest): The incoming request.
+
+        Returns:
+            StreamingHttpResponse: The document, rendered while it is sent.
+        """
+        feeds = RSSFeed.objects.filter(user=request.user).select_related("source").order_by("pk")
+        response = StreamingHttpResponse(
+            export_opml(feeds.iterator(chunk_size=500), title=f"{request.user.get_username()}'s feeds"),
+            content_type="text/x-opml; charset=utf-8",
+        )
+        response["Content-Disposition"] = 'attachment; filename="subscriptions.opml"'
+        return response
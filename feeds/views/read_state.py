@@ -0,0 +1,108 @@
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.shortcuts import get_object_or_404, redirect
+from django.urls import reverse
+from django.utils.functional import SimpleLazyObject
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.views import View
+from django.views.generic import TemplateView
+from feeds.models import ItemState, RSSFeed, RSSItem
+from feeds.pagination import KeysetPaginator
+from feeds.services.read_state import mark_all_read, set_read, set_starred
+from feeds.views.feed import label_items
+
+
+def redirect_back(request, fallback):
+    """
+    Redirects to the ``next`` field of the form if it is local, else to ``fallback``.
+    """
+    target = request.POST.get("next", "")
+    if not url_has_allowed_host_and_scheme(target, allowed_hosts={request.get_host()}, require_https=request.is_secure()):
+        target = fallback
+    return redirect(target)
+
+
+class ItemStateView(LoginRequiredMixin, View):
+    """
+    Marks an item of one of the user's feeds as read or unread, or (un)stars it.
+    """
+
+    def post(self, request, pk, item_pk):
+        """
+        Applies the ``read`` and/or ``starred`` fields, each "1" or "0".
+
+        Args:
+            request (HttpRequest): The incoming request.
+            pk (int): The subscription.
+            item_pk (int): The item, which must belong to the subscription's source.
+
+        Returns:
+            HttpResponseRedirect: Back to the page the form was on.
+        """
+        feed = get_object_or_404(RSSFeed, pk=pk, user=request.user)
+        item = get_object_or_404(RSSItem.objects.only("pk", "source_id"), pk=item_pk, source_id=feed.source_id)
+        if "read" in request.POST:
+            set_read(feed, item, read=request.POST["read"] == "1")
+        if "starred" in request.POST:
+            set_starred(feed, item, starred=request.POST["starred"] == "1")
+        return redirect_back(request, reverse("feed-detail", args=[feed.pk]))
+
+
+class MarkAllReadView(LoginRequiredMixin, View):
+    """
+    Marks every item of one of the user's feeds, or of all of them, as read.
+    """
+
+    def post(self, request, pk=None):
+        """
+        Moves the read watermarks with a single UPDATE.
+
+        Args:
+            request (HttpRequest): The incoming request.
+            pk (int, optional): The subscription; all of the user's when omitted.
+
+        Returns:
+            HttpResponseRedirect: Back to the page the form was on.
+        """
+        feeds = RSSFeed.objects.filter(user=request.user)
+        if pk is not None:
+            get_object_or_404(feeds, pk=pk)
+            feeds = feeds.filter(pk=pk)
+        mark_all_read(feeds)
+        return redirect_back(request, reverse("feed-detail", args=[pk]) if pk is not None else reverse("river"))
+
+
+class StarredView(LoginRequiredMixin, TemplateView):
+    """
+    View that lists the items the user starred in any of their feeds, newest first.
+    """
+    template_name = "feeds/starred.html"
+    paginate_by = 20
+
+    def get_context_data(self, **kwargs):
+        """
+        Adds a page of starred items to the context.
+
+        Args:
+            **kwargs: Additional keyword arguments.
+
+        Returns:
+            dict: Context data for the template.
+        """
+        context = super().get_context_data(**kwargs)
+        context["page_obj"] = SimpleLazyObject(self.get_page)
+        return context
+
+    def get_page(self):
+        """
+        Returns the requested page of starred items, labelled with feed titles.
+
+        Returns:
+            KeysetPage: The items on the page.
+        """
+        starred = ItemState.objects.filter(feed__user=self.request.user, starred=True).values("item")
+        items = RSSItem.objects.filter(pk__in=starred).defer("description").select_related("thumbnail")
+        page = KeysetPaginator(items, self.paginate_by).get_page(
+            after=self.request.GET.get("after"), before=self.request.GET.get("before")
+        )
+        label_items(self.request.user, page)
+        return page
@@ -0,0 +1,65 @@
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import JsonResponse
+from django.views import View
+from django.views.generic import TemplateView
+from feeds.services.search import search_items
+from feeds.views.feed import label_items
+
+
+class SearchView(LoginRequiredMixin, TemplateView):
+    """
+    View that searches the items of the user's feeds, best match first.
+    """
+    template_name = "feeds/search.html"
+
+    def get_context_data(self, **kwargs):
+        """
+        Adds the query and its ranked results to the context.
+
+        Args:
+            **kwargs: Additional keyword arguments.
+
+        Returns:
+            dict: Context data for the template.
+        """
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get("q", "").strip()
+        results = search_items(self.request.user, query) if query else []
+        label_items(self.request.user, results)
+        context.update(query=query, results=results)
+        return context
+
+
+class SearchAPIView(LoginRequiredMixin, View):
+    """
+    JSON endpoint returning the same ranked results as SearchView.
+    """
+    raise_exception = True
+
+    def get(self, request):
+        """
+        Returns the items matching ``?q=`` as JSON.
+
+        Args:
+            request (HttpRequest): The incoming request.
+
+        Returns:
+            JsonResponse: ``{"query": ..., "results": [...]}``.
+        """
+        query = request.GET.get("q", "").strip()
+        results = search_items(request.user, query) if query else []
+        label_items(request.user, results)
+        return JsonResponse({
+            "query": query,
+            "results": [
+                {
+                    "id": item.pk,
+                    "title": item.title,
+                    "link": item.link,
+                    "excerpt": item.excerpt,
+                    "pub_date": item.pub_date.isoformat(),
+                    "feed": item.feed_title,
+                }
+                for item in results
+            ],
+        })
@@ -0,0 +1,45 @@
+from django.http import FileResponse, Http404, HttpResponseRedirect
+from django.views import View
+from feeds.models import Thumbnail
+from feeds.services.thumbnails import requeue, thumbnail_path, thumbnail_sizes, touch
+
+# Content-addressed files never change, so clients may keep them for a year.
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class ThumbnailView(View):
+    """
+    Serves a resized item image from the local thumbnail cache.
+
+    A hit costs no database query. When the file was evicted, the thumbnail
+    is queued for regeneration and the client is sent to the original image
+    in the meantime.
+    """
+
+    def get(self, request, digest, size):
+        """
+        Returns the JPEG for ``digest`` at ``size`` pixels.
+
+        Args:
+            request (HttpRequest): The incoming request.
+            digest (str): SHA-256 of the original image.
+            size (str): One of the configured thumbnail sizes, in pixels.
+
+        Returns:
+            HttpResponse: The file, or a temporary redirect to the original.
+        """
+        size = int(size)
+        if size not in thumbnail_sizes():
+            raise Http404("Unknown thumbnail size")
+        path = thumbnail_path(digest, size)
+        try:
+            response = FileResponse(path.open("rb"), content_type="image/jpeg")
+        except FileNotFoundError:
+            thumbnail = Thumbnail.objects.filter(digest=digest).first()
+            if thumbnail is None:
+                raise Http404("Unknown thumbnail")
+            requeue(thumbnail)
+            return HttpResponseRedirect(thumbnail.url)
+        touch(path)
+        response["Cache-Control"] = CACHE_CONTROL
+        return response
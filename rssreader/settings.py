@@ -73,10 +73,29 @@ WSGI_APPLICATION = 'rssreader.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite is tuned for the web server reading while run_feed_worker writes:
+# WAL lets readers proceed during a write, synchronous=NORMAL is durable in
+# WAL mode at a fraction of the fsyncs, and writers wait up to busy_timeout
+# milliseconds for the lock instead of failing with "database is locked".
+# Transactions take the write lock when they begin (BEGIN IMMEDIATE), so two
+# writers queue up rather than one failing when it upgrades from a read.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 20000,
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64000,
+    "temp_store": "MEMORY",
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            'init_command': ";".join(f"PRAGMA {name}={value}" for name, value in SQLITE_PRAGMAS.items()),
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
@@ -125,4 +144,40 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Authentication redirects
 LOGIN_REDIRECT_URL = "/"
 LOGIN_URL = "/login/"
-LOGOUT_REDIRECT_URL = "/login/"
\ No newline at end of file
+LOGOUT_REDIRECT_URL = "/login/"
+
+# Feed refreshing
+FEEDS_REFRESH_MAX_WORKERS = 8
+FEEDS_REFRESH_PER_HOST = 2
+FEEDS_FETCH_TIMEOUT = 30
+
+# Feed documents larger than this are rejected; those over the streaming
+# threshold are parsed entry by entry and stop at already stored entries
+FEEDS_MAX_DOCUMENT_BYTES = 50 * 1024 * 1024
+FEEDS_STREAMING_PARSE_BYTES = 2 * 1024 * 1024
+
+# Serve the feed list, detail, river and add views as async views; enable
+# when running under an ASGI server such as uvicorn (rssreader.asgi)
+FEEDS_ASYNC_VIEWS = False
+
+# Save new subscriptions immediately and fetch them from run_feed_worker
+FEEDS_ASYNC_SUBSCRIBE = False
+
+# Seconds to keep rendered feed lists and item pages; they are also
+# invalidated whenever a feed is fetched with changes, edited or deleted
+FEEDS_PAGE_CACHE_TIMEOUT = 600
+
+# Defaults for prune_items; None disables the limit
+FEEDS_RETENTION_MAX_ITEMS = None
+FEEDS_RETENTION_MAX_AGE_DAYS = None
+
+# Resized item images, generated by run_feed_worker and served from local disk
+FEEDS_THUMBNAIL_DIR = BASE_DIR / "thumbnails"
+FEEDS_THUMBNAIL_SIZES = (120, 240)
+FEEDS_THUMBNAIL_CACHE_BYTES = 256 * 1024 * 1024
+
+# Most feeds read from one OPML import
+FEEDS_OPML_MAX_FEEDS = 5000
+
+# Bearer token for Prometheus to scrape /metrics; when empty only staff users can
+FEEDS_METRICS_TOKEN = ""